@@ -0,0 +1,57 @@
+#! /usr/bin/env python3
+
+# --------------------------------------------------------------------
+# Throughput of the in-memory compilation API (`bxlib.compile`), per
+# last stage, vs. one bxc.py process per compilation
+#
+#   python3 benchmarks/api.py [--runs N]
+
+# --------------------------------------------------------------------
+import argparse
+import os
+import subprocess as sp
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+sys.path.insert(0, ROOT)
+
+import bxgen
+import bxlib
+
+# ====================================================================
+def _main():
+    parser = argparse.ArgumentParser(prog = os.path.basename(sys.argv[0]))
+    parser.add_argument('--runs', type = int, default = 20, help = 'number of compilations per measure')
+    args = parser.parse_args()
+
+    source = bxgen.program(1, size = 10)
+
+    def measure(name: str, run):
+        start = time.perf_counter()
+        for _ in range(args.runs):
+            run()
+        elapsed = time.perf_counter() - start
+        print(f'{name:24}: {args.runs / elapsed:7.1f} compilations/s')
+
+    bxlib.compile(source)                   # Warm-up (parser tables)
+
+    for stage in ('tac', 'asm', 'obj', 'exe'):
+        measure(f'bxlib.compile ({stage})', lambda: bxlib.compile(source, stages = (stage,)))
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = os.path.join(tmpdir, 'input.bx')
+        with open(filename, 'w') as stream:
+            stream.write(source)
+
+        measure('bxc.py (exe)', lambda: sp.run(
+            [sys.executable, os.path.join(ROOT, 'bxc.py'), filename],
+            cwd = tmpdir, stdout = sp.DEVNULL, stderr = sp.DEVNULL,
+        ))
+
+# --------------------------------------------------------------------
+if __name__ == '__main__':
+    _main()
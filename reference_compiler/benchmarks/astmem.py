@@ -0,0 +1,78 @@
+#! /usr/bin/env python3
+
+# --------------------------------------------------------------------
+# Memory footprint of the AST, per node, on a large synthetic program
+#
+#   python3 benchmarks/astmem.py [--nodes N]
+
+# --------------------------------------------------------------------
+import argparse
+import dataclasses as dc
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bxgen
+
+from bxlib.bxast      import AST
+from bxlib.bxerrors   import DefaultReporter
+from bxlib.bxrdparser import RDParser
+
+# ====================================================================
+def count(node) -> int:
+    """Number of AST nodes (`Name`s included) reachable from `node`"""
+
+    aout, todo = 0, [node]
+
+    while todo:
+        match node := todo.pop():
+            case list() | tuple():
+                todo.extend(node)
+            case AST():
+                aout += 1
+                todo.extend(getattr(node, f.name) for f in dc.fields(node))
+
+    return aout
+
+# --------------------------------------------------------------------
+def measure(source: str, **kw) -> tuple[int, int]:
+    parser = RDParser(DefaultReporter(source), **{
+        k: v for k, v in kw.items() if k != 'tracking'
+    })
+
+    gc.collect()
+    tracemalloc.start()
+    ast = parser.parse(source, **{k: v for k, v in kw.items() if k == 'tracking'})
+    gc.collect()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return count(ast), memory
+
+# ====================================================================
+def _main():
+    parser = argparse.ArgumentParser(prog = os.path.basename(sys.argv[0]))
+    parser.add_argument('--nodes', type = int, default = 1_000_000, help = 'approximate number of nodes')
+    args = parser.parse_args()
+
+    # Calibrate the number of procedures on a small sample
+    sample = bxgen.program(10)
+    nodes  = count(RDParser(DefaultReporter(sample)).parse(sample)) / 10
+    source = bxgen.program(max(1, round(args.nodes / nodes)))
+
+    print(f'input: {len(source) / (1 << 20):.1f} MB')
+
+    for name, kw in [
+        ('eager positions', dict()),
+        ('lazy positions' , dict(lazy_positions = True)),
+        ('no positions'   , dict(tracking = False)),
+    ]:
+        nodes, memory = measure(source, **kw)
+        print(f'{name:15}: {nodes} nodes, {memory / (1 << 20):7.1f} MB, {memory / nodes:6.1f} bytes/node')
+
+# --------------------------------------------------------------------
+if __name__ == '__main__':
+    _main()
@@ -0,0 +1,73 @@
+#! /usr/bin/env python3
+
+# --------------------------------------------------------------------
+# Scaling of the per-procedure back-end (CFG optimizations & lowering,
+# see `bxc.backend`) with the number of workers (`--backend-jobs`)
+#
+# The assembly produced with N workers is checked to be the same as
+# the serial one.
+#
+#   python3 benchmarks/backend.py [--procs N] [--jobs 1,2,4,8]
+
+# --------------------------------------------------------------------
+import argparse
+import copy
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bxc
+import bxgen
+
+from bxlib.bxasmgen    import AsmGen
+from bxlib.bxcontext   import CompilationContext
+from bxlib.bxerrors    import DefaultReporter
+from bxlib.bxmm        import MM
+from bxlib.bxrdparser  import RDParser
+from bxlib.bxtychecker import check
+
+# ====================================================================
+def _main():
+    parser = argparse.ArgumentParser(prog = os.path.basename(sys.argv[0]))
+    parser.add_argument('--procs', type = int, default = 1000, help = 'number of generated procedures')
+    parser.add_argument('--jobs', default = '1,2,4,8', help = 'comma-separated numbers of workers')
+    args = parser.parse_args()
+
+    source   = bxgen.program(args.procs, size = 10)
+    reporter = DefaultReporter(source)
+    prgm     = RDParser(reporter).parse(source)
+
+    assert check(prgm, reporter)
+
+    context = CompilationContext(reporter)
+    tac      = MM.mm(prgm, context)
+    counters = dict(context.counters)
+
+    print(f'{os.cpu_count()} core(s), {len(tac)} procedures')
+
+    serial, base = None, None
+
+    for jobs in map(int, args.jobs.split(',')):
+        ptac = copy.deepcopy(tac)
+        context.counters = dict(counters)
+
+        start = time.perf_counter()
+        asm = bxc.backend(ptac, context, argparse.Namespace(backend_jobs = jobs))
+        asm = AsmGen.get_backend(bxc.BACKEND).join(asm)
+        elapsed = time.perf_counter() - start
+
+        if bxc._backend_pool is not None:
+            bxc._backend_pool.shutdown()
+            bxc._backend_pool = None
+
+        if serial is None:
+            serial, base = asm, elapsed
+        assert asm == serial, f'--backend-jobs {jobs}: the assembly differs'
+
+        print(f'--backend-jobs {jobs}: {elapsed:6.2f}s, speedup {base / elapsed:4.2f}')
+
+# --------------------------------------------------------------------
+if __name__ == '__main__':
+    _main()
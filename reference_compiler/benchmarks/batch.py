@@ -0,0 +1,64 @@
+#! /usr/bin/env python3
+
+# --------------------------------------------------------------------
+# Compilation of many small inputs: one bxc.py process per input vs.
+# one batch process (see `bxc.py --manifest`)
+#
+# The inputs are generated programs. With --rejected, a type error is
+# added to each of them, so that neither the back-end nor gcc run and
+# only the driver & front-end costs are measured.
+#
+#   python3 benchmarks/batch.py [--files N] [--rejected]
+
+# --------------------------------------------------------------------
+import argparse
+import os
+import subprocess as sp
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BXC  = os.path.join(os.path.dirname(HERE), 'bxc.py')
+
+sys.path.insert(0, os.path.dirname(HERE))
+
+import bxgen
+
+# ====================================================================
+def _main():
+    parser = argparse.ArgumentParser(prog = os.path.basename(sys.argv[0]))
+    parser.add_argument('--files', type = int, default = 20, help = 'number of generated inputs')
+    parser.add_argument('--rejected', action = 'store_true', help = 'inputs are rejected by the type checker')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        inputs = []
+
+        for i in range(args.files):
+            source = bxgen.program(2, seed = i)
+            if args.rejected:
+                source += 'def error() { x = 0; }\n'
+            inputs.append(os.path.join(tmpdir, f'input{i}.bx'))
+            with open(inputs[-1], 'w') as stream:
+                stream.write(source)
+
+        manifest = os.path.join(tmpdir, 'manifest.txt')
+        with open(manifest, 'w') as stream:
+            stream.write('\n'.join(inputs) + '\n')
+
+        def run(*commands: list[str]) -> float:
+            start = time.perf_counter()
+            for command in commands:
+                sp.run(command, cwd = tmpdir, stdout = sp.DEVNULL, stderr = sp.DEVNULL)
+            return time.perf_counter() - start
+
+        single = run(*[[sys.executable, BXC, x] for x in inputs])
+        batch  = run([sys.executable, BXC, '--manifest', manifest])
+
+    for name, elapsed in [('one process per input', single), ('batch', batch)]:
+        print(f'{name:21}: {elapsed:6.2f}s, {1000 * elapsed / args.files:7.1f} ms/input')
+
+# --------------------------------------------------------------------
+if __name__ == '__main__':
+    _main()
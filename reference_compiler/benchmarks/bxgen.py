@@ -0,0 +1,79 @@
+# --------------------------------------------------------------------
+# Generators of synthetic (well-typed) BX programs for the benchmarks
+
+import random
+
+# ====================================================================
+def _expr(rnd: random.Random, names: list[str], depth: int) -> str:
+    if depth <= 0 or rnd.random() < 0.3:
+        if names and rnd.random() < 0.6:
+            return rnd.choice(names)
+        return str(rnd.randint(0, 1000))
+    op = rnd.choice(['+', '-', '*', '/', '%', '&', '|', '^', '<<', '>>'])
+    return f'({_expr(rnd, names, depth-1)} {op} {_expr(rnd, names, depth-1)})'
+
+# --------------------------------------------------------------------
+def _cond(rnd: random.Random, names: list[str]) -> str:
+    op = rnd.choice(['==', '!=', '<', '<=', '>', '>='])
+    cond = f'{_expr(rnd, names, 2)} {op} {_expr(rnd, names, 2)}'
+    if rnd.random() < 0.3:
+        cond = f'{cond} && !({rnd.choice(names)} == 0)'
+    return cond
+
+# --------------------------------------------------------------------
+def _block(rnd: random.Random, names: list[str], size: int, depth: int, indent: str) -> list[str]:
+    aout, names = [], names[:]
+
+    for _ in range(size):
+        kind = rnd.random()
+
+        if kind < 0.35 or not names:
+            name = f'v{len(names)}_{depth}'
+            aout.append(f'{indent}var {name} = {_expr(rnd, names, 3)} : int;')
+            names.append(name)
+        elif kind < 0.65:
+            aout.append(f'{indent}{rnd.choice(names)} = {_expr(rnd, names, 3)};')
+        elif kind < 0.75:
+            aout.append(f'{indent}print({_expr(rnd, names, 2)});')
+        elif kind < 0.9 and depth > 0:
+            aout.append(f'{indent}if ({_cond(rnd, names)}) {{ // then')
+            aout.extend(_block(rnd, names, size // 2, depth-1, indent + '  '))
+            aout.append(f'{indent}}} else {{')
+            aout.extend(_block(rnd, names, size // 2, depth-1, indent + '  '))
+            aout.append(f'{indent}}}')
+        elif depth > 0:
+            aout.append(f'{indent}while ({_cond(rnd, names)}) {{')
+            aout.extend(_block(rnd, names, size // 2, depth-1, indent + '  '))
+            aout.append(f'{indent}  break;')
+            aout.append(f'{indent}}}')
+
+    return aout
+
+# --------------------------------------------------------------------
+def program(nprocs: int, size: int = 20, depth: int = 2, seed: int = 0) -> str:
+    """A program with `nprocs` procedures (plus `main`) of `size`
+    statements each, with blocks nested up to `depth` levels."""
+
+    rnd  = random.Random(seed)
+    aout = ['var g = 42 : int;', '']
+
+    for i in range(nprocs):
+        aout.append(f'def p{i}(x : int, y : int) : int {{')
+        aout.extend(_block(rnd, ['x', 'y', 'g'], size, depth, '  '))
+        aout.append('  return x + y;')
+        aout.append('}')
+        aout.append('')
+
+    aout.append('def main() {')
+    for i in range(nprocs):
+        aout.append(f'  print(p{i}({i}, g));')
+    aout.append('}')
+
+    return '\n'.join(aout) + '\n'
+
+# --------------------------------------------------------------------
+def program_of_size(nbytes: int, seed: int = 0) -> str:
+    """A program of (roughly) `nbytes` characters."""
+
+    sample = len(program(10, seed = seed)) / 10
+    return program(max(1, round(nbytes / sample)), seed = seed)
@@ -0,0 +1,53 @@
+#! /usr/bin/env python3
+
+# --------------------------------------------------------------------
+# Artifact cache (`bxc.py --cache-dir`): batch compilation of the
+# regression & example programs, with a cold and then a warm cache
+#
+#   python3 benchmarks/cache.py
+
+# --------------------------------------------------------------------
+import glob
+import os
+import subprocess as sp
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+INPUTS = sorted(
+    glob.glob(os.path.join(ROOT, '..', 'lab2', 'starter', 'starter', 'regression', '*.bx')) +
+    glob.glob(os.path.join(ROOT, '..', 'lab2', 'starter', 'starter', 'examples', '*.bx'))
+)
+
+# ====================================================================
+def _main():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manifest = os.path.join(tmpdir, 'manifest.txt')
+        cachedir = os.path.join(tmpdir, 'cache')
+        workdir  = os.path.join(tmpdir, 'work')
+
+        os.makedirs(workdir)
+
+        with open(manifest, 'w') as stream:
+            stream.write('\n'.join(INPUTS) + '\n')
+
+        command = [
+            sys.executable, os.path.join(ROOT, 'bxc.py'),
+            '--manifest', manifest, '--cache-dir', cachedir,
+        ]
+
+        print(f'{len(INPUTS)} inputs')
+
+        for name in ('cold', 'warm'):
+            start = time.perf_counter()
+            sp.run(command, cwd = workdir, stdout = sp.DEVNULL, stderr = sp.DEVNULL)
+            print(f'{name}: {time.perf_counter() - start:6.2f}s')
+
+        sp.run(command[:2] + ['--cache-dir', cachedir, '--cache-stats'])
+
+# --------------------------------------------------------------------
+if __name__ == '__main__':
+    _main()
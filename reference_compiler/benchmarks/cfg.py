@@ -0,0 +1,94 @@
+#! /usr/bin/env python3
+
+# --------------------------------------------------------------------
+# Control-flow graphs (`bxlib.bxcfg`), on large synthetic procedures
+# (blocks with random forward & backward branches, some unreachable):
+# construction (with the predecessors), depth-first orderings (computed
+# vs. cached), and the passes run by the pass manager. The predecessors
+# maintained by the mutations are checked against recomputed ones.
+#
+#   python3 benchmarks/cfg.py [--blocks N]
+
+# --------------------------------------------------------------------
+import argparse
+import collections
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.dirname(HERE))
+
+from bxlib.bxcfg     import CFG, PassManager, tac2cfg, jthreading, uce
+from bxlib.bxcontext import CompilationContext
+from bxlib.bxerrors  import DefaultReporter
+from bxlib.bxtac     import TAC
+
+# ====================================================================
+def procedure(nblocks: int, seed: int = 0) -> list[str | TAC]:
+    rnd  = random.Random(seed)
+    aout = []
+
+    for i in range(nblocks):
+        aout.append(f'.B{i}:')
+        aout.append(TAC('const', [i], f'%{i}'))
+        aout.append(TAC('jz', [f'%{i}', f'.B{rnd.randrange(nblocks)}'], None))
+        if rnd.random() < .1:
+            aout.append(TAC('ret', [], None))   # The next block is unreachable
+        elif rnd.random() < .5:
+            aout.append(TAC('jmp', [f'.B{rnd.randrange(i, nblocks)}'], None))
+
+    aout.append(TAC('ret', [], None))
+    return aout
+
+def check(cfg: CFG):
+    preds = collections.defaultdict(collections.Counter)
+    for source, target in cfg.edges():
+        preds[target][source] += 1
+    for name, node in cfg.cfg.items():
+        assert node.preds == preds[name], f'{name}: the predecessors differ'
+
+# --------------------------------------------------------------------
+def _main():
+    parser = argparse.ArgumentParser(prog = os.path.basename(sys.argv[0]))
+    parser.add_argument('--blocks', type = int, default = 20000, help = 'number of blocks')
+    parser.add_argument('--runs', type = int, default = 5, help = 'number of runs per measure')
+    args = parser.parse_args()
+
+    tac     = procedure(args.blocks)
+    context = CompilationContext(DefaultReporter(source = ''))
+
+    def make() -> CFG:
+        with context.in_procedure('main'):
+            return tac2cfg(tac, context)
+
+    cfg = make()
+
+    print(f'{len(cfg.cfg)} nodes, {len(cfg.edges())} edges')
+
+    def measure(name: str, run, setup = lambda: None):
+        elapsed = 0.
+        for _ in range(args.runs):
+            data  = setup()
+            start = time.perf_counter()
+            run(data)
+            elapsed += time.perf_counter() - start
+        elapsed /= args.runs
+        print(f'{name:18}: {1000 * elapsed:8.2f} ms ({len(cfg.cfg) / elapsed / 1e6:5.2f} M nodes/s)')
+
+    cfg.rpo()
+
+    measure('tac2cfg', lambda _: make())
+    measure('rpo     / computed', lambda x: x.rpo(), make)
+    measure('rpo     / cached', lambda x: x.rpo(), lambda: cfg)
+    measure('passes', lambda x: PassManager(x).run(jthreading, uce), make)
+
+    cfg = PassManager(make()).run(jthreading, uce)
+    check(cfg)
+    assert set(cfg.rpo()) == set(cfg.cfg), 'unreachable nodes left'
+
+# --------------------------------------------------------------------
+if __name__ == '__main__':
+    _main()
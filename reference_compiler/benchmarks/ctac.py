@@ -0,0 +1,93 @@
+#! /usr/bin/env python3
+
+# --------------------------------------------------------------------
+# Compact TAC (`bxlib.bxctac`) vs. TAC objects, on large procedures:
+# memory per instruction, conversions, and the throughput of a use
+# count pass & of the lowering (both forms giving the same assembly).
+#
+#   python3 benchmarks/ctac.py [--size N]
+
+# --------------------------------------------------------------------
+import argparse
+import collections
+import os
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.dirname(HERE))
+
+import bxgen
+import bxlib
+
+from bxlib.bxasmgen import AsmGen
+from bxlib.bxctac   import SIGNATURES, compact
+from bxlib.bxtac    import TACProc
+
+# ====================================================================
+def uses(proc: TACProc) -> dict:
+    aout = collections.Counter()
+    for tac in proc.tac:
+        if not isinstance(tac, str):
+            aout.update(x for x in tac.arguments if isinstance(x, str) and x[0] in '%@')
+    return aout
+
+def cuses(proc) -> list[int]:
+    aout = [0] * len(proc.temps)
+    for opcode, arguments, _ in proc.code:
+        for kind, x in zip(SIGNATURES[opcode], arguments):
+            if kind == 'V' and x >= 0:
+                aout[x] += 1
+    return aout
+
+def memory(make) -> int:
+    tracemalloc.start()
+    try:
+        value = make()
+        return tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+# --------------------------------------------------------------------
+def _main():
+    parser = argparse.ArgumentParser(prog = os.path.basename(sys.argv[0]))
+    parser.add_argument('--size', type = int, default = 5000, help = 'number of statements per procedure')
+    parser.add_argument('--runs', type = int, default = 5, help = 'number of runs per measure')
+    args = parser.parse_args()
+
+    source = bxgen.program(4, size = args.size, depth = 0)
+    procs  = [x for x in bxlib.compile(source, stages = ('tac',)).tac if isinstance(x, TACProc)]
+    cprocs = [compact(x) for x in procs]
+    ninstr = sum(len(x.tac) for x in procs)
+    abk    = AsmGen.get_backend('x64-linux')
+
+    print(f'{len(procs)} procedures, {ninstr} instructions')
+
+    # Memory: the procedures are built from the other form under
+    # tracemalloc (the names & integers of the tables are shared)
+    for name, make in (('TAC', lambda: [x.expand() for x in cprocs]), ('compact', lambda: [compact(x) for x in procs])):
+        print(f'memory  / {name:8}: {memory(make) / ninstr:6.1f} bytes/instruction')
+
+    def measure(name: str, run):
+        start = time.perf_counter()
+        for _ in range(args.runs):
+            aout = run()
+        elapsed = (time.perf_counter() - start) / args.runs
+        print(f'{name:18}: {ninstr / elapsed / 1e6:6.2f} M instructions/s')
+        return aout
+
+    measure('compact', lambda: [compact(x) for x in procs])
+    measure('expand', lambda: [x.expand() for x in cprocs])
+    measure('uses    / TAC', lambda: [uses(x) for x in procs])
+    measure('uses    / compact', lambda: [cuses(x) for x in cprocs])
+
+    asm  = measure('lower   / TAC', lambda: [abk.lower1(x) for x in procs])
+    casm = measure('lower   / compact', lambda: [abk.lower1(x) for x in cprocs])
+
+    assert asm == casm, 'the assemblies differ'
+
+# --------------------------------------------------------------------
+if __name__ == '__main__':
+    _main()
@@ -0,0 +1,165 @@
+#! /usr/bin/env python3
+
+# --------------------------------------------------------------------
+# Deeply nested programs: runs the front-end, the maximal munch and the
+# CFG passes on machine-generated programs with nesting depth N (that
+# used to fail with a `RecursionError`). The programs of `RDPROGRAMS`
+# are also parsed with the recursive-descent parser (`--parser rd`).
+#
+# The results (TAC, or diagnostics for the ill-typed program) are first
+# checked against `deep.json`, the output of the recursive traversals
+# (revision 03f2996) at depth `REFDEPTH`: the temporaries & labels are
+# renumbered in order of appearance (see `canonical`).
+#
+#   python3 benchmarks/deep.py [--depth N]
+
+# --------------------------------------------------------------------
+import argparse
+import json
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.dirname(HERE))
+
+from bxlib.bxcontext   import CompilationContext
+from bxlib.bxerrors    import CollectingReporter
+from bxlib.bxparser    import Parser
+from bxlib.bxrdparser  import RDParser
+from bxlib.bxtychecker import check
+from bxlib.bxmm        import MM
+from bxlib.bxtac       import TAC, TACProc
+from bxlib.bxtacparser import NUMBERED
+from bxlib.bxcfg       import tac2cfg, cfg2tac, uce, jthreading
+
+# ====================================================================
+PROGRAMS = {
+    'sum': lambda n:
+        'def main() { var x = 1 : int;\n'
+        '  x = ' + ' + '.join(['x'] * n) + ';\n'
+        '  print(x);\n}\n',
+
+    'parentheses': lambda n:
+        'def main() { var x = 1 : int;\n'
+        '  x = ' + '(' * n + 'x' + ' + 1)' * n + ';\n'
+        '  print(x);\n}\n',
+
+    'else-if': lambda n:
+        'def main() { var x = 1 : int;\n'
+        '  if (x == 0) { print(0); }' +
+        ''.join(f' else if (x == {i}) {{ print({i}); }}' for i in range(1, n)) +
+        ' else { print(-1); }\n}\n',
+
+    'conjunction': lambda n:
+        'def main() { var x = 1 : int;\n'
+        '  if (' + ' && '.join(['x < 2'] * n) + ') { print(1); }\n}\n',
+
+    'blocks': lambda n:
+        'def main() { var x = 1 : int;\n'
+        '  ' + 'if (x == 1) { ' * n + 'print(x);' + ' }' * n + '\n}\n',
+
+    'negation': lambda n:
+        'def main() { var b = true : bool;\n'
+        '  b = ' + '!' * n + 'b;\n'
+        '  print(b);\n}\n',
+
+    'ill-typed': lambda n:
+        'def main() { var x = 1 : int;\n'
+        '  x = ' + '(x + ' * n + 'true' + ')' * n + ';\n'
+        '  print(x);\n}\n',
+}
+
+RDPROGRAMS = ('sum', 'parentheses', 'negation', 'ill-typed')
+
+REFERENCE = os.path.join(HERE, 'deep.json')
+REFDEPTH  = 20
+
+PARSERS = dict(lalr = Parser, rd = RDParser)
+
+# --------------------------------------------------------------------
+def compile(source: str, parser: str = 'lalr') -> dict:
+    """The TAC of `source`, or its diagnostics"""
+
+    reporter = CollectingReporter(source)
+    prgm     = PARSERS[parser](reporter).parse(source)
+
+    if prgm is None or not check(prgm, reporter):
+        return dict(diagnostics = [
+            [message, position and [list(position.start), list(position.end)]]
+            for message, position in reporter.diagnostics
+        ])
+
+    context = CompilationContext(reporter)
+    tac     = MM.mm(prgm, context)
+
+    for decl in tac:
+        if isinstance(decl, TACProc):
+            with context.in_procedure(decl.name):
+                decl.tac = cfg2tac(uce(jthreading(tac2cfg(decl.tac, context))))
+
+    return dict(tac = canonical(tac))
+
+def canonical(tac: list) -> list[str]:
+    """The lines of `tac`, with its temporaries & labels renumbered in
+    order of appearance"""
+
+    names = { '%': {}, '.': {} }
+
+    def rename(x):
+        if not isinstance(x, str) or NUMBERED.fullmatch(x) is None:
+            return x
+        kind = names[x[0]]
+        return kind.setdefault(x, f'{"%" if x[0] == "%" else ".L"}{len(kind)}')
+
+    aout = []
+
+    for decl in tac:
+        if not isinstance(decl, TACProc):
+            aout.append(repr(decl))
+            continue
+        aout.append(f'proc @{decl.name}({", ".join(map(rename, decl.arguments))}):')
+        for instr in decl.tac:
+            if isinstance(instr, str):
+                aout.append(f'{rename(instr[:-1])}:')
+            else:
+                aout.append(repr(TAC(
+                    instr.opcode, [rename(x) for x in instr.arguments], rename(instr.result)
+                )))
+
+    return aout
+
+# ====================================================================
+def _main():
+    parser = argparse.ArgumentParser(prog = os.path.basename(sys.argv[0]))
+    parser.add_argument('--depth', type = int, default = 100_000, help = 'nesting depth')
+    args = parser.parse_args()
+
+    with open(REFERENCE) as stream:
+        reference = json.load(stream)
+
+    cases = [(name, 'lalr') for name in PROGRAMS] + [(name, 'rd') for name in RDPROGRAMS]
+
+    for name, pname in cases:
+        label = name if pname == 'lalr' else f'{name} (rd)'
+
+        assert compile(PROGRAMS[name](REFDEPTH), pname) == reference[name], \
+            f'{label}: output differs from the reference (depth {REFDEPTH})'
+
+        start  = time.perf_counter()
+        result = compile(PROGRAMS[name](args.depth), pname)
+        delay  = time.perf_counter() - start
+
+        if 'tac' in result:
+            print(f'{label:17}: {delay:6.2f}s, {len(result["tac"])} TAC lines')
+        else:
+            # The same errors as at the reference depth
+            messages = [x[0] for x in result['diagnostics']]
+            assert messages == [x[0] for x in reference[name]['diagnostics']], \
+                f'{label}: diagnostics differ from the reference'
+            print(f'{label:17}: {delay:6.2f}s, {len(messages)} diagnostics')
+
+# --------------------------------------------------------------------
+if __name__ == '__main__':
+    _main()
@@ -0,0 +1,61 @@
+#! /usr/bin/env python3
+
+# --------------------------------------------------------------------
+# Dominators & natural loops (`bxlib.bxdominators`) on large synthetic
+# procedures (see `cfg.py`): computed vs. cached in the CFG, and
+# recomputed after an edit.
+#
+#   python3 benchmarks/dominators.py [--blocks N]
+
+# --------------------------------------------------------------------
+import argparse
+import collections
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.dirname(HERE))
+
+from bxlib.bxcfg        import tac2cfg
+from bxlib.bxcontext    import CompilationContext
+from bxlib.bxdominators import dominators, loops
+from bxlib.bxerrors     import DefaultReporter
+
+from cfg import procedure
+
+# ====================================================================
+def _main():
+    parser = argparse.ArgumentParser(prog = os.path.basename(sys.argv[0]))
+    parser.add_argument('--blocks', type = int, default = 20000, help = 'number of blocks')
+    args = parser.parse_args()
+
+    context = CompilationContext(DefaultReporter(source = ''))
+
+    with context.in_procedure('main'):
+        cfg = tac2cfg(procedure(args.blocks), context)
+
+    def measure(name: str, run):
+        start = time.perf_counter()
+        aout  = run()
+        print(f'{name:20}: {1000 * (time.perf_counter() - start):8.2f} ms')
+        return aout
+
+    print(f'{len(cfg.cfg)} nodes, {len(cfg.rpo())} reachable')
+
+    measure('dominators', lambda: dominators(cfg))
+    measure('dominators / cached', lambda: dominators(cfg))
+    result = measure('loops', lambda: loops(cfg))
+
+    depths = collections.Counter(result.depth(x) for x in cfg.rpo())
+    print(f'{len(result.loops)} loops, blocks per depth: {dict(sorted(depths.items()))}')
+
+    # An edit invalidates the cached results
+    cfg.set_jump(cfg.init, cfg[cfg.init].jump)
+
+    measure('dominators / edited', lambda: dominators(cfg))
+
+# --------------------------------------------------------------------
+if __name__ == '__main__':
+    _main()
@@ -0,0 +1,70 @@
+#! /usr/bin/env python3
+
+# --------------------------------------------------------------------
+# Incremental compilation (`bxc.py --cache-dir`): recompilation of a
+# large generated program after an edit of one of its procedures, with
+# the per-procedure cache vs. from scratch
+#
+#   python3 benchmarks/incremental.py [--procs N]
+
+# --------------------------------------------------------------------
+import argparse
+import os
+import subprocess as sp
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+import bxgen
+
+# ====================================================================
+def _main():
+    parser = argparse.ArgumentParser(prog = os.path.basename(sys.argv[0]))
+    parser.add_argument('--procs', type = int, default = 500, help = 'number of generated procedures')
+    args = parser.parse_args()
+
+    source = bxgen.program(args.procs, size = 10)
+
+    # Edit of the last procedure
+    head, tail = source.split(f'def p{args.procs-1}(')
+    edited = head + f'def p{args.procs-1}(' + tail.replace('return x + y;', 'return x - y;', 1)
+
+    assert edited != source
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cachedir = os.path.join(tmpdir, 'cache')
+        filename = os.path.join(tmpdir, 'input.bx')
+
+        def compile(source: str, *options: str) -> float:
+            with open(filename, 'w') as stream:
+                stream.write(source)
+            start = time.perf_counter()
+            sp.run(
+                [sys.executable, os.path.join(ROOT, 'bxc.py'), *options, filename],
+                cwd = tmpdir, stdout = sp.DEVNULL, stderr = sp.DEVNULL, check = True,
+            )
+            elapsed = time.perf_counter() - start
+            with open(os.path.join(tmpdir, 'input.s'), 'r') as stream:
+                return elapsed, stream.read()
+
+        print(f'{args.procs} procedures, {len(source)} bytes')
+
+        elapsed, _ = compile(source, '--cache-dir', cachedir)
+        print(f'initial (cold cache)  : {elapsed:6.2f}s')
+
+        elapsed, incremental = compile(edited, '--cache-dir', cachedir)
+        print(f'after edit (cache)    : {elapsed:6.2f}s')
+
+        elapsed, scratch = compile(edited)
+        print(f'after edit (no cache) : {elapsed:6.2f}s')
+
+        assert incremental == scratch, 'the incremental assembly differs'
+
+        sp.run([sys.executable, os.path.join(ROOT, 'bxc.py'), '--cache-dir', cachedir, '--cache-stats'])
+
+# --------------------------------------------------------------------
+if __name__ == '__main__':
+    _main()
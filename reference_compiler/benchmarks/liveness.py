@@ -0,0 +1,85 @@
+#! /usr/bin/env python3
+
+# --------------------------------------------------------------------
+# Liveness (`bxlib.bxliveness`) on a large munched procedure (with
+# loops, and a fresh temporary per sub-expression): the bit-vector
+# solver vs. a round-robin solver over sets of names, both giving the
+# same live sets, and the per-instruction walks over all the blocks.
+#
+#   python3 benchmarks/liveness.py [--size N]
+
+# --------------------------------------------------------------------
+import argparse
+import gc
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.dirname(HERE))
+
+import bxgen
+import bxlib
+
+from bxlib.bxcfg      import CFG, tac2cfg
+from bxlib.bxcontext  import CompilationContext
+from bxlib.bxerrors   import DefaultReporter
+from bxlib.bxliveness import Liveness, instructions
+from bxlib.bxtac      import TACProc
+
+# ====================================================================
+def naive(cfg: CFG) -> dict[str, set[str]]:
+    live_in = { x: set() for x in cfg.cfg }
+    changed = True
+
+    while changed:
+        changed = False
+        for name, node in cfg.cfg.items():
+            live = set().union(*(live_in[x] for x in node.targets()))
+            for uses, temp in reversed(list(instructions(node))):
+                live.discard(temp)
+                live.update(uses)
+            if live != live_in[name]:
+                live_in[name], changed = live, True
+
+    return live_in
+
+# --------------------------------------------------------------------
+def _main():
+    parser = argparse.ArgumentParser(prog = os.path.basename(sys.argv[0]))
+    parser.add_argument('--size', type = int, default = 300, help = 'number of statements per block')
+    args = parser.parse_args()
+
+    source  = bxgen.program(1, size = args.size, depth = 1)
+    proc    = max(
+        (x for x in bxlib.compile(source, stages = ('tac',)).tac if isinstance(x, TACProc)),
+        key = lambda x: len(x.tac),
+    )
+    context = CompilationContext(DefaultReporter(source = source))
+
+    with context.in_procedure(proc.name):
+        cfg = tac2cfg(proc.tac, context)
+
+    def measure(name: str, run):
+        gc.collect()
+        start = time.perf_counter()
+        aout  = run()
+        print(f'{name:20}: {1000 * (time.perf_counter() - start):8.1f} ms')
+        return aout
+
+    liveness = measure('bit-vectors', lambda: Liveness(cfg))
+
+    print(f'{len(proc.tac)} instructions, {len(cfg.cfg)} blocks, '
+          f'{len(liveness.temps)} temporaries ({liveness.nglobals} crossing blocks)')
+
+    live_in = measure('sets', lambda: naive(cfg))
+
+    measure('per-instruction', lambda: [liveness.live_outs(x) for x in cfg.cfg])
+
+    for name in cfg.cfg:
+        assert set(liveness.names(liveness.live_in[name])) == live_in[name], f'{name}: the live sets differ'
+
+# --------------------------------------------------------------------
+if __name__ == '__main__':
+    _main()
@@ -0,0 +1,93 @@
+#! /usr/bin/env python3
+
+# --------------------------------------------------------------------
+# Scaling of `bxc.py --jobs N` on a generated corpus
+#
+# Each run compiles the whole corpus in a fresh directory. The outputs
+# (diagnostics, .s/.o/.exe files) of all runs are checked to be the
+# same as the ones of the serial run.
+#
+#   python3 benchmarks/parallel.py [--files N] [--procs N] [--jobs 1,2,4,8]
+
+# --------------------------------------------------------------------
+import argparse
+import filecmp
+import os
+import subprocess as sp
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BXC  = os.path.join(os.path.dirname(HERE), 'bxc.py')
+
+sys.path.insert(0, os.path.dirname(HERE))
+
+import bxgen
+
+# ====================================================================
+def _main():
+    parser = argparse.ArgumentParser(prog = os.path.basename(sys.argv[0]))
+    parser.add_argument('--files', type = int, default = 32, help = 'number of generated inputs')
+    parser.add_argument('--procs', type = int, default = 10, help = 'number of procedures per input')
+    parser.add_argument('--jobs', default = '1,2,4,8', help = 'comma-separated numbers of workers')
+    args = parser.parse_args()
+
+    print(f'{os.cpu_count()} core(s)')
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manifest = os.path.join(tmpdir, 'manifest.txt')
+
+        with open(manifest, 'w') as stream:
+            for i in range(args.files):
+                source = bxgen.program(args.procs, seed = i)
+                # Some rejected inputs, for the diagnostics
+                if i % 8 == 7:
+                    source += 'def error() { x = 0; }\n'
+                filename = os.path.join(tmpdir, f'input{i}.bx')
+                with open(filename, 'w') as bx:
+                    bx.write(source)
+                print(filename, file = stream)
+
+        # All the runs use the same working directory, as the debug
+        # information of the objects records it.
+        workdir = os.path.join(tmpdir, 'work')
+        results = {}
+        serial  = None
+
+        for jobs in map(int, args.jobs.split(',')):
+            os.makedirs(workdir)
+
+            start = time.perf_counter()
+            proc  = sp.run(
+                [sys.executable, BXC, '--manifest', manifest, '--jobs', str(jobs)],
+                cwd = workdir, stdout = sp.PIPE, stderr = sp.PIPE,
+            )
+            results[jobs] = time.perf_counter() - start
+
+            rundir = os.path.join(tmpdir, f'jobs{jobs}')
+            os.rename(workdir, rundir)
+
+            with open(os.path.join(rundir, 'stdout'), 'wb') as stream:
+                stream.write(proc.stdout)
+            with open(os.path.join(rundir, 'stderr'), 'wb') as stream:
+                stream.write(proc.stderr)
+
+            if serial is None:
+                serial = rundir
+            else:
+                cmp = filecmp.dircmp(serial, rundir)
+                _, mismatch, errors = filecmp.cmpfiles(
+                    serial, rundir, cmp.common_files, shallow = False,
+                )
+                assert not (cmp.left_only or cmp.right_only or mismatch or errors), \
+                    f'--jobs {jobs}: outputs differ from the serial run'
+
+    base = next(iter(results.values()))
+
+    for jobs, elapsed in results.items():
+        print(f'--jobs {jobs}: {elapsed:6.2f}s, speedup {base / elapsed:4.2f}')
+
+# --------------------------------------------------------------------
+if __name__ == '__main__':
+    _main()
@@ -0,0 +1,49 @@
+#! /usr/bin/env python3
+
+# --------------------------------------------------------------------
+# Front-end throughput: LALR (ply.yacc) parser vs. hand-written parser
+#
+#   python3 benchmarks/parser.py [--procs N]
+
+# --------------------------------------------------------------------
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bxgen
+
+from bxlib.bxerrors   import DefaultReporter
+from bxlib.bxparser   import Parser
+from bxlib.bxrdparser import RDParser
+
+# ====================================================================
+def _main():
+    parser = argparse.ArgumentParser(prog = os.path.basename(sys.argv[0]))
+    parser.add_argument('--procs', type = int, default = 200, help = 'number of generated procedures')
+    args = parser.parse_args()
+
+    source = bxgen.program(args.procs)
+    nstmts = source.count(';')
+    print(f'input: {len(source) / (1 << 20):.1f} MB, {source.count(chr(10))} lines, ~{nstmts} statements')
+
+    asts = []
+
+    for name, factory in [
+        ('LALR (ply.lex)' , lambda r: Parser(r)),
+        ('LALR (Scanner)' , lambda r: Parser(r, fast_lexer = True)),
+        ('recursive desc.', lambda r: RDParser(r)),
+    ]:
+        reporter = DefaultReporter(source)
+        start    = time.perf_counter()
+        asts.append(factory(reporter).parse(source))
+        elapsed  = time.perf_counter() - start
+        print(f'{name:16}: {elapsed:6.2f}s, {nstmts / elapsed:9.0f} statements/s')
+
+    assert all(ast == asts[0] for ast in asts)
+
+# --------------------------------------------------------------------
+if __name__ == '__main__':
+    _main()
@@ -0,0 +1,60 @@
+#! /usr/bin/env python3
+
+# --------------------------------------------------------------------
+# Cost of the source positions: eager `Range`s vs. packed offsets
+# (`Span`s) vs. no positions at all
+#
+#   python3 benchmarks/positions.py [--procs N]
+
+# --------------------------------------------------------------------
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bxgen
+
+from bxlib.bxerrors   import DefaultReporter
+from bxlib.bxparser   import Parser
+from bxlib.bxrdparser import RDParser
+
+# ====================================================================
+def _main():
+    parser = argparse.ArgumentParser(prog = os.path.basename(sys.argv[0]))
+    parser.add_argument('--procs', type = int, default = 200, help = 'number of generated procedures')
+    args = parser.parse_args()
+
+    source = bxgen.program(args.procs)
+    nstmts = source.count(';')
+    print(f'input: {len(source) / (1 << 20):.1f} MB, ~{nstmts} statements')
+
+    for pname, klass, extra in [
+        ('LALR', Parser  , dict(fast_lexer = True)),
+        ('RD'  , RDParser, dict()),
+    ]:
+        for mode, lazy, tracking in [
+            ('eager', False, True ),
+            ('lazy' , True , True ),
+            ('none' , False, False),
+        ]:
+            reporter = DefaultReporter(source)
+            parser   = klass(reporter, lazy_positions = lazy, **extra)
+
+            start   = time.perf_counter()
+            parser.parse(source, tracking = tracking)
+            elapsed = time.perf_counter() - start
+
+            tracemalloc.start()
+            ast = parser.parse(source, tracking = tracking)
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del ast
+
+            print(f'{pname:4} / {mode:5}: {elapsed:6.2f}s, {nstmts / elapsed:9.0f} statements/s, AST: {memory / (1 << 20):6.1f} MB')
+
+# --------------------------------------------------------------------
+if __name__ == '__main__':
+    _main()
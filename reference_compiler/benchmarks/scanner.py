@@ -0,0 +1,66 @@
+#! /usr/bin/env python3
+
+# --------------------------------------------------------------------
+# Tokens per second: ply.lex based lexer vs. hand-written Scanner
+#
+#   python3 benchmarks/scanner.py [--size MB]
+
+# --------------------------------------------------------------------
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bxgen
+
+from bxlib.bxerrors import DefaultReporter
+from bxlib.bxlexer  import Lexer
+
+# ====================================================================
+def ply_tokens(source: str) -> int:
+    lexer = Lexer(DefaultReporter(source)).lexer
+    lexer.input(source); count = 0
+    while lexer.token() is not None:
+        count += 1
+    return count
+
+# --------------------------------------------------------------------
+def scanner_tokens(source: str) -> int:
+    lexer = Lexer(DefaultReporter(source), fast = True).lexer
+    lexer.input(source); count = 0
+    while lexer.token() is not None:
+        count += 1
+    return count
+
+# --------------------------------------------------------------------
+def scanner_tuples(source: str) -> int:
+    lexer = Lexer(DefaultReporter(source), fast = True).lexer
+    count = 0
+    for _ in lexer.tokens(source):
+        count += 1
+    return count
+
+# ====================================================================
+def _main():
+    parser = argparse.ArgumentParser(prog = os.path.basename(sys.argv[0]))
+    parser.add_argument('--size', type = float, default = 4, help = 'input size in MB')
+    args = parser.parse_args()
+
+    source = bxgen.program_of_size(int(args.size * (1 << 20)))
+    print(f'input: {len(source) / (1 << 20):.1f} MB')
+
+    for name, bench in [
+        ('ply.lex (LexToken)'     , ply_tokens    ),
+        ('Scanner (LexToken)'     , scanner_tokens),
+        ('Scanner.tokens (tuples)', scanner_tuples),
+    ]:
+        start   = time.perf_counter()
+        count   = bench(source)
+        elapsed = time.perf_counter() - start
+        print(f'{name:24}: {count} tokens in {elapsed:6.2f}s, {count / elapsed / 1e6:5.2f} Mtokens/s')
+
+# --------------------------------------------------------------------
+if __name__ == '__main__':
+    _main()
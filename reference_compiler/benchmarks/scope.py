@@ -0,0 +1,139 @@
+#! /usr/bin/env python3
+
+# --------------------------------------------------------------------
+# Scope lookups on procedures with deeply nested blocks & many locals
+#
+#  - scope  : replays the scope operations of such a procedure on the
+#             flat `Scope` and on the former list-of-dicts scope,
+#  - compile: type checking & maximal munch of the procedure.
+#
+#   python3 benchmarks/scope.py [--depth N] [--locals N]
+
+# --------------------------------------------------------------------
+import argparse
+import contextlib as cl
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bxlib.bxerrors    import DefaultReporter
+from bxlib.bxparser    import Parser
+from bxlib.bxscope     import Scope
+from bxlib.bxtychecker import check
+from bxlib.bxmm        import MM
+
+# ====================================================================
+class ListScope:
+    """The former scope implementation: a stack of dictionaries"""
+
+    def __init__(self):
+        self.vars = [dict()]
+
+    def open(self):
+        self.vars.append(dict())
+
+    def close(self):
+        self.vars.pop()
+
+    def push(self, name, data):
+        assert(name not in self.vars[-1])
+        self.vars[-1][name] = data
+
+    def islocal(self, name):
+        return name in self.vars[-1]
+
+    def __getitem__(self, name):
+        for s in self.vars[::-1]:
+            if name in s:
+                return s[name]
+        assert(False)
+
+    def __contains__(self, name):
+        return any(name in s for s in self.vars)
+
+    @cl.contextmanager
+    def in_subscope(self):
+        self.open()
+        try:
+            yield self
+        finally:
+            self.close()
+
+# --------------------------------------------------------------------
+def program(depth: int, nlocals: int, seed: int = 0) -> str:
+    """`main` with `depth` nested blocks, each one declaring `nlocals`
+    variables that are computed from variables of the enclosing blocks"""
+
+    rnd, aout, names = random.Random(seed), ['def main() {'], ['x']
+
+    aout.append('var x = 1 : int;')
+
+    for d in range(depth):
+        aout.append('{')
+        level = []
+        for i in range(nlocals):
+            name = f'v{d}_{i}'
+            aout.append(f'var {name} = {rnd.choice(names)} + {rnd.choice(names)} : int;')
+            level.append(name)
+        names.extend(level)
+        aout.append(f'x = x + {rnd.choice(names)};')
+
+    aout.append('print(x);')
+    aout.append('}' * depth)
+    aout.append('}')
+
+    return '\n'.join(aout) + '\n'
+
+# --------------------------------------------------------------------
+def replay(klass, depth: int, nlocals: int, seed: int = 0) -> int:
+    rnd, scope, names = random.Random(seed), klass(), ['x']
+
+    scope.push('x', 0)
+
+    for d in range(depth):
+        scope.open()
+        for i in range(nlocals):
+            name = f'v{d}_{i}'
+            for _ in range(2):
+                other = rnd.choice(names)
+                assert(other in scope); scope[other]
+            assert(not scope.islocal(name))
+            scope.push(name, d)
+            names.append(name)
+        scope['x']
+
+    for _ in range(depth):
+        scope.close()
+
+# ====================================================================
+def _main():
+    parser = argparse.ArgumentParser(prog = os.path.basename(sys.argv[0]))
+    parser.add_argument('--depth' , type = int, default = 2000, help = 'number of nested blocks')
+    parser.add_argument('--locals', type = int, default = 5, help = 'number of locals per block')
+    args = parser.parse_args()
+
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10 * args.depth))
+
+    for name, klass in [('list of dicts', ListScope), ('flat', Scope)]:
+        start = time.perf_counter()
+        replay(klass, args.depth, args.locals)
+        print(f'scope   / {name:13}: {time.perf_counter() - start:6.2f}s')
+
+    source   = program(args.depth, args.locals)
+    reporter = DefaultReporter(source)
+    prgm     = Parser(reporter).parse(source)
+
+    start = time.perf_counter()
+    assert(check(prgm, reporter))
+    middle = time.perf_counter()
+    MM.mm(prgm)
+    end = time.perf_counter()
+
+    print(f'compile / type checking: {middle - start:6.2f}s, maximal munch: {end - middle:6.2f}s')
+
+# --------------------------------------------------------------------
+if __name__ == '__main__':
+    _main()
@@ -0,0 +1,83 @@
+#! /usr/bin/env python3
+
+# --------------------------------------------------------------------
+# Latency of the compile server (`bxc.py --serve` + bxclient.py) vs.
+# one bxc.py process per compilation
+#
+# Both a program rejected by the type checker (no back-end, no gcc)
+# and a generated, valid, program are compiled. The median wall-clock
+# times of the commands are reported, followed by the latency
+# percentiles measured by the server itself.
+#
+#   python3 benchmarks/server.py [--runs N]
+
+# --------------------------------------------------------------------
+import argparse
+import json
+import os
+import socket
+import subprocess as sp
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+sys.path.insert(0, ROOT)
+
+import bxgen
+
+from startup import PROGRAM as REJECTED, wallclock
+
+# ====================================================================
+def _main():
+    parser = argparse.ArgumentParser(prog = os.path.basename(sys.argv[0]))
+    parser.add_argument('--runs', type = int, default = 10, help = 'number of runs per command')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env  = dict(os.environ, BXC_SOCKET = os.path.join(tmpdir, 'bxc.sock'))
+        bxc  = [sys.executable, os.path.join(ROOT, 'bxc.py')]
+        bxcl = [sys.executable, os.path.join(ROOT, 'bxclient.py')]
+
+        inputs = {
+            'rejected' : REJECTED,
+            'valid'    : bxgen.program(5),
+        }
+
+        for name, source in inputs.items():
+            inputs[name] = os.path.join(tmpdir, f'{name}.bx')
+            with open(inputs[name], 'w') as stream:
+                stream.write(source)
+
+        server = sp.Popen(bxc + ['--serve'], cwd = tmpdir, env = env, stderr = sp.PIPE)
+
+        try:
+            server.stderr.readline()    # listening on ...
+
+            # bxc.py writes its outputs in the current directory
+            os.environ.update(env)
+            os.chdir(tmpdir)
+
+            for name, filename in inputs.items():
+                for kind, command in [('bxc.py', bxc), ('bxclient.py', bxcl)]:
+                    median = wallclock(command + [filename], args.runs)
+                    print(f'{name:8} {kind:11}: {median:7.1f} ms (median)')
+
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(env['BXC_SOCKET'])
+                sock.sendall(b'{"stats": true}\n')
+                stats = json.loads(sock.makefile('rb').readline())
+
+            print(f'server: {stats["count"]} requests, latency (ms): ' + ', '.join(
+                f'{k} {stats[k]:.1f}' for k in ('p50', 'p90', 'p99', 'max')
+            ))
+
+        finally:
+            server.terminate()
+            server.wait()
+            os.chdir(ROOT)
+
+# --------------------------------------------------------------------
+if __name__ == '__main__':
+    _main()
@@ -0,0 +1,74 @@
+#! /usr/bin/env python3
+
+# --------------------------------------------------------------------
+# SSA form (`bxlib.bxssa`) of a large munched procedure (with nested
+# loops): construction & destruction times, number of phi-functions &
+# of the copies that replace them. The SSA form is checked to define
+# each temporary once.
+#
+#   python3 benchmarks/ssa.py [--size N] [--depth N]
+
+# --------------------------------------------------------------------
+import argparse
+import gc
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.dirname(HERE))
+
+import bxgen
+import bxlib
+
+from bxlib.bxcfg       import tac2cfg, cfg2tac
+from bxlib.bxcontext   import CompilationContext
+from bxlib.bxerrors    import DefaultReporter
+from bxlib.bxssa       import to_ssa, from_ssa, phis
+from bxlib.bxtac       import TACProc
+from bxlib.bxtacparser import counters
+
+# ====================================================================
+def _main():
+    parser = argparse.ArgumentParser(prog = os.path.basename(sys.argv[0]))
+    parser.add_argument('--size', type = int, default = 25, help = 'number of statements per block')
+    parser.add_argument('--depth', type = int, default = 3, help = 'nesting depth of the statements')
+    args = parser.parse_args()
+
+    source  = bxgen.program(1, size = args.size, depth = args.depth)
+    tac     = bxlib.compile(source, stages = ('tac',)).tac
+    proc    = max((x for x in tac if isinstance(x, TACProc)), key = lambda x: len(x.tac))
+    context = CompilationContext(DefaultReporter(source = source))
+
+    context.counters.update(counters(tac))
+
+    def measure(name: str, run):
+        gc.collect()
+        start = time.perf_counter()
+        aout  = run()
+        print(f'{name:10}: {1000 * (time.perf_counter() - start):8.1f} ms')
+        return aout
+
+    with context.in_procedure(proc.name):
+        cfg = measure('tac2cfg', lambda: tac2cfg(proc.tac, context))
+
+        print(f'{len(proc.tac)} instructions, {len(cfg.cfg)} blocks')
+
+        cfg = measure('to_ssa', lambda: to_ssa(cfg, context))
+
+        defs = [x.result for node in cfg.cfg.values() for x in node.body if str(x.result).startswith('%')]
+        assert len(defs) == len(set(defs)), 'a temporary is defined twice'
+
+        nphis  = sum(len(phis(x)) for x in cfg.cfg.values())
+        ninstr = sum(len(x.body) for x in cfg.cfg.values())
+
+        cfg = measure('from_ssa', lambda: from_ssa(cfg, context))
+
+        ncopies = sum(len(x.body) for x in cfg.cfg.values()) - (ninstr - nphis)
+
+        print(f'{nphis} phi-functions, {ncopies} copies, {len(cfg2tac(cfg))} instructions out')
+
+# --------------------------------------------------------------------
+if __name__ == '__main__':
+    _main()
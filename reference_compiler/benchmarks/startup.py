@@ -0,0 +1,139 @@
+#! /usr/bin/env python3
+
+# --------------------------------------------------------------------
+# Startup-time budget for the bxc.py driver.
+#
+# Runs the compiler on a small program that is rejected by the type
+# checker (so that neither the back-end nor gcc run) and reports:
+#
+#  - the median wall-clock time over a number of runs,
+#  - the `-X importtime` breakdown of the modules imported at startup.
+#
+# Both the source tree and the zipapp bundle (see mkbundle.py) are
+# measured. With --check, the run fails if a median wall-clock time
+# exceeds the budget recorded in startup.txt by more than --slack.
+#
+#   python3 benchmarks/startup.py            # print the report
+#   python3 benchmarks/startup.py --update   # rewrite startup.txt
+#   python3 benchmarks/startup.py --check    # enforce the budget
+
+# --------------------------------------------------------------------
+import argparse
+import os
+import re
+import statistics
+import subprocess as sp
+import sys
+import tempfile
+import time
+
+# ====================================================================
+HERE   = os.path.dirname(os.path.abspath(__file__))
+ROOT   = os.path.dirname(HERE)
+REPORT = os.path.join(HERE, 'startup.txt')
+
+PROGRAM = """\
+def main() {
+  var x = 0 : int;
+  y = x + 1;
+}
+"""
+
+# --------------------------------------------------------------------
+def wallclock(command: list[str], runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        sp.run(command, stdout = sp.DEVNULL, stderr = sp.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return 1000 * statistics.median(timings)
+
+# --------------------------------------------------------------------
+def importtime(command: list[str], top: int) -> tuple[float, list[tuple[int, str]]]:
+    command = [command[0], '-X', 'importtime'] + command[1:]
+    stderr  = sp.run(command, stdout = sp.DEVNULL, stderr = sp.PIPE, text = True).stderr
+
+    entries = []
+    for line in stderr.splitlines():
+        m = re.match(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)', line)
+        if m and len(m.group(3)) == 1:          # top-level imports only
+            entries.append((int(m.group(2)), m.group(4)))
+
+    total = sum(x[0] for x in entries) / 1000
+    return total, sorted(entries, reverse = True)[:top]
+
+# --------------------------------------------------------------------
+def report(runs: int, top: int) -> tuple[str, dict[str, float]]:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        source = os.path.join(tmpdir, 'startup.bx')
+        bundle = os.path.join(tmpdir, 'bxc.pyz')
+
+        with open(source, 'w') as stream:
+            stream.write(PROGRAM)
+
+        sp.check_call([sys.executable, os.path.join(ROOT, 'mkbundle.py'), '-o', bundle])
+
+        commands = {
+            'source' : [sys.executable, os.path.join(ROOT, 'bxc.py'), source],
+            'bundle' : [sys.executable, bundle, source],
+        }
+
+        # Warm the parser table cache & the bytecode caches
+        for command in commands.values():
+            sp.run(command, stdout = sp.DEVNULL, stderr = sp.DEVNULL)
+
+        baseline = wallclock([sys.executable, '-c', 'pass'], runs)
+        lines    = [f'python -c pass: {baseline:7.1f} ms (median of {runs})', '']
+        medians  = {}
+
+        for name, command in commands.items():
+            medians[name] = wallclock(command, runs)
+            total, entries = importtime(command, top)
+
+            lines.append(f'{name}: {medians[name]:7.1f} ms (median of {runs}), imports: {total:.1f} ms')
+            for cumulative, module in entries:
+                lines.append(f'  {cumulative/1000:7.1f} ms  {module}')
+            lines.append('')
+
+    return '\n'.join(lines), medians
+
+# --------------------------------------------------------------------
+def budget() -> dict[str, float]:
+    aout = {}
+    with open(REPORT, 'r') as stream:
+        for line in stream:
+            if m := re.match(r'(source|bundle):\s+([\d.]+) ms', line):
+                aout[m.group(1)] = float(m.group(2))
+    return aout
+
+# ====================================================================
+def _main():
+    parser = argparse.ArgumentParser(prog = os.path.basename(sys.argv[0]))
+
+    parser.add_argument('--runs'  , type = int, default = 20, help = 'number of timed runs')
+    parser.add_argument('--top'   , type = int, default = 15, help = 'number of imports to list')
+    parser.add_argument('--update', action = 'store_true', help = f'rewrite {os.path.basename(REPORT)}')
+    parser.add_argument('--check' , action = 'store_true', help = 'fail if over budget')
+    parser.add_argument('--slack' , type = float, default = 1.25, help = 'tolerated slowdown for --check')
+
+    args = parser.parse_args()
+
+    text, medians = report(args.runs, args.top)
+    print(text)
+
+    if args.update:
+        with open(REPORT, 'w') as stream:
+            stream.write(text + '\n')
+
+    if args.check:
+        failed = False
+        for name, limit in budget().items():
+            if medians[name] > limit * args.slack:
+                print(f'{name}: over budget ({medians[name]:.1f} ms > {limit:.1f} ms x {args.slack})')
+                failed = True
+        if failed:
+            exit(1)
+
+# --------------------------------------------------------------------
+if __name__ == '__main__':
+    _main()
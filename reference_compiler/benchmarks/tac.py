@@ -0,0 +1,61 @@
+#! /usr/bin/env python3
+
+# --------------------------------------------------------------------
+# TAC checkpoints (`bxc.py --emit-tac / --from-tac`): compilation of a
+# generated program from its source vs. from its (munched) TAC, in the
+# JSON and textual forms. Resuming from the TAC skips the front-end &
+# the maximal munch, and must give the same assembly.
+#
+#   python3 benchmarks/tac.py [--procs N]
+
+# --------------------------------------------------------------------
+import argparse
+import os
+import subprocess as sp
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+import bxgen
+
+# ====================================================================
+def _main():
+    parser = argparse.ArgumentParser(prog = os.path.basename(sys.argv[0]))
+    parser.add_argument('--procs', type = int, default = 200, help = 'number of generated procedures')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        def bxc(*options: str) -> float:
+            start = time.perf_counter()
+            sp.run(
+                [sys.executable, os.path.join(ROOT, 'bxc.py'), *options],
+                cwd = tmpdir, stdout = sp.DEVNULL, stderr = sp.DEVNULL, check = True,
+            )
+            return time.perf_counter() - start
+
+        def assembly() -> str:
+            with open(os.path.join(tmpdir, 'input.s'), 'r') as stream:
+                return stream.read()
+
+        with open(os.path.join(tmpdir, 'input.bx'), 'w') as stream:
+            stream.write(bxgen.program(args.procs, size = 10))
+
+        for fmt in ('json', 'text'):
+            bxc('--emit-tac', 'mm', '--tac-format', fmt, 'input.bx')
+
+        print(f'{args.procs} procedures')
+
+        elapsed = bxc('input.bx'); reference = assembly()
+        print(f'from source        : {elapsed:6.2f}s')
+
+        for name in ('input.tac.json', 'input.tac'):
+            elapsed = bxc('--from-tac', name)
+            print(f'from {name:14}: {elapsed:6.2f}s')
+            assert assembly() == reference, f'{name}: the assembly differs'
+
+# --------------------------------------------------------------------
+if __name__ == '__main__':
+    _main()
@@ -0,0 +1,80 @@
+#! /usr/bin/env python3
+
+# --------------------------------------------------------------------
+# Concurrent compilations in one process, with one `CompilationContext`
+# per compilation and one warm front-end per thread
+#
+# The outputs (diagnostics & assembly) of the compilations run on a
+# thread pool are checked to be the same as the ones of a serial run.
+# The compilations are CPU-bound: no speedup is expected (GIL), this
+# mostly checks that they do not interfere.
+#
+#   python3 benchmarks/threads.py [--files N] [--threads N]
+
+# --------------------------------------------------------------------
+import argparse
+import concurrent.futures as cf
+import io
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bxc
+import bxgen
+
+from bxlib.bxasmgen  import AsmGen
+from bxlib.bxcontext import CompilationContext
+from bxlib.bxerrors  import DefaultReporter
+from bxlib.bxmm      import MM
+
+# ====================================================================
+ARGS   = argparse.Namespace(parser = 'lalr', positions = 'lazy', backend_jobs = 1)
+_local = threading.local()
+
+def compile(source: str) -> tuple[str, str]:
+    if not hasattr(_local, 'frontend'):
+        _local.frontend = bxc.Frontend(ARGS)
+
+    stream  = io.StringIO()
+    context = CompilationContext(DefaultReporter(source, stream = stream))
+    prgm    = _local.frontend(source, context)
+    asm     = None
+
+    if prgm is not None:
+        asm = AsmGen.get_backend(bxc.BACKEND).join(bxc.backend(MM.mm(prgm, context), context, ARGS))
+
+    return stream.getvalue(), asm
+
+# --------------------------------------------------------------------
+def _main():
+    parser = argparse.ArgumentParser(prog = os.path.basename(sys.argv[0]))
+    parser.add_argument('--files', type = int, default = 64, help = 'number of generated inputs')
+    parser.add_argument('--threads', type = int, default = 8, help = 'number of threads')
+    args = parser.parse_args()
+
+    sources = []
+
+    for i in range(args.files):
+        source = bxgen.program(3, seed = i)
+        if i % 4 == 3:
+            source += 'def error() { x = 0; }\n'
+        sources.append(source)
+
+    start  = time.perf_counter()
+    serial = [compile(x) for x in sources]
+    print(f'serial     : {time.perf_counter() - start:6.2f}s')
+
+    with cf.ThreadPoolExecutor(max_workers = args.threads) as executor:
+        start    = time.perf_counter()
+        threaded = list(executor.map(compile, sources))
+        print(f'{args.threads} threads  : {time.perf_counter() - start:6.2f}s')
+
+    assert threaded == serial, 'concurrent compilations differ from the serial ones'
+    assert serial[3][0] and serial[3][1] is None
+
+# --------------------------------------------------------------------
+if __name__ == '__main__':
+    _main()
@@ -0,0 +1,81 @@
+#! /usr/bin/env python3
+
+# --------------------------------------------------------------------
+# Toolchain (`bxlib.bxtoolchain`):
+#
+#  - linking against the runtime source (compiled at each link) vs.
+#    against the cached runtime object;
+#  - batch compilation: wall-clock time vs. the total time of the
+#    toolchain jobs (`--timings`), that overlap with the passes.
+#
+#   python3 benchmarks/toolchain.py [--files N] [--runs N]
+
+# --------------------------------------------------------------------
+import argparse
+import os
+import re
+import subprocess as sp
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+sys.path.insert(0, ROOT)
+
+import bxgen
+
+from bxlib.bxtoolchain import runtime_object
+
+# ====================================================================
+def _main():
+    parser = argparse.ArgumentParser(prog = os.path.basename(sys.argv[0]))
+    parser.add_argument('--files', type = int, default = 16, help = 'number of generated inputs')
+    parser.add_argument('--runs', type = int, default = 10, help = 'number of links per measure')
+    args = parser.parse_args()
+
+    bxc = os.path.join(ROOT, 'bxc.py')
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manifest = os.path.join(tmpdir, 'manifest.txt')
+
+        with open(manifest, 'w') as stream:
+            for i in range(args.files):
+                filename = os.path.join(tmpdir, f'input{i}.bx')
+                with open(filename, 'w') as bx:
+                    bx.write(bxgen.program(10, seed = i))
+                print(filename, file = stream)
+
+        sp.run([sys.executable, bxc, filename], cwd = tmpdir, check = True, capture_output = True)
+
+        # Links
+        runtimes = {
+            'runtime source'       : os.path.join(ROOT, 'bxlib', 'bxruntime.c'),
+            'cached runtime object': runtime_object(),
+        }
+
+        for name, runtime in runtimes.items():
+            start = time.perf_counter()
+            for _ in range(args.runs):
+                sp.run(
+                    ['gcc', '-g', '-o', 'link.exe', runtime, f'input{args.files-1}.o'],
+                    cwd = tmpdir, check = True, capture_output = True,
+                )
+            print(f'link, {name:21}: {1000 * (time.perf_counter() - start) / args.runs:6.1f} ms')
+
+        # Batch
+        start = time.perf_counter()
+        proc  = sp.run(
+            [sys.executable, bxc, '--timings', '--manifest', manifest],
+            cwd = tmpdir, check = True, capture_output = True, text = True,
+        )
+        elapsed = time.perf_counter() - start
+
+        jobs = sum(float(x) for x in re.findall(r'^(?:assemble|link) .*: ([\d.]+) ms$', proc.stdout, re.M))
+
+        print(f'batch of {args.files}: {elapsed:6.2f}s wall-clock, {jobs / 1000:6.2f}s of toolchain jobs')
+
+# --------------------------------------------------------------------
+if __name__ == '__main__':
+    _main()
@@ -0,0 +1,52 @@
+#! /usr/bin/env python3
+
+# --------------------------------------------------------------------
+# Throughput of the `Visitor`-based passes (type checking & maximal
+# munch), in AST nodes visited per second, on a generated program
+#
+#   python3 benchmarks/visitor.py [--procs N] [--repeat N]
+
+# --------------------------------------------------------------------
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import astmem
+import bxgen
+
+from bxlib.bxerrors    import DefaultReporter
+from bxlib.bxmm        import MM
+from bxlib.bxrdparser  import RDParser
+from bxlib.bxtychecker import check
+
+# ====================================================================
+def _main():
+    parser = argparse.ArgumentParser(prog = os.path.basename(sys.argv[0]))
+    parser.add_argument('--procs' , type = int, default = 100, help = 'number of generated procedures')
+    parser.add_argument('--repeat', type = int, default = 3  , help = 'number of runs (best is kept)')
+    args = parser.parse_args()
+
+    source   = bxgen.program(args.procs)
+    reporter = DefaultReporter(source)
+    ast      = RDParser(reporter).parse(source)
+    nodes    = astmem.count(ast)
+
+    print(f'input: {nodes} AST nodes')
+
+    for name, run in [
+        ('type checking', lambda: check(ast, reporter)),
+        ('maximal munch', lambda: MM.mm(ast)),
+    ]:
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            run()
+            best  = min(best, time.perf_counter() - start)
+        print(f'{name}: {best:6.2f}s, {nodes / best:9.0f} nodes/s')
+
+# --------------------------------------------------------------------
+if __name__ == '__main__':
+    _main()
@@ -0,0 +1,112 @@
+#! /usr/bin/env python3
+
+# --------------------------------------------------------------------
+# Tokens per second: LRParser.parse vs. LRParser.parseopt (ply.yacc)
+#
+# Two measures are given:
+#
+#  - engine: the parser runs on a pre-lexed token list, with no-op
+#    grammar actions (only the LR engine is measured),
+#  - full: the BX parser, with its actual lexer and grammar actions.
+#
+#   python3 benchmarks/yacc.py [--procs N] [--runs N]
+
+# --------------------------------------------------------------------
+import argparse
+import copy
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bxgen
+
+from bxlib.bxerrors import DefaultReporter
+from bxlib.bxparser import Parser
+
+# ====================================================================
+class TokenList:
+    """A (ply.lex compatible) lexer that replays a list of tokens"""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.lineno = 1
+        self.lexpos = 0
+
+    def input(self, data):
+        self.token = iter(self.tokens).__next__
+
+    def token(self):
+        return None
+
+# --------------------------------------------------------------------
+def engine(parser):
+    """A copy of `parser` whose grammar actions do nothing"""
+
+    def noop(p):
+        pass
+
+    parser = copy.copy(parser)
+    parser.productions = [copy.copy(p) for p in parser.productions]
+    for p in parser.productions:
+        p.callable = noop
+    return parser
+
+# --------------------------------------------------------------------
+def best_of(runs: int, prepare, run) -> float:
+    best = float('inf')
+    for _ in range(runs):
+        prepare()
+        start = time.perf_counter()
+        run()
+        best  = min(best, time.perf_counter() - start)
+    return best
+
+# ====================================================================
+def _main():
+    parser = argparse.ArgumentParser(prog = os.path.basename(sys.argv[0]))
+    parser.add_argument('--procs', type = int, default = 200, help = 'number of generated procedures')
+    parser.add_argument('--runs' , type = int, default = 3, help = 'number of timed runs (best is kept)')
+    args = parser.parse_args()
+
+    source = bxgen.program(args.procs)
+
+    # The (fast) Scanner is used, so that the lexer does not dominate
+    bxparser = Parser(DefaultReporter(source), fast_lexer = True)
+    lexer    = bxparser.lexer.lexer
+
+    lexer.input(source); tokens = []
+    while (token := lexer.token()) is not None:
+        tokens.append(token)
+    tokens.append(None)
+
+    count = len(tokens) - 1
+
+    print(f'input: {len(source) / (1 << 20):.1f} MB, {count} tokens')
+
+    def reset():
+        bxparser.lexer.bol = [0]
+        lexer.lineno = 1
+
+    nolexer = TokenList(tokens)
+    noact   = engine(bxparser.parser)
+    asts    = []
+
+    for name in ('parse', 'parseopt'):
+        entry = getattr(noact, name)
+        best  = best_of(args.runs, lambda: None,
+                        lambda: entry('', lexer = nolexer, tracking = True))
+        print(f'engine / {name:8}: {best:6.2f}s, {count / best / 1e3:7.1f} Ktokens/s')
+
+    for name in ('parse', 'parseopt'):
+        entry = getattr(bxparser.parser, name)
+        best  = best_of(args.runs, reset,
+                        lambda: asts.append(entry(source, lexer = lexer, tracking = True)))
+        print(f'full   / {name:8}: {best:6.2f}s, {count / best / 1e3:7.1f} Ktokens/s')
+
+    assert all(ast == asts[0] for ast in asts)
+
+# --------------------------------------------------------------------
+if __name__ == '__main__':
+    _main()
@@ -4,19 +4,29 @@
 # Requires Python3 >= 3.10
 
 # --------------------------------------------------------------------
+# Only the front-end is imported eagerly. The type checker, the
+# middle-end (MM, CFG passes), the back-end and the toolchain are
+# imported on demand, so that rejected programs do not pay for them.
+
 import argparse
+import contextlib as cl
+import dataclasses as dc
 import os
-import subprocess as sp
 import sys
 
-from bxlib.bxast        import *
-from bxlib.bxerrors     import Reporter, DefaultReporter
+from typing import Iterator, Optional as Opt
+
+from bxlib.bxcontext    import CompilationContext
+from bxlib.bxerrors     import DefaultReporter, NullReporter
 from bxlib.bxparser     import Parser
-from bxlib.bxmm         import MM
-from bxlib.bxtychecker  import check as tycheck
-from bxlib.bxasmgen     import AsmGen
-from bxlib.bxtac        import *
-from bxlib.bxcfg        import tac2cfg, cfg2tac, uce, jthreading
+
+# ====================================================================
+# Default socket of the compile server (--serve), see also bxclient.py
+
+def default_socket() -> str:
+    import tempfile
+    return os.environ.get('BXC_SOCKET') or \
+        os.path.join(tempfile.gettempdir(), f'bxc-{os.getuid()}.sock')
 
 # ====================================================================
 # Parse command line arguments
@@ -24,65 +34,768 @@ from bxlib.bxcfg        import tac2cfg, cfg2tac, uce, jthreading
 def parse_args():
     parser = argparse.ArgumentParser(prog = os.path.basename(sys.argv[0]))
 
-    parser.add_argument('input', help = 'input file (.bx)')
+    parser.add_argument('input', nargs = '*', help = 'input files (.bx)')
+    parser.add_argument('--manifest', default = None,
+                        help = 'file listing input files (.bx), one per line '
+                               '(blank lines & lines starting with # are ignored)')
+    parser.add_argument('-j', '--jobs', type = int, default = 1,
+                        help = 'number of worker processes (0: one per core); '
+                               'the diagnostics are reported in input order')
+    parser.add_argument('--backend-jobs', type = int, default = 1,
+                        help = 'number of worker processes for the per-procedure '
+                               'CFG optimizations & lowering (0: one per core)')
+    parser.add_argument('-o', '--output-dir', default = '.',
+                        help = 'directory of the generated files (.s, .o, .exe)')
+    parser.add_argument('--serve', nargs = '?', const = '', default = None, metavar = 'SOCKET',
+                        help = 'run a compile server on the given Unix socket '
+                               '(default: $BXC_SOCKET or bxc-<uid>.sock in the temporary directory); '
+                               'see bxclient.py')
+    parser.add_argument('--cache-dir', default = os.environ.get('BXC_CACHE_DIR'),
+                        help = 'directory of the artifact cache (default: $BXC_CACHE_DIR; '
+                               'no cache if unset)')
+    parser.add_argument('--cache-size', type = int, default = 512, metavar = 'MB',
+                        help = 'size bound of the artifact cache, in MB (LRU eviction)')
+    parser.add_argument('--cache-stats', action = 'store_true',
+                        help = 'report the hits, misses and bytes saved of the artifact cache')
+    parser.add_argument('--timings', action = 'store_true',
+                        help = 'report the duration of the toolchain jobs (assembling, linking)')
+    parser.add_argument('--emit-tac', default = None, choices = ('mm', 'cfg'),
+                        help = 'stop after the middle-end and write the TAC (.tac.json or .tac), '
+                               'as munched (mm) or after the CFG optimizations (cfg)')
+    parser.add_argument('--tac-format', choices = ('json', 'text'), default = 'json',
+                        help = 'format of the TAC written by --emit-tac: '
+                               'lab JSON or the textual form of TACProc/TACVar')
+    parser.add_argument('--from-tac', action = 'store_true',
+                        help = 'the inputs are TAC files (.tac.json, .json or .tac, any of the '
+                               'formats of --tac-format): resume from the CFG optimizations')
+    parser.add_argument('--parser', choices = ('lalr', 'rd'), default = 'lalr',
+                        help = 'parser: LALR (ply.yacc) or hand-written recursive descent')
+    parser.add_argument('--positions', choices = ('eager', 'lazy', 'none'), default = 'lazy',
+                        help = 'source positions of the AST nodes: line/column ranges, '
+                               'packed offsets, or none (the front-end is run again, '
+                               'with positions, if errors are reported)')
 
     aout = parser.parse_args()
 
-    if os.path.splitext(aout.input)[1].lower() != '.bx':
-        parser.error('input filename must end with the .bx extension')
+    if aout.manifest is not None:
+        try:
+            with open(aout.manifest, 'r') as stream:
+                aout.input.extend(
+                    line.strip() for line in stream
+                    if line.strip() and not line.lstrip().startswith('#')
+                )
+        except IOError as e:
+            parser.error(f'cannot read manifest {aout.manifest}: {e}')
+
+    if aout.serve is not None:
+        if aout.input:
+            parser.error('no input file expected with --serve')
+        aout.serve = aout.serve or default_socket()
+
+    elif not aout.input and not aout.cache_stats:
+        parser.error('no input file')
+
+    if aout.cache_stats and aout.cache_dir is None:
+        parser.error('--cache-stats requires a cache directory (--cache-dir)')
+
+    if aout.jobs < 0:
+        parser.error('the number of jobs must be nonnegative')
+    if aout.jobs == 0:
+        aout.jobs = os.cpu_count() or 1
+
+    if aout.backend_jobs < 0:
+        parser.error('the number of back-end jobs must be nonnegative')
+    if aout.backend_jobs == 0:
+        aout.backend_jobs = os.cpu_count() or 1
+
+    for filename in aout.input:
+        if aout.from_tac:
+            if not filename.lower().endswith(TAC_EXTENSIONS):
+                parser.error(f'TAC input filename must end with one of {", ".join(TAC_EXTENSIONS)}: {filename}')
+        elif os.path.splitext(filename)[1].lower() != '.bx':
+            parser.error(f'input filename must end with the .bx extension: {filename}')
+
+    # The outputs of an input are named after its basename, in the
+    # output directory: two inputs with the same basename would write
+    # (concurrently, with -j) the same files
+    basenames = {}
+
+    for i, filename in enumerate(aout.input):
+        if (j := basenames.setdefault(basename_of(filename, aout), i)) != i:
+            parser.error(f'inputs with the same basename: {aout.input[j]}, {filename}')
+
+    # Batch mode: more than one input, or a manifest. Results are then
+    # reported per input.
+    aout.batch = aout.manifest is not None or len(aout.input) > 1
 
     return aout
 
 # ====================================================================
-# Main entry point
+# Front-end: parsing & type checking
+#
+# The parser (and its lexer & tables) is built once, and reused for all
+# the inputs (see `Parser.reset`). A `Frontend` must not be used by two
+# compilations at the same time.
 
-def _main():
-    args = parse_args()
+class Frontend:
+    def __init__(self, args):
+        lazy     = args.positions != 'eager'
+        reporter = NullReporter(source = '')
 
-    try:
-        with open(args.input, 'r') as stream:
-            prgm = stream.read()
+        if args.parser == 'rd':
+            from bxlib.bxrdparser import RDParser
+            self.parser = RDParser(reporter = reporter, lazy_positions = lazy)
+        else:
+            self.parser = Parser(reporter = reporter, lazy_positions = lazy)
 
-    except IOError as e:
-        print(f'cannot read input file {args.input}: {e}')
-        exit(1)
+    def __call__(self, source: str, context: CompilationContext, tracking: bool = True):
+        """Returns the type-checked program, or `None` on error"""
+
+        self.parser.reset(context)
+
+        prgm = self.parser.parse(source, tracking)
+
+        if prgm is None:
+            return None
+
+        from bxlib.bxtychecker import check as tycheck
+
+        if not tycheck(prgm, reporter = context.reporter):
+            return None
+
+        return prgm
+
+# ====================================================================
+# Back-end: CFG optimizations & lowering, per procedure
+#
+# The procedures are independent once the maximal munch has run: their
+# temporaries & labels are numbered per procedure (see
+# `CompilationContext`). With `--backend-jobs N`, they are processed by
+# a pool of workers, that continue the numbering of each procedure where
+# the maximal munch left it. The assemblies are stitched together in the
+# original order (see `AsmGen.join`).
+
+BACKEND  = 'x64-linux'
+PIPELINE = 'jthreading,uce'         # See `bxcfg.optimize`
+
+def backend1(decl, context: CompilationContext) -> list[str]:
+    from bxlib.bxasmgen import AsmGen
+    from bxlib.bxtac    import TACProc
+    from bxlib.bxcfg    import optimize
+
+    if isinstance(decl, TACProc):
+        decl.tac = optimize(decl, context)
+
+    return AsmGen.get_backend(BACKEND).lower1(decl)
+
+def _backend_job(job: tuple) -> list[str]:
+    decl, counter = job
+    context = CompilationContext()
+    context.counters[decl.name] = counter
+    return backend1(decl, context)
+
+_backend_pool = None
+
+def backend(tac: list, context: CompilationContext, args) -> list[list[str]]:
+    """The assembly of each declaration of `tac`"""
+
+    if args.backend_jobs <= 1 or len(tac) <= 1:
+        return [backend1(decl, context) for decl in tac]
+
+    import concurrent.futures as cf
+
+    global _backend_pool
+
+    if _backend_pool is None:
+        _backend_pool = cf.ProcessPoolExecutor(max_workers = args.backend_jobs)
+
+    jobs      = [(decl, context.counters.get(decl.name, -1)) for decl in tac]
+    chunksize = max(1, len(jobs) // (4 * args.backend_jobs))
+
+    return list(_backend_pool.map(_backend_job, jobs, chunksize = chunksize))
+
+# --------------------------------------------------------------------
+# Incremental back-end (with --cache-dir)
+#
+# The assembly of a procedure only depends on its AST, on the signatures
+# of the procedures and on the global variables: it is cached under the
+# hash of these. Only the procedures that miss the cache are munched,
+# optimized and lowered.
+
+def incremental(prgm, context: CompilationContext, cache, args) -> list[list[str]]:
+    from bxlib.bxast       import GlobVarDecl, ProcDecl
+    from bxlib.bxcache     import fingerprint
+    from bxlib.bxmm        import MM
+    from bxlib.bxtychecker import PreTyper
+
+    scope, procs = PreTyper(NullReporter(source = '')).pretype(prgm)
+
+    signatures = repr((
+        sorted(scope.items()),
+        sorted(procs.items()),
+    ))
+
+    mm = MM(context)
+
+    for decl in prgm:
+        if isinstance(decl, GlobVarDecl):
+            mm.for_globvardecl(decl)
+
+    asms    = backend(mm.tac, context, args)
+    nglobs  = len(mm.tac)
+    missing = []                        # (index in `asms`, cache key)
+
+    # The missing procedures are munched now, and compiled in a batch
+    for decl in prgm:
+        if isinstance(decl, ProcDecl):
+            key = cache.key(
+                fingerprint(decl),
+                pipeline   = PIPELINE,
+                backend    = BACKEND,
+                signatures = signatures,
+            )
 
-    reporter = DefaultReporter(source = prgm)
-    prgm = Parser(reporter = reporter).parse(prgm)
+            if (files := cache.lookup(key, kind = 'proc_')) is not None:
+                asms.append(files['asm'].decode().splitlines())
+            else:
+                missing.append((len(asms), key))
+                asms.append(None)
+                mm.for_procdecl(decl)
+
+    for (index, key), asm in zip(missing, backend(mm.tac[nglobs:], context, args)):
+        asms[index] = asm
+        cache.store(key, {'asm': '\n'.join(asm).encode()}, evict = False)
+
+    # Not left to the store of the whole program: it is skipped when
+    # the toolchain fails
+    if missing:
+        cache.evict()
+
+    return asms
+
+# ====================================================================
+# Compilation of one input. Returns `True` on success
+#
+# `translate1` runs the passes and writes the assembly. The toolchain
+# (see `bxlib.bxtoolchain`) is then run on the assembly, and `finish1`
+# reports its outputs & caches the artifacts.
+
+@dc.dataclass
+class Assembly:
+    """The assembly of an input, ready for the toolchain"""
+
+    basename : str
+    text     : str
+    cache    : object   = None
+    key      : Opt[str] = None
+
+    def build(self, toolchain, args):
+        return toolchain.build(self.text, self.basename, args.output_dir)
+
+def compile1(filename: str, args, frontend: Frontend, source: Opt[str] = None) -> bool:
+    result = translate1(filename, args, frontend, source)
+
+    if isinstance(result, Assembly):
+        toolchain = toolchain_of(args)
+        result    = finish1(result, toolchain.run(result.build(toolchain, args)), args)
+
+    return result
+
+def translate1(filename: str, args, frontend: Frontend, source: Opt[str] = None) -> bool | Assembly:
+    if source is None:
+        try:
+            with open(filename, 'r') as stream:
+                source = stream.read()
+
+        except IOError as e:
+            print(f'cannot read input file {filename}: {e}')
+            return False
+
+    basename = basename_of(filename, args)
+
+    # The TAC checkpoints (--emit-tac, --from-tac) bypass the cache
+    cache, key = cache_of(args), None
+
+    if args.emit_tac is not None or args.from_tac:
+        cache = None
+
+    if cache is not None:
+        key = cache.key(
+            source,
+            pipeline   = PIPELINE,
+            backend    = BACKEND,
+            basename   = basename,
+            output_dir = os.path.abspath(args.output_dir),
+        )
+
+        if (files := cache.lookup(key)) is not None:
+            return restore(basename, files, args)
+
+    if args.from_tac:
+        context = CompilationContext(DefaultReporter(source = source))
+        tac     = load_tac(source, context)
+
+        if tac is None:
+            return False
+
+        if args.emit_tac is not None:
+            return emit_tac(basename, tac, context, args)
+
+        return assembly(basename, backend(tac, context, args), args)
+
+    prgm = None
+
+    if args.positions == 'none':
+        # Fast path: no positions & no diagnostics. On error, the
+        # front-end is run again (below) to report them.
+        context = CompilationContext(NullReporter(source = source))
+        prgm    = frontend(source, context, tracking = False)
 
     if prgm is None:
-        exit(1)
+        context = CompilationContext(DefaultReporter(source = source))
+        prgm    = frontend(source, context)
 
-    if not tycheck(prgm, reporter = reporter):
-        exit(1)
+    if prgm is None:
+        return False
+
+    from bxlib.bxmm import MM
 
-    tac = MM.mm(prgm)
+    if args.emit_tac is not None:
+        return emit_tac(basename, MM.mm(prgm, context), context, args)
 
-    for decl in tac:
-        match decl:
-            case TACProc(tac = ptac):
-                # We here do TAC -> CFG -> JTHREADING -> UCE -> TAC
-                # Other CFG-based optimizations should be inserted here
-                decl.tac = cfg2tac(uce(jthreading(tac2cfg(ptac))))
+    if cache is not None:
+        asms = incremental(prgm, context, cache, args)
+    else:
+        asms = backend(MM.mm(prgm, context), context, args)
 
-    abk = AsmGen.get_backend('x64-linux')
-    asm = abk.lower(tac)
+    return assembly(basename, asms, args, cache, key)
 
-    basename = os.path.splitext(args.input)[0]
-    basename = os.path.basename(basename)
+# --------------------------------------------------------------------
+def assembly(basename: str, asms: list[list[str]], args, cache = None, key: Opt[str] = None) -> bool | Assembly:
+    from bxlib.bxasmgen import AsmGen
+
+    asm = AsmGen.get_backend(BACKEND).join(asms)
 
     try:
-        with open(f'{basename}.s', 'w') as stream:
+        with open(os.path.join(args.output_dir, f'{basename}.s'), 'w') as stream:
             stream.write(asm)
 
     except IOError as e:
-        print(f'cannot write outpout file {args.output}: {e}')
-        exit(1)
+        print(f'cannot write outpout file {basename}.s: {e}')
+        return False
+
+    return Assembly(basename, asm, cache, key)
+
+def finish1(assembly: Assembly, jobs: list, args) -> bool:
+    # The outputs of the toolchain go through `sys.stdout` / `sys.stderr`,
+    # so that they are captured with the diagnostics (see `_compile_job`)
+    for job in jobs:
+        sys.stdout.write(job.stdout)
+        sys.stderr.write(job.stderr)
+
+    if args.timings:
+        for job in jobs:
+            print(f'{job.name}: {1000 * job.elapsed:.1f} ms')
+
+    cache, basename = assembly.cache, assembly.basename
+
+    if cache is not None and len(jobs) == 2 and all(job.ok for job in jobs):
+        files = {
+            'stdout' : ''.join(job.stdout for job in jobs).encode(),
+            'stderr' : ''.join(job.stderr for job in jobs).encode(),
+        }
+
+        try:
+            for ext in EXTENSIONS:
+                with open(os.path.join(args.output_dir, f'{basename}{ext}'), 'rb') as stream:
+                    files[ext] = stream.read()
+        except IOError:
+            pass
+        else:
+            cache.store(assembly.key, files)
+
+    # A failure of the assembler or of the linker fails the input
+    return all(job.ok for job in jobs)
+
+# --------------------------------------------------------------------
+# Toolchain: one per process, running up to one gcc job per core
+
+_toolchain = None
+
+def toolchain_of(args):
+    global _toolchain
+
+    if _toolchain is None:
+        from bxlib.bxtoolchain import Toolchain
+        _toolchain = Toolchain(jobs = os.cpu_count() or 1)
+
+    return _toolchain
+
+def _reset_toolchain():
+    # A forked worker does not inherit the thread of the event loop
+    global _toolchain
+    _toolchain = None
+
+os.register_at_fork(after_in_child = _reset_toolchain)
+
+# ====================================================================
+# TAC checkpoints (--emit-tac, --from-tac)
+#
+# The TAC is written after the maximal munch or after the CFG passes,
+# and can be read back (in the JSON or textual form, see
+# `bxlib.bxtacparser`) to resume the compilation from the CFG passes.
+
+TAC_EXTENSIONS = ('.tac.json', '.json', '.tac')
 
-    bxruntime = os.path.join(os.path.dirname(__file__), 'bxlib', 'bxruntime.c')
+def basename_of(filename: str, args) -> str:
+    basename = os.path.basename(filename)
 
-    sp.call(['gcc', '-g', '-c', '-o', f'{basename}.o', f'{basename}.s'])
-    sp.call(['gcc', '-g', '-o', f'{basename}.exe', bxruntime, f'{basename}.o'])
+    for ext in (TAC_EXTENSIONS if args.from_tac else ('.bx',)):
+        if basename.lower().endswith(ext):
+            return basename[:-len(ext)]
+
+    return os.path.splitext(basename)[0]
+
+def load_tac(source: str, context: CompilationContext):
+    from bxlib.bxtacparser import TACParser, counters
+
+    tac = TACParser(context.reporter).parse(source)
+
+    if tac is not None:
+        # Fresh temporaries & labels must not clash with the loaded ones
+        context.counters.update(counters(tac))
+
+    return tac
+
+def emit_tac(basename: str, tac: list, context: CompilationContext, args) -> bool:
+    from bxlib.bxtac import TACProc
+    from bxlib.bxcfg import optimize
+
+    if args.emit_tac == 'cfg':
+        for decl in tac:
+            if isinstance(decl, TACProc):
+                decl.tac = optimize(decl, context)
+
+    if args.tac_format == 'json':
+        import json
+        output = f'{basename}.tac.json'
+        text   = json.dumps([decl.tojson() for decl in tac], indent = 2) + '\n'
+    else:
+        output = f'{basename}.tac'
+        text   = ''.join(f'{decl!r}\n' for decl in tac)
+
+    try:
+        with open(os.path.join(args.output_dir, output), 'w') as stream:
+            stream.write(text)
+
+    except IOError as e:
+        print(f'cannot write outpout file {output}: {e}')
+        return False
+
+    return True
+
+# --------------------------------------------------------------------
+EXTENSIONS = ('.s', '.o', '.exe')
+
+def artifacts(filename: str, args) -> list[str]:
+    """Paths of the files generated by `compile1` for `filename`"""
+
+    basename   = basename_of(filename, args)
+    extensions = EXTENSIONS
+
+    if args.emit_tac is not None:
+        extensions = ('.tac.json' if args.tac_format == 'json' else '.tac',)
+
+    return [
+        os.path.abspath(os.path.join(args.output_dir, f'{basename}{ext}'))
+        for ext in extensions
+    ]
+
+# ====================================================================
+# Artifact cache (--cache-dir)
+#
+# On a hit, the artifacts (and the output of the toolchain) are restored
+# from the cache: none of the passes, nor gcc, run.
+
+def cache_of(args):
+    if args.cache_dir is None:
+        return None
+
+    from bxlib.bxcache import ArtifactCache
+
+    return ArtifactCache(args.cache_dir, args.cache_size << 20)
+
+def restore(basename: str, files: dict[str, bytes], args) -> bool:
+    try:
+        for ext in EXTENSIONS:
+            path = os.path.join(args.output_dir, f'{basename}{ext}')
+            with open(path, 'wb') as stream:
+                stream.write(files[ext])
+            if ext == '.exe':
+                os.chmod(path, 0o755)
+
+    except (IOError, KeyError) as e:
+        print(f'cannot restore the cached artifacts of {basename}: {e}')
+        return False
+
+    sys.stdout.write(files.get('stdout', b'').decode())
+    sys.stderr.write(files.get('stderr', b'').decode())
+
+    return True
+
+# ====================================================================
+# Parallel compilation (--jobs)
+#
+# Each worker process holds its own warm `Frontend`s (one per parser
+# configuration). The outputs of a compilation (diagnostics included)
+# are captured in the worker and printed by the main process in input
+# order, so that they are the same as the ones of a serial run.
+
+_frontends: dict[tuple[str, str], Frontend] = {}
+
+def _frontend_of(args) -> Frontend:
+    key = (args.parser, args.positions)
+    if key not in _frontends:
+        _frontends[key] = Frontend(args)
+    return _frontends[key]
+
+def _init_job(args):
+    # Warm-up: parser (tables included) & passes
+    import bxlib.bxtychecker, bxlib.bxmm, bxlib.bxcfg, bxlib.bxasmgen
+    _frontend_of(args)
+
+def _compile_job(filename: str, args, source: Opt[str] = None) -> tuple[bool, str, str]:
+    import io
+
+    stdout, stderr = io.StringIO(), io.StringIO()
+
+    with cl.redirect_stdout(stdout), cl.redirect_stderr(stderr):
+        ok = compile1(filename, args, _frontend_of(args), source)
+
+    return ok, stdout.getvalue(), stderr.getvalue()
+
+def _pipeline(args) -> Iterator[tuple[str, bool]]:
+    # Serial batch: the toolchain of an input runs while the next inputs
+    # are translated. The outputs are captured, and printed in order.
+    import collections
+    import io
+
+    frontend  = Frontend(args)
+    toolchain = toolchain_of(args)
+    pending   = collections.deque()
+
+    def emit():
+        filename, result, future, stdout, stderr = pending.popleft()
+
+        sys.stdout.write(stdout)
+        sys.stderr.write(stderr)
+
+        if future is not None:
+            result = finish1(result, future.result(), args)
+
+        return filename, result
+
+    for filename in args.input:
+        stdout, stderr = io.StringIO(), io.StringIO()
+
+        with cl.redirect_stdout(stdout), cl.redirect_stderr(stderr):
+            result = translate1(filename, args, frontend)
+
+        future = None
+
+        if isinstance(result, Assembly):
+            future = toolchain.submit(result.build(toolchain, args))
+
+        pending.append((filename, result, future, stdout.getvalue(), stderr.getvalue()))
+
+        while pending and (pending[0][2] is None or pending[0][2].done()):
+            yield emit()
+
+    while pending:
+        yield emit()
+
+def compile_all(args) -> Iterator[tuple[str, bool]]:
+    """Compiles all the inputs, yielding the results in input order"""
+
+    if len(args.input) <= 1:
+        frontend = Frontend(args)
+        for filename in args.input:
+            yield filename, compile1(filename, args, frontend)
+        return
+
+    if args.jobs <= 1:
+        yield from _pipeline(args)
+        return
+
+    import concurrent.futures as cf
+    import functools as ft
+
+    # No nested pools: the workers run their back-end serially
+    wargs = argparse.Namespace(**{**vars(args), 'backend_jobs': 1})
+
+    with cf.ProcessPoolExecutor(
+            max_workers = min(args.jobs, len(args.input)),
+            initializer = _init_job,
+            initargs    = (wargs,),
+    ) as executor:
+        results = executor.map(ft.partial(_compile_job, args = wargs), args.input)
+
+        for filename, (ok, stdout, stderr) in zip(args.input, results):
+            sys.stdout.write(stdout)
+            sys.stderr.write(stderr)
+            yield filename, ok
+
+# ====================================================================
+# Compile server (--serve)
+#
+# The server keeps the parser tables & the imported modules warm. It
+# accepts connections on a Unix socket; requests and responses are JSON
+# objects, one per line:
+#
+#   {"input": path, "source": text (optional), "cwd": dir, "options": {...}}
+#     -> {"ok": bool, "stdout": str, "stderr": str, "artifacts": [paths]}
+#   {"stats": true}
+#     -> {"count": n, "p50": ms, "p90": ms, "p99": ms, "max": ms}
+#
+# where "options" may set "parser" and "positions" (as on the command
+# line) and the artifacts are written in "cwd". Compilations run, in
+# order, on one worker thread (or on a pool of `--jobs` processes), so
+# that the event loop keeps serving the other connections.
+
+SERVER_OPTIONS = {
+    'parser'    : ('lalr', 'rd'),
+    'positions' : ('eager', 'lazy', 'none'),
+}
+
+def percentiles(latencies: list[float]) -> dict[str, float]:
+    xs = sorted(latencies)
+
+    def p(q: float) -> float:
+        return round(1000 * xs[min(len(xs) - 1, int(q * len(xs)))], 3) if xs else None
+
+    return dict(count = len(xs), p50 = p(.5), p90 = p(.9), p99 = p(.99), max = p(1.))
+
+async def serve(args):
+    import asyncio
+    import collections
+    import concurrent.futures as cf
+    import json
+    import time
+
+    # No nested pools: the back-end runs serially
+    wargs = argparse.Namespace(**{**vars(args), 'backend_jobs': 1})
+
+    if args.jobs > 1:
+        executor = cf.ProcessPoolExecutor(
+            max_workers = args.jobs, initializer = _init_job, initargs = (wargs,))
+    else:
+        executor = cf.ThreadPoolExecutor(max_workers = 1)
+        _init_job(wargs)
+
+    latencies = collections.deque(maxlen = 10_000)
+
+    async def respond(request: dict) -> dict:
+        if request.get('stats'):
+            return percentiles(list(latencies))
+
+        rargs = argparse.Namespace(**vars(wargs))
+        rargs.output_dir = request.get('cwd', '.')
+
+        for name, value in request.get('options', {}).items():
+            if value not in SERVER_OPTIONS.get(name, ()):
+                raise ValueError(f'invalid option: {name} = {value!r}')
+            setattr(rargs, name, value)
+
+        filename = os.path.join(rargs.output_dir, request['input'])
+
+        ok, stdout, stderr = await asyncio.get_running_loop().run_in_executor(
+            executor, _compile_job, filename, rargs, request.get('source'))
+
+        return dict(
+            ok        = ok,
+            stdout    = stdout,
+            stderr    = stderr,
+            artifacts = artifacts(filename, rargs) if ok else [],
+        )
+
+    async def handle(reader, writer):
+        try:
+            while line := await reader.readline():
+                start = time.perf_counter()
+
+                try:
+                    request  = json.loads(line)
+                    response = await respond(request)
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    response = dict(error = str(e))
+                else:
+                    if 'input' in request:
+                        latencies.append(time.perf_counter() - start)
+
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+
+        except ConnectionError:
+            pass
+
+        finally:
+            writer.close()
+
+    if os.path.exists(args.serve):
+        os.unlink(args.serve)
+
+    server = await asyncio.start_unix_server(handle, path = args.serve)
+
+    print(f'listening on {args.serve}', file = sys.stderr, flush = True)
+
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        executor.shutdown(cancel_futures = True)
+        if os.path.exists(args.serve):
+            os.unlink(args.serve)
+
+# ====================================================================
+# Main entry point
+
+def _main():
+    args    = parse_args()
+    nfailed = 0
+
+    if args.serve is not None:
+        import asyncio
+        import signal
+
+        # SIGTERM stops the server as SIGINT does (removing the socket)
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+        try:
+            asyncio.run(serve(args))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    for filename, ok in compile_all(args):
+        if not ok:
+            nfailed += 1
+        if args.batch:
+            print(f'{filename}: {"ok" if ok else "FAILED"}', flush = True)
+
+    if args.batch:
+        print(f'{len(args.input) - nfailed} compiled, {nfailed} failed')
+
+    if args.cache_stats:
+        stats = cache_of(args).stats()
+        print(
+            f'cache: {stats["hits"]} hits, {stats["misses"]} misses, '
+            f'{stats["saved"]} bytes saved; '
+            f'procedures: {stats["proc_hits"]} hits, {stats["proc_misses"]} misses; '
+            f'{stats["entries"]} entries, {stats["bytes"]} bytes'
+        )
+
+    if nfailed:
+        exit(1)
 
 # --------------------------------------------------------------------
 if __name__ == '__main__':
@@ -0,0 +1,112 @@
+#! /usr/bin/env python3
+
+# --------------------------------------------------------------------
+# Thin client of the BX compile server (`bxc.py --serve`):
+#
+#   python3 bxc.py --serve &
+#   python3 bxclient.py file.bx [...]     # as `python3 bxc.py file.bx [...]`
+#   python3 bxclient.py --stats           # request latency percentiles
+#
+# Only the standard library is imported, so that the start-up time of
+# the client is the one of the interpreter.
+
+# --------------------------------------------------------------------
+import argparse
+import json
+import os
+import socket
+import sys
+
+# ====================================================================
+def default_socket() -> str:
+    # Same as `bxc.default_socket`
+    import tempfile
+    return os.environ.get('BXC_SOCKET') or \
+        os.path.join(tempfile.gettempdir(), f'bxc-{os.getuid()}.sock')
+
+# --------------------------------------------------------------------
+def parse_args():
+    parser = argparse.ArgumentParser(prog = os.path.basename(sys.argv[0]))
+
+    parser.add_argument('input', nargs = '*', help = 'input files (.bx)')
+    parser.add_argument('--socket', default = None,
+                        help = 'socket of the server (default: as `bxc.py --serve`)')
+    parser.add_argument('--stats', action = 'store_true',
+                        help = 'print the request latency percentiles of the server')
+    parser.add_argument('--parser', choices = ('lalr', 'rd'), default = None)
+    parser.add_argument('--positions', choices = ('eager', 'lazy', 'none'), default = None)
+
+    aout = parser.parse_args()
+
+    if not aout.input and not aout.stats:
+        parser.error('no input file')
+
+    for filename in aout.input:
+        if os.path.splitext(filename)[1].lower() != '.bx':
+            parser.error(f'input filename must end with the .bx extension: {filename}')
+
+    aout.socket = aout.socket or default_socket()
+
+    return aout
+
+# ====================================================================
+def _main():
+    args = parse_args()
+
+    try:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(args.socket)
+    except OSError as e:
+        print(f'cannot connect to the compile server at {args.socket}: {e}', file = sys.stderr)
+        exit(2)
+
+    options = {
+        k: v for k, v in (('parser', args.parser), ('positions', args.positions))
+        if v is not None
+    }
+
+    with sock, sock.makefile('rwb') as stream:
+        def request(**kw) -> dict:
+            stream.write(json.dumps(kw).encode() + b'\n')
+            stream.flush()
+            response = stream.readline()
+            if not response:
+                print('connection closed by the compile server', file = sys.stderr)
+                exit(2)
+            response = json.loads(response)
+            if 'error' in response:
+                print(f'compile server: {response["error"]}', file = sys.stderr)
+                exit(2)
+            return response
+
+        if args.stats:
+            stats = request(stats = True)
+            print(f'{stats["count"]} requests', end = '')
+            if stats['count']:
+                print(', latency (ms): ' + ', '.join(
+                    f'{k} {stats[k]:.1f}' for k in ('p50', 'p90', 'p99', 'max')
+                ), end = '')
+            print()
+
+        nfailed = 0
+
+        for filename in args.input:
+            response = request(input = filename, cwd = os.getcwd(), options = options)
+
+            sys.stdout.write(response['stdout'])
+            sys.stderr.write(response['stderr'])
+
+            if not response['ok']:
+                nfailed += 1
+            if len(args.input) > 1:
+                print(f'{filename}: {"ok" if response["ok"] else "FAILED"}', flush = True)
+
+        if len(args.input) > 1:
+            print(f'{len(args.input) - nfailed} compiled, {nfailed} failed')
+
+    if nfailed:
+        exit(1)
+
+# --------------------------------------------------------------------
+if __name__ == '__main__':
+    _main()
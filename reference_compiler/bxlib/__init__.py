@@ -0,0 +1,11 @@
+# --------------------------------------------------------------------
+# In-memory compilation API (see bxcompile.py). It is imported on first
+# use, so that importing a single module of the package stays cheap.
+
+__all__ = ('compile', 'CompilationResult', 'Diagnostic', 'STAGES', 'OPT_LEVELS')
+
+def __getattr__(name: str):
+    if name in __all__:
+        from . import bxcompile
+        return getattr(bxcompile, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
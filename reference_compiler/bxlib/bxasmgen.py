@@ -1,7 +1,8 @@
 # --------------------------------------------------------------------
 import abc
 
-from .bxtac import *
+from .bxctac import CompactProc, Opcode
+from .bxtac  import *
 
 # --------------------------------------------------------------------
 class AsmGen(abc.ABC):
@@ -10,10 +11,14 @@ class AsmGen(abc.ABC):
     def __init__(self):
         self._tparams = dict()
         self._temps   = dict()
+        self._symbols = []              # Compact TAC (see `bxctac`)
         self._asm     = []
 
     def _temp(self, temp):
-        if temp.startswith('@'):
+        if isinstance(temp, int):
+            if temp < 0:
+                return self._format_temp(self._symbols[-1-temp][1:])
+        elif temp.startswith('@'):
             return self._format_temp(temp[1:])
         if temp in self._tparams:
             return self._format_param(self._tparams[temp])
@@ -208,7 +213,7 @@ class AsmGen_x64_Linux(AsmGen):
         self._emit('jmp', self._endlbl)
 
     @classmethod
-    def lower1(cls, tac: TACProc | TACVar) -> list[str]:
+    def lower1(cls, tac: TACProc | CompactProc | TACVar) -> list[str]:
         emitter = cls()
 
         match tac:
@@ -232,27 +237,76 @@ class AsmGen_x64_Linux(AsmGen):
                 for instr in ptac:
                     emitter(instr)
 
-                nvars  = len(emitter._temps)
-                nvars += nvars & 1
-
-                return [
-                    emitter._get_asm('.text'),
-                    emitter._get_asm('.globl', name),
-                    emitter._get_label(name),
-                    emitter._get_asm('pushq', '%rbp'),
-                    emitter._get_asm('movq', '%rsp', '%rbp'),
-                    emitter._get_asm('subq', f'${8*nvars}', '%rsp'),
-                ] + emitter._asm + [
-                    emitter._get_label(emitter._endlbl),
-                    emitter._get_asm('movq', '%rbp', '%rsp'),
-                    emitter._get_asm('popq', '%rbp'),
-                    emitter._get_asm('retq'),
-                ]
+                return emitter._frame(name)
+
+            case CompactProc():
+                emitter._endlbl  = f'.E_{tac.name}'
+                emitter._symbols = tac.symbols
+
+                for i in range(min(6, tac.nargs)):
+                    emitter._emit('movq', emitter.PARAMS[i], emitter._temp(i))
+
+                for i in range(6, tac.nargs):
+                    emitter._tparams[i] = i - 6
+
+                emitters = {
+                    x: getattr(emitter, f'_emit_{x}') for x in Opcode if x != Opcode.LABEL
+                }
+
+                labels, symbols = tac.labels, tac.symbols
+
+                # Only the labels & symbols are decoded
+                decoders = {
+                    Opcode.JMP  : lambda x: (labels[x[0]],),
+                    Opcode.CALL : lambda x: (symbols[x[0]], x[1]),
+                    **{
+                        x: lambda x: (x[0], labels[x[1]])
+                        for x in (Opcode.JZ, Opcode.JNZ, Opcode.JLT, Opcode.JLE, Opcode.JGT, Opcode.JGE)
+                    },
+                }
+
+                for opcode, arguments, result in tac.code:
+                    if opcode == Opcode.LABEL:
+                        emitter._emit_label(labels[arguments[0]])
+                        continue
+
+                    if (decoder := decoders.get(opcode)) is not None:
+                        arguments = decoder(arguments)
+
+                    if result is None:
+                        emitters[opcode](*arguments)
+                    else:
+                        emitters[opcode](*arguments, result)
+
+                return emitter._frame(tac.name)
+
+    def _frame(self, name: str) -> list[str]:
+        # The procedure `name`, with the emitted body
+        nvars  = len(self._temps)
+        nvars += nvars & 1
+
+        return [
+            self._get_asm('.text'),
+            self._get_asm('.globl', name),
+            self._get_label(name),
+            self._get_asm('pushq', '%rbp'),
+            self._get_asm('movq', '%rsp', '%rbp'),
+            self._get_asm('subq', f'${8*nvars}', '%rsp'),
+        ] + self._asm + [
+            self._get_label(self._endlbl),
+            self._get_asm('movq', '%rbp', '%rsp'),
+            self._get_asm('popq', '%rbp'),
+            self._get_asm('retq'),
+        ]
 
     @classmethod
-    def lower(cls, tacs: list[TACProc | TACVar]) -> str:
-        aout = [cls.lower1(tac) for tac in tacs]
-        aout = [x for tac in aout for x in tac]
+    def lower(cls, tacs: list[TACProc | CompactProc | TACVar]) -> str:
+        return cls.join([cls.lower1(tac) for tac in tacs])
+
+    @staticmethod
+    def join(asms: list[list[str]]) -> str:
+        # Assembly of a program, from the `lower1` outputs of its declarations
+        aout = [x for asm in asms for x in asm]
         return "\n".join(aout) + "\n"
 
 AsmGen.BACKENDS['x64-linux'] = AsmGen_x64_Linux
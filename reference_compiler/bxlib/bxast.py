@@ -23,7 +23,35 @@ class Type(enum.Enum):
                 return 'bool'
 
 # --------------------------------------------------------------------
-@dc.dataclass
+class Operator(enum.IntEnum):
+    OPPOSITE                  =  0
+    BITWISE_NEGATION          =  1
+    BOOLEAN_NOT               =  2
+    ADDITION                  =  3
+    SUBTRACTION               =  4
+    MULTIPLICATION            =  5
+    DIVISION                  =  6
+    MODULUS                   =  7
+    LOGICAL_RIGHT_SHIFT       =  8
+    LOGICAL_LEFT_SHIFT        =  9
+    BITWISE_AND               = 10
+    BITWISE_OR                = 11
+    BITWISE_XOR               = 12
+    BOOLEAN_AND               = 13
+    BOOLEAN_OR                = 14
+    CMP_EQUAL                 = 15
+    CMP_NOT_EQUAL             = 16
+    CMP_LOWER_THAN            = 17
+    CMP_LOWER_OR_EQUAL_THAN   = 18
+    CMP_GREATER_THAN          = 19
+    CMP_GREATER_OR_EQUAL_THAN = 20
+
+    def __str__(self):
+        # e.g. `cmp-lower-than`
+        return self.name.lower().replace('_', '-')
+
+# --------------------------------------------------------------------
+@dc.dataclass(slots = True)
 class Range:
     start: tuple[int, int]
     end: tuple[int, int]
@@ -33,125 +61,145 @@ class Range:
         return Range((line, column), (line, column+1))
 
 # --------------------------------------------------------------------
-@dc.dataclass
+@dc.dataclass(slots = True)
+class Span:
+    # A source range, as packed (start, end) character offsets (the end
+    # being exclusive). Lines & columns are only computed when needed,
+    # see `Reporter.range_of`.
+    packed: int
+
+    @staticmethod
+    def of_offsets(start: int, end: int):
+        return Span((start << 32) | end)
+
+    @property
+    def start(self) -> int:
+        return self.packed >> 32
+
+    @property
+    def end(self) -> int:
+        return self.packed & 0xffffffff
+
+# --------------------------------------------------------------------
+@dc.dataclass(slots = True)
 class AST:
-    position: Opt[Range] = dc.field(kw_only = True, default = None)
+    position: Opt[Range | Span] = dc.field(kw_only = True, default = None)
 
 # --------------------------------------------------------------------
-@dc.dataclass
+@dc.dataclass(slots = True)
 class Name(AST):
     value: str
 
 # --------------------------------------------------------------------
-@dc.dataclass
+@dc.dataclass(slots = True)
 class Expression(AST):
     type_: Opt[Type] = dc.field(kw_only = True, default = None)
 
 # --------------------------------------------------------------------
-@dc.dataclass
+@dc.dataclass(slots = True)
 class VarExpression(Expression):
     name: Name
 
 # --------------------------------------------------------------------
-@dc.dataclass
+@dc.dataclass(slots = True)
 class BoolExpression(Expression):
     value: bool
 
 # --------------------------------------------------------------------
-@dc.dataclass
+@dc.dataclass(slots = True)
 class IntExpression(Expression):
     value: int
 
 # --------------------------------------------------------------------
-@dc.dataclass
+@dc.dataclass(slots = True)
 class OpAppExpression(Expression):
-    operator: str
+    operator: Operator
     arguments: list[Expression]
 
 # --------------------------------------------------------------------
-@dc.dataclass
+@dc.dataclass(slots = True)
 class CallExpression(Expression):
     proc: Name
     arguments: list[Expression]
 
 # --------------------------------------------------------------------
-@dc.dataclass
+@dc.dataclass(slots = True)
 class PrintExpression(Expression):
     argument: Expression
 
 # --------------------------------------------------------------------
 class Statement(AST):
-    pass
+    __slots__ = ()
 
 # --------------------------------------------------------------------
-@dc.dataclass
+@dc.dataclass(slots = True)
 class VarDeclStatement(Statement):
     name: Name
     init: Expression
     type_: Type
 
 # --------------------------------------------------------------------
-@dc.dataclass
+@dc.dataclass(slots = True)
 class AssignStatement(Statement):
     lhs: Name
     rhs: Expression
 
 # --------------------------------------------------------------------
-@dc.dataclass
+@dc.dataclass(slots = True)
 class ExprStatement(Statement):
     expression: Expression
 
 # --------------------------------------------------------------------
-@dc.dataclass
+@dc.dataclass(slots = True)
 class PrintStatement(Statement):
     value: Expression
 
 # --------------------------------------------------------------------
-@dc.dataclass
+@dc.dataclass(slots = True)
 class BlockStatement(Statement):
     body: list[Statement]
 
 # --------------------------------------------------------------------
-@dc.dataclass
+@dc.dataclass(slots = True)
 class IfStatement(Statement):
     condition: Expression
     then: Statement
     else_: Opt[Statement] = None
 
 # --------------------------------------------------------------------
-@dc.dataclass
+@dc.dataclass(slots = True)
 class WhileStatement(Statement):
     condition: Expression
     body: Statement
 
 # --------------------------------------------------------------------
-@dc.dataclass
+@dc.dataclass(slots = True)
 class BreakStatement(Statement):
     pass
 
 # --------------------------------------------------------------------
-@dc.dataclass
+@dc.dataclass(slots = True)
 class ContinueStatement(Statement):
     pass
 
 # --------------------------------------------------------------------
-@dc.dataclass
+@dc.dataclass(slots = True)
 class ReturnStatement(Statement):
     expr: Opt[Expression]
 
 # --------------------------------------------------------------------
 class TopDecl(AST):
-    pass
+    __slots__ = ()
 
 # --------------------------------------------------------------------
-@dc.dataclass
+@dc.dataclass(slots = True)
 class GlobVarDecl(TopDecl):
     name: Name
     init: Expression
     type_: Type
 
 #--------------------------------------------------------------------
-@dc.dataclass
+@dc.dataclass(slots = True)
 class ProcDecl(TopDecl):
     name: Name
     arguments: list[tuple[Name, Type]]
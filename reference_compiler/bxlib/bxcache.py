@@ -0,0 +1,250 @@
+# --------------------------------------------------------------------
+import contextlib as cl
+import dataclasses as dc
+import enum
+import fcntl
+import hashlib
+import importlib.resources
+import json
+import os
+import shutil
+import tempfile
+
+from typing import Optional as Opt
+
+from .bxast import AST
+
+# ====================================================================
+# Content-addressed cache of compilation artifacts
+#
+# An entry is a directory named after the hash of everything that
+# determines the artifacts: the source text, the compiler version (a
+# digest of the driver, of the bxlib & ply modules and of the runtime),
+# the pass pipeline, the back-end name, and the names that end up in the
+# artifacts (base name & output directory, recorded by the debug
+# information of the objects). It
+# holds the artifacts (e.g. `.s`, `.o`, `.exe`) plus the output of the
+# toolchain. Entries are evicted in LRU order (last use = mtime of the
+# entry) once the cache exceeds its size bound.
+#
+# The cache also holds the assembly of single procedures, keyed by the
+# fingerprint of their AST (see `fingerprint`) and the signatures of the
+# program (see `bxc.py`): only the procedures that changed are compiled
+# again.
+#
+# Statistics (hits, misses, bytes saved) are kept in `stats.json`. The
+# updates of the statistics and the evictions are serialized with a
+# lock file, so that concurrent compilers can share a cache.
+
+_version = None
+
+def compiler_version() -> str:
+    global _version
+
+    if _version is None:
+        digest = hashlib.sha256()
+        files  = importlib.resources.files(__package__)
+
+        # The driver (`bxc.py`, that holds the pass pipeline) & the parser
+        # generator (`ply`) determine the artifacts as well. They are read
+        # as resources, so that this works from the zipapp.
+        sources = [
+            ('', x) for x in files.parent.iterdir() if x.name in ('bxc.py', 'bxc.pyc')
+        ] + [
+            (package, x)
+            for package in (__package__, 'ply')
+            for x in importlib.resources.files(package).iterdir()
+        ]
+
+        for package, entry in sorted(sources, key = lambda x: (x[0], x[1].name)):
+            if entry.name.endswith(('.py', '.pyc', '.c')):
+                name = f'{package}/{entry.name}'
+                digest.update(name.encode() + b'\0' + entry.read_bytes())
+
+        _version = digest.hexdigest()
+
+    return _version
+
+# --------------------------------------------------------------------
+_END    = object()
+_fields = {}
+
+def fingerprint(node: AST) -> str:
+    """Digest of an AST, positions excluded"""
+
+    aout = []
+    todo = [node]
+
+    # Pre-order traversal, with an explicit stack (deep ASTs)
+    while todo:
+        node  = todo.pop()
+        klass = type(node)
+
+        if node is _END:
+            aout.append(')')
+
+        elif klass in (list, tuple):
+            aout.append('[')
+            todo.append(_END)
+            todo.extend(reversed(node))
+
+        elif isinstance(node, AST):
+            if klass not in _fields:
+                _fields[klass] = [x.name for x in dc.fields(klass) if x.name != 'position'][::-1]
+            aout.append(klass.__name__)
+            todo.append(_END)
+            todo.extend([getattr(node, x) for x in _fields[klass]])
+
+        elif isinstance(node, enum.Enum):
+            aout.append(f'{klass.__name__}.{node._name_}')
+
+        else:
+            aout.append(repr(node))
+
+    return hashlib.sha256('\0'.join(aout).encode()).hexdigest()
+
+# --------------------------------------------------------------------
+class ArtifactCache:
+    STATS = 'stats.json'
+    LOCK  = 'lock'
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+        os.makedirs(os.path.join(directory, 'entries'), exist_ok = True)
+
+    @staticmethod
+    def key(source: str, **config: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(compiler_version().encode())
+        for name, value in sorted(config.items()):
+            digest.update(f'\0{name}={value}'.encode())
+        digest.update(b'\0' + source.encode())
+        return digest.hexdigest()
+
+    def _entry(self, key: str) -> str:
+        return os.path.join(self.directory, 'entries', key)
+
+    @cl.contextmanager
+    def _locked(self):
+        with open(os.path.join(self.directory, self.LOCK), 'a') as stream:
+            fcntl.flock(stream, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(stream, fcntl.LOCK_UN)
+
+    # ----------------------------------------------------------------
+    def lookup(self, key: str, kind: str = '') -> Opt[dict[str, bytes]]:
+        """The files of the entry `key` (by name), `None` on a miss"""
+
+        # The hits & misses are counted per kind of entries (e.g. `proc_`)
+
+        entry = self._entry(key)
+        files = None
+
+        try:
+            files = {}
+            for name in os.listdir(entry):
+                with open(os.path.join(entry, name), 'rb') as stream:
+                    files[name] = stream.read()
+            os.utime(entry)
+
+        except OSError:
+            files = None
+
+        self._record(
+            kind  = kind,
+            hits  = files is not None,
+            saved = sum(map(len, files.values())) if files is not None else 0,
+        )
+
+        return files
+
+    def store(self, key: str, files: dict[str, bytes], evict: bool = True):
+        entry = self._entry(key)
+
+        if os.path.isdir(entry):
+            return
+
+        # Entries are created atomically (written aside, then renamed)
+        tmpdir = tempfile.mkdtemp(dir = self.directory, prefix = 'tmp-')
+
+        try:
+            for name, contents in files.items():
+                with open(os.path.join(tmpdir, name), 'wb') as stream:
+                    stream.write(contents)
+            os.rename(tmpdir, entry)
+
+        except OSError:
+            shutil.rmtree(tmpdir, ignore_errors = True)
+            return
+
+        # Batches of stores (e.g. procedures) call `evict` once, at the end
+        if evict:
+            self.evict()
+
+    def evict(self):
+        with self._locked():
+            entries = []
+
+            for key in os.listdir(os.path.join(self.directory, 'entries')):
+                entry = self._entry(key)
+                try:
+                    size = sum(
+                        os.path.getsize(os.path.join(entry, x)) for x in os.listdir(entry)
+                    )
+                    entries.append((os.path.getmtime(entry), size, entry))
+                except OSError:
+                    pass
+
+            total = sum(x[1] for x in entries)
+
+            for _, size, entry in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(entry, ignore_errors = True)
+                total -= size
+
+    # ----------------------------------------------------------------
+    def stats(self) -> dict[str, int]:
+        try:
+            with open(os.path.join(self.directory, self.STATS), 'r') as stream:
+                stats = json.load(stream)
+        except (OSError, ValueError):
+            stats = {}
+
+        stats = {
+            k: stats.get(k, 0)
+            for k in ('hits', 'misses', 'saved', 'proc_hits', 'proc_misses')
+        }
+
+        entries = os.path.join(self.directory, 'entries')
+        stats['entries'] = 0
+        stats['bytes'  ] = 0
+
+        for key in os.listdir(entries):
+            stats['entries'] += 1
+            for name in os.listdir(os.path.join(entries, key)):
+                stats['bytes'] += os.path.getsize(os.path.join(entries, key, name))
+
+        return stats
+
+    def _record(self, kind: str, hits: bool, saved: int):
+        with self._locked():
+            path = os.path.join(self.directory, self.STATS)
+
+            try:
+                with open(path, 'r') as stream:
+                    stats = json.load(stream)
+            except (OSError, ValueError):
+                stats = {}
+
+            name = kind + ('hits' if hits else 'misses')
+            stats[name] = stats.get(name, 0) + 1
+            stats['saved'] = stats.get('saved', 0) + saved
+
+            with open(path + '.tmp', 'w') as stream:
+                json.dump(stats, stream)
+            os.replace(path + '.tmp', path)
@@ -1,6 +1,10 @@
 # --------------------------------------------------------------------
-from .bxtac import *
-from .bxmm  import MM
+import collections
+
+from typing import Callable, Iterable
+
+from .bxcontext import CompilationContext
+from .bxtac     import *
 
 # --------------------------------------------------------------------
 class CFGNode:
@@ -9,15 +13,199 @@ class CFGNode:
         self.body   = []        # Basic block body (excluding labels, (c)jumps & ret)
         self.cjumps = []        # conditional jumps
         self.jump   = None      # Final jump (if the block terminates with "ret", it is set to False)
+        self.preds  = collections.Counter()     # Predecessors (-> number of edges), see `CFG`
+
+    def targets(self) -> list[str]:
+        """The targets of the (c)jumps, in order, with repetitions"""
+        aout = [cjump[1][1] for cjump in self.cjumps]
+        if self.jump is not None and self.jump[0] == 'jmp':
+            aout.append(self.jump[1])
+        return aout
+
+    @property
+    def succs(self) -> list[str]:
+        return list(dict.fromkeys(self.targets()))
 
 # --------------------------------------------------------------------
+# Control-flow graph
+#
+# The predecessors of the nodes are maintained by the mutation methods
+# (`set_jump`, `set_cjumps`, `retarget`, `set_init`, `add`, `remove`):
+# the passes must not assign the (c)jumps of the nodes directly. The
+# depth-first orderings are computed without recursion, and cached until
+# the next mutation, as the other results that depend on the edges only
+# (e.g. the dominators, see `cached`).
+
 class CFG:
     def __init__(self, init: str, cfg: dict[str, CFGNode]):
-        self.init = init
-        self.cfg  = cfg
+        self.init     = init
+        self.cfg      = cfg
+        self._version = 0       # Incremented by the mutations
+        self._cache   = {}      # Name -> (version, value), see `cached`
+
+        for node in cfg.values():
+            node.preds.clear()
+        for name in cfg:
+            self._link(name)
+
+    def __getitem__(self, name: str) -> CFGNode:
+        return self.cfg[name]
+
+    def _link(self, name: str, count: int = 1):
+        for target in self.cfg[name].targets():
+            if (node := self.cfg.get(target)) is None:
+                continue        # Removed (e.g. unreachable) node
+            node.preds[name] += count
+            if node.preds[name] <= 0:
+                del node.preds[name]
+
+    def _unlink(self, name: str):
+        self._link(name, -1)
+
+    def _mutated(self):
+        self._version += 1
+
+    # ----------------------------------------------------------------
+    def set_jump(self, name: str, jump: tuple):
+        self._unlink(name)
+        self.cfg[name].jump = jump
+        self._link(name)
+        self._mutated()
+
+    def set_cjumps(self, name: str, cjumps: list[tuple]):
+        self._unlink(name)
+        self.cfg[name].cjumps = cjumps
+        self._link(name)
+        self._mutated()
+
+    def retarget(self, name: str, old: str, new: str):
+        """Redirects the edges `name` -> `old` to `new`"""
+
+        node = self.cfg[name]
+
+        if old not in node.targets():
+            return
+
+        self._unlink(name)
+
+        if node.jump[0] == 'jmp' and node.jump[1] == old:
+            node.jump = ('jmp', new)
+        node.cjumps = [
+            (cjump[0], [cjump[1][0], new if cjump[1][1] == old else cjump[1][1]])
+            for cjump in node.cjumps
+        ]
+
+        self._link(name)
+        self._mutated()
+
+    def set_init(self, name: str):
+        self.init = name
+        self._mutated()
+
+    def add(self, node: CFGNode):
+        assert(node.label not in self.cfg)
+        self.cfg[node.label] = node
+        self._link(node.label)
+        self._mutated()
+
+    def remove(self, name: str):
+        # The edges to `name`, if any, must be removed too
+        self._unlink(name)
+        del self.cfg[name]
+        self._mutated()
+
+    # ----------------------------------------------------------------
+    def cached(self, name: str, compute: Callable[['CFG'], object]):
+        """The value `compute(self)`, cached until the next mutation"""
+
+        entry = self._cache.get(name)
+
+        if entry is None or entry[0] != self._version:
+            entry = self._cache[name] = (self._version, compute(self))
+
+        return entry[1]
+
+    def edges(self) -> list[tuple[str, str]]:
+        return [(name, x) for name, node in self.cfg.items() for x in node.targets()]
+
+    def postorder(self) -> list[str]:
+        """The nodes reachable from `init`, in depth-first postorder"""
+        return self.cached('postorder', CFG._postorder)
+
+    def _postorder(self) -> list[str]:
+        aout, visited = [], {self.init}
+        todo = [(self.init, iter(self.cfg[self.init].targets()))]
+
+        while todo:
+            name, succs = todo[-1]
+            for succ in succs:
+                if succ not in visited:
+                    visited.add(succ)
+                    todo.append((succ, iter(self.cfg[succ].targets())))
+                    break
+            else:
+                todo.pop()
+                aout.append(name)
+
+        return aout
+
+    def rpo(self) -> list[str]:
+        """The nodes reachable from `init`, in reverse postorder"""
+        return self.cached('rpo', lambda cfg: cfg.postorder()[::-1])
+
+    def reachable(self) -> set[str]:
+        return set(self.postorder())
 
 # --------------------------------------------------------------------
-def tac2cfg(tac : list[str | TAC]):
+# Pass manager
+#
+# A pass is a function `(cfg) -> cfg` (mutating the CFG in place),
+# declared with `cfgpass`, that lists the analyses it preserves. The
+# analyses (functions `(cfg) -> result`, declared with `analysis`) are
+# computed on demand by the pass manager, and cached until a pass that
+# does not preserve them is run.
+
+ANALYSES: dict[str, Callable[[CFG], object]] = {}
+
+def analysis(name: str):
+    def decorator(fun):
+        ANALYSES[name] = fun
+        return fun
+    return decorator
+
+def cfgpass(preserves: Iterable[str] = ()):
+    def decorator(fun):
+        fun.preserves = frozenset(preserves)
+        return fun
+    return decorator
+
+class PassManager:
+    def __init__(self, cfg: CFG):
+        self.cfg       = cfg
+        self.analyses  = {}     # Name -> result (valid ones)
+        self.history   = []     # (pass name, invalidated analyses)
+
+    def get(self, name: str):
+        if name not in self.analyses:
+            self.analyses[name] = ANALYSES[name](self.cfg)
+        return self.analyses[name]
+
+    def run(self, *passes) -> CFG:
+        for cfgpass in passes:
+            self.cfg = cfgpass(self.cfg)
+
+            preserves   = getattr(cfgpass, 'preserves', frozenset())
+            invalidated = [x for x in self.analyses if x not in preserves]
+
+            for name in invalidated:
+                del self.analyses[name]
+
+            self.history.append((cfgpass.__name__, invalidated))
+
+        return self.cfg
+
+# --------------------------------------------------------------------
+def tac2cfg(tac : list[str | TAC], context : CompilationContext):
     blocks, i = [], 0
 
     while i < len(tac):
@@ -27,7 +215,7 @@ def tac2cfg(tac : list[str | TAC]):
             blocks[-1].label = tac[i][:-1]
             i += 1
         else:
-            blocks[-1].label = MM.fresh_label()
+            blocks[-1].label = context.fresh_label()
 
         if len(blocks) > 1:
             if blocks[-2].jump is None:
@@ -55,7 +243,7 @@ def tac2cfg(tac : list[str | TAC]):
 
     if not blocks:
         blocks.append(CFGNode())
-        blocks.label = MM.fresh_label()
+        blocks.label = context.fresh_label()
 
     if blocks[-1].jump is None:
         blocks[-1].jump = ('ret', [])
@@ -63,39 +251,66 @@ def tac2cfg(tac : list[str | TAC]):
     return CFG(blocks[0].label, { b.label: b for b in blocks })
 
 # --------------------------------------------------------------------
+def optimize(proc : TACProc, context : CompilationContext, level : int = 1):
+    """CFG-based optimizations of the TAC of a procedure"""
+
+    if level <= 0:
+        return proc.tac
+
+    # We here do TAC -> CFG -> JTHREADING -> UCE -> TAC
+    # Other CFG-based optimizations should be inserted here
+    with context.in_procedure(proc.name):
+        cfg = tac2cfg(proc.tac, context)
+        cfg = PassManager(cfg).run(jthreading, uce)
+
+        # Level 2: round trip through the SSA form (the SSA-based
+        # optimizations should be inserted between both)
+        if level >= 2:
+            cfg = bxssa.from_ssa(bxssa.to_ssa(cfg, context), context)
+
+        return cfg2tac(cfg)
+
+# --------------------------------------------------------------------
+# The graph traversals below use explicit stacks (no recursion), in the
+# same visiting order as a recursive depth-first search.
+
 def cfg2tac(cfg: CFG):
     tac, visited = [], set()
 
     def block2tac(name: str):
-        if name in visited:
-            return
+        todo = [name]
+
+        while todo:
+            name = todo.pop()
+
+            if name in visited:
+                continue
 
-        visited.add(name)
-        node = cfg.cfg[name]
+            visited.add(name)
+            node = cfg.cfg[name]
 
-        tac.append(f'{node.label}:')
-        tac.extend(node.body)
+            tac.append(f'{node.label}:')
+            tac.extend(node.body)
 
-        for cjump, args in node.cjumps:
-            tac.append(TAC(cjump, args))
+            for cjump, args in node.cjumps:
+                tac.append(TAC(cjump, args))
 
-        match node.jump[0]:
-            case 'ret':
-                tac.append(TAC('ret', node.jump[1]))
+            match node.jump[0]:
+                case 'ret':
+                    tac.append(TAC('ret', node.jump[1]))
 
-            case 'jmp':
-                tac.append(TAC('jmp', [node.jump[1]]))
+                case 'jmp':
+                    tac.append(TAC('jmp', [node.jump[1]]))
 
-            case _:
-                assert(False)
+                case _:
+                    assert(False)
 
-        if node.jump[0] == 'jmp':
-            if node.jump[1] not in visited:
-                tac.pop()
-                block2tac(node.jump[1])
+            todo.extend(cjump[1][1] for cjump in reversed(node.cjumps))
 
-        for cjump in node.cjumps:
-            block2tac(cjump[1][1])
+            if node.jump[0] == 'jmp':
+                if node.jump[1] not in visited:
+                    tac.pop()
+                    todo.append(node.jump[1])
 
     block2tac(cfg.init)
     for name in cfg.cfg.keys():
@@ -104,51 +319,35 @@ def cfg2tac(cfg: CFG):
     return tac
 
 # --------------------------------------------------------------------
+@cfgpass()
 def jthreading(cfg: CFG) -> CFG:
     dests = {}
 
-    def visit(name: str):
-        if name in dests:
-            return
-
-        node = cfg.cfg[name]
+    # In postorder: the destinations of the successors are known first
+    for name in cfg.postorder():
+        node = cfg[name]
         dests[name] = name
-
-        if isinstance(node.jump, str):
-            visit(node.jump)
-        for cjump in node.cjumps:
-            visit(cjump[1][1])
-
         if isinstance(node.jump, str) and len(node.body) == 1:
-            dests[name] = dests[node.jump]
+            dests[name] = dests.get(node.jump, node.jump)
 
-    for name in cfg.cfg.keys():
-        visit(name)
-
-    for block in cfg.cfg.values():
-        if block.jump[0] == 'jmp':
-            block.jump = ('jmp', dests[block.jump[1]])
-        block.cjumps = [
-            (cjump[0], (cjump[1][0], dests[cjump[1][1]]))
-            for cjump in block.cjumps
-        ]
+    for name in list(cfg.cfg.keys()):
+        for target in cfg[name].succs:
+            if dests.get(target, target) != target:
+                cfg.retarget(name, target, dests[target])
 
     return cfg
 
 # --------------------------------------------------------------------
+@cfgpass()
 def uce(cfg: CFG) -> CFG:
-    visited = set()
+    reachable = cfg.reachable()
 
-    def visit(name: str):
-        if name in visited:
-            return
-        visited.add(name)
-        node = cfg.cfg[name]
-        if node.jump[0] == 'jmp':
-            visit(node.jump[1])
-        for cjump in node.cjumps:
-            visit(cjump[1][1])
+    for name in [x for x in cfg.cfg if x not in reachable]:
+        cfg.remove(name)
 
-    visit(cfg.init)
+    return cfg
 
-    return CFG(cfg.init, { x: cfg.cfg[x] for x in visited })
+# --------------------------------------------------------------------
+# The modules built on the CFG (their analyses register themselves on
+# import, see `analysis`)
+from . import bxdominators, bxliveness, bxssa
@@ -0,0 +1,194 @@
+# --------------------------------------------------------------------
+import contextlib as cl
+import dataclasses as dc
+import os
+import subprocess as sp
+import tempfile
+import threading
+
+from typing import Iterable, Optional as Opt
+
+from .bxast       import *
+from .bxasmgen    import AsmGen
+from .bxcfg       import optimize
+from .bxcontext   import CompilationContext
+from .bxerrors    import CollectingReporter
+from .bxmm        import MM
+from .bxparser    import Parser
+from .bxrdparser  import RDParser
+from .bxtac       import *
+from .bxtoolchain import runtime_object
+from .bxtychecker import check
+
+# ====================================================================
+# In-memory compilation API
+#
+#     result = bxlib.compile(source, stages = ('tac', 'asm'))
+#
+# The requested stages (see `STAGES`) are returned as in-memory objects:
+# the AST, the TAC, the assembly, the object file and the executable
+# (as bytes). The compilation stops at the last requested stage; the
+# object file & executable are only produced on request, by gcc, with
+# the files kept in memory (memfd) when the platform allows it.
+
+STAGES = ('ast', 'tac', 'asm', 'obj', 'exe')
+
+OPT_LEVELS = (0, 1, 2)          # See `bxcfg.optimize`
+
+PARSERS = {
+    'lalr' : Parser,
+    'rd'   : RDParser,
+}
+
+# --------------------------------------------------------------------
+@dc.dataclass
+class Diagnostic:
+    message  : str
+    position : Opt[Range] = None
+
+    def __str__(self):
+        if self.position is None:
+            return self.message
+        if self.position.start[0] == self.position.end[0]:
+            return f'line {self.position.start[0]}: {self.message}'
+        return f'lines {self.position.start[0]}--{self.position.end[0]}: {self.message}'
+
+# --------------------------------------------------------------------
+@dc.dataclass
+class CompilationResult:
+    diagnostics : list[Diagnostic]
+    ast         : Opt[Program] = None
+    tac         : Opt[list[TACProc | TACVar]] = None
+    asm         : Opt[str] = None
+    obj         : Opt[bytes] = None
+    exe         : Opt[bytes] = None
+    toolchain   : str = ''      # Output of gcc (warnings)
+
+    ok = property(lambda self: not self.diagnostics)
+
+# --------------------------------------------------------------------
+# Parsers (and their tables) are built once per thread and kind
+
+_parsers = threading.local()
+
+def _parser(kind: str, context: CompilationContext) -> Parser | RDParser:
+    cache = _parsers.__dict__.setdefault('cache', {})
+
+    if kind not in cache:
+        cache[kind] = PARSERS[kind](reporter = context.reporter, lazy_positions = True)
+
+    parser = cache[kind]
+    parser.reset(context)
+    return parser
+
+# ====================================================================
+def compile(
+        source    : str,
+        *,
+        stages    : Iterable[str] = ('asm',),
+        backend   : str = 'x64-linux',
+        opt_level : int = 1,
+        parser    : str = 'lalr',
+) -> CompilationResult:
+    stages = set(stages)
+
+    if not stages or not stages <= set(STAGES):
+        raise ValueError(f'invalid stages: {sorted(stages)} (expected a subset of {STAGES})')
+    if parser not in PARSERS:
+        raise ValueError(f'invalid parser: {parser}')
+    if backend not in AsmGen.BACKENDS:
+        raise ValueError(f'invalid backend: {backend} (expected one of {sorted(AsmGen.BACKENDS)})')
+    if opt_level not in OPT_LEVELS:
+        raise ValueError(f'invalid optimization level: {opt_level} (expected one of {OPT_LEVELS})')
+
+    abk = AsmGen.get_backend(backend)
+
+    last     = max(STAGES.index(x) for x in stages)
+    reporter = CollectingReporter(source)
+    context  = CompilationContext(reporter)
+    result   = CompilationResult(diagnostics = [])
+
+    def diagnostics():
+        return [Diagnostic(*x) for x in reporter.diagnostics]
+
+    prgm = _parser(parser, context).parse(source)
+
+    if prgm is None or not check(prgm, reporter):
+        result.diagnostics = diagnostics()
+        return result
+
+    if 'ast' in stages:
+        result.ast = prgm
+
+    if last < STAGES.index('tac'):
+        return result
+
+    tac = MM.mm(prgm, context)
+
+    for decl in tac:
+        if isinstance(decl, TACProc):
+            decl.tac = optimize(decl, context, opt_level)
+
+    if 'tac' in stages:
+        result.tac = tac
+
+    if last < STAGES.index('asm'):
+        return result
+
+    asm = abk.lower(tac)
+
+    if 'asm' in stages:
+        result.asm = asm
+
+    if last >= STAGES.index('obj'):
+        _toolchain(result, asm, 'exe' in stages)
+        if 'obj' not in stages:
+            result.obj = None
+
+    return result
+
+# --------------------------------------------------------------------
+@cl.contextmanager
+def _files(*names: str):
+    # Paths of in-memory files (memfd, Linux) if possible, of files in
+    # a temporary directory otherwise. Yields the paths and a reader.
+    if hasattr(os, 'memfd_create'):
+        fds = [os.memfd_create(name) for name in names]
+        try:
+            def read(i: int) -> bytes:
+                return os.pread(fds[i], os.fstat(fds[i]).st_size, 0)
+            yield [f'/dev/fd/{fd}' for fd in fds], read, tuple(fds)
+        finally:
+            for fd in fds:
+                os.close(fd)
+
+    else:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = [os.path.join(tmpdir, name) for name in names]
+            def read(i: int) -> bytes:
+                with open(paths[i], 'rb') as stream:
+                    return stream.read()
+            yield paths, read, ()
+
+def _toolchain(result: CompilationResult, asm: str, link: bool):
+    def gcc(*args: str, input: bytes = None, fds: tuple = ()):
+        proc = sp.run(
+            ['gcc', '-g', *args],
+            input = input, pass_fds = fds, stdout = sp.PIPE, stderr = sp.STDOUT,
+        )
+        result.toolchain += proc.stdout.decode(errors = 'replace')
+        if proc.returncode != 0:
+            result.diagnostics.append(Diagnostic(f'gcc failed with exit status {proc.returncode}'))
+        return proc.returncode == 0
+
+    with _files('bx.o', 'bx.exe') as (paths, read, fds):
+        if not gcc('-x', 'assembler', '-c', '-o', paths[0], '-', input = asm.encode(), fds = fds):
+            return
+        result.obj = read(0)
+
+        if not link:
+            return
+
+        if not gcc('-o', paths[1], runtime_object(), paths[0], fds = fds):
+            return
+        result.exe = read(1)
@@ -0,0 +1,55 @@
+# --------------------------------------------------------------------
+import contextlib as cl
+
+from typing import Optional as Opt
+
+from .bxerrors import Reporter, NullReporter
+
+# ====================================================================
+# Compilation context
+#
+# All the mutable state of one compilation: the reporter, the lexer
+# state (line starts) and the counters of the fresh temporaries &
+# labels. The passes (lexer & parsers, maximal munch, CFG passes) take
+# it explicitly, so that compilations that run in the same process, in
+# sequence or concurrently, do not interfere and always produce the
+# same output.
+#
+# Temporaries & labels are numbered per procedure (see `in_procedure`):
+# the names allocated for a procedure only depend on the procedure
+# itself. Labels are prefixed by the procedure name, so that they are
+# unique program-wide.
+
+class CompilationContext:
+    def __init__(self, reporter: Opt[Reporter] = None):
+        if reporter is None:
+            reporter = NullReporter(source = '')
+
+        self.reporter  = reporter
+        self.bol       = [0]        # Start offsets of the lines, as lexed
+        self.procedure = None       # Procedure of the fresh names
+        self.counters  : dict[Opt[str], int] = {}
+
+    @cl.contextmanager
+    def in_procedure(self, name: str):
+        outer, self.procedure = self.procedure, name
+        try:
+            yield
+        finally:
+            self.procedure = outer
+
+    counter = property(
+        lambda self: self.counters.get(self.procedure, -1),
+        lambda self, value: self.counters.__setitem__(self.procedure, value),
+        doc = 'Last fresh temporary/label of the current procedure',
+    )
+
+    def fresh_temporary(self) -> str:
+        self.counter += 1
+        return f'%{self.counter}'
+
+    def fresh_label(self) -> str:
+        self.counter += 1
+        if self.procedure is None:
+            return f'.L{self.counter}'
+        return f'.L{self.procedure}.{self.counter}'
@@ -0,0 +1,167 @@
+# --------------------------------------------------------------------
+import enum
+
+from typing import NamedTuple, Optional as Opt
+
+from .bxtac import *
+
+# ====================================================================
+# Compact Three-Address Code
+#
+# The TAC of a procedure, with no names to parse: an instruction is a
+# tuple (opcode, arguments, result) where the opcode is an `Opcode` and
+# the operands are integers, whose meaning depends on their position
+# (see `SIGNATURES`):
+#
+#   V  a value: a temporary (>= 0, dense, the arguments of the
+#      procedure first) or a global (< 0, -1 - index in `symbols`)
+#   I  an immediate (e.g. the constant of `const`)
+#   L  a label (index in `labels`)
+#   S  a symbol (index in `symbols`, e.g. the procedure of `call`)
+#
+# Results are values, or `None`. Labels are `LABEL` instructions. The
+# names of the temporaries are kept (`temps`), so that the conversions
+# (`compact` & `CompactProc.expand`) are exact inverses.
+
+class Opcode(enum.IntEnum):
+    LABEL =  0
+    CONST =  1
+    COPY  =  2
+    NEG   =  3
+    NOT   =  4
+    ADD   =  5
+    SUB   =  6
+    MUL   =  7
+    DIV   =  8
+    MOD   =  9
+    AND   = 10
+    OR    = 11
+    XOR   = 12
+    SHL   = 13
+    SHR   = 14
+    PRINT = 15
+    JMP   = 16
+    JZ    = 17
+    JNZ   = 18
+    JLT   = 19
+    JLE   = 20
+    JGT   = 21
+    JGE   = 22
+    PARAM = 23
+    CALL  = 24
+    RET   = 25
+
+    def __str__(self):
+        return self.name.lower()
+
+OPCODE_OF = { str(x): x for x in Opcode }
+
+SIGNATURES = {
+    Opcode.LABEL : 'L' ,
+    Opcode.CONST : 'I' ,
+    Opcode.COPY  : 'V' ,
+    Opcode.NEG   : 'V' ,
+    Opcode.NOT   : 'V' ,
+    **{ x: 'VV' for x in Opcode if Opcode.ADD <= x <= Opcode.SHR },
+    Opcode.PRINT : 'V' ,
+    Opcode.JMP   : 'L' ,
+    **{ x: 'VL' for x in Opcode if Opcode.JZ <= x <= Opcode.JGE },
+    Opcode.PARAM : 'IV',
+    Opcode.CALL  : 'SI',
+    Opcode.RET   : 'V' ,                # Optional argument
+}
+
+# --------------------------------------------------------------------
+class Instr(NamedTuple):
+    opcode    : Opcode
+    arguments : tuple[int, ...]
+    result    : Opt[int] = None
+
+# --------------------------------------------------------------------
+class CompactProc:
+    __slots__ = ('name', 'nargs', 'code', 'temps', 'symbols', 'labels')
+
+    def __init__(self, name: str, nargs: int):
+        self.name    = name
+        self.nargs   = nargs
+        self.code    : list[Instr] = []
+        self.temps   : list[str]   = []      # Temporary -> name
+        self.symbols : list[str]   = []      # Symbol -> name (e.g. `@x`)
+        self.labels  : list[str]   = []      # Label -> name
+
+    def expand(self) -> TACProc:
+        """The `TACProc` of this procedure"""
+
+        def operand(kind: str, value: int) -> str | int:
+            match kind:
+                case 'V':
+                    return self.temps[value] if value >= 0 else self.symbols[-1-value]
+                case 'L':
+                    return self.labels[value]
+                case 'S':
+                    return self.symbols[value]
+                case _:
+                    return value
+
+        aout = TACProc(self.name, self.temps[:self.nargs])
+
+        for opcode, arguments, result in self.code:
+            if opcode == Opcode.LABEL:
+                aout.tac.append(f'{self.labels[arguments[0]]}:')
+                continue
+
+            aout.tac.append(TAC(
+                str(opcode),
+                [operand(k, x) for k, x in zip(SIGNATURES[opcode], arguments)],
+                None if result is None else operand('V', result),
+            ))
+
+        return aout
+
+    def __repr__(self):
+        return repr(self.expand())
+
+# --------------------------------------------------------------------
+def compact(proc: TACProc) -> CompactProc:
+    """The compact form of `proc`"""
+
+    aout = CompactProc(proc.name, len(proc.arguments))
+
+    temps, symbols, labels = {}, {}, {}
+
+    def intern(table: dict[str, int], names: list[str], name: str) -> int:
+        if (index := table.get(name)) is None:
+            index = table[name] = len(names)
+            names.append(name)
+        return index
+
+    def operand(kind: str, value: str | int) -> int:
+        match kind:
+            case 'V':
+                if value.startswith('@'):
+                    return -1 - intern(symbols, aout.symbols, value)
+                return intern(temps, aout.temps, value)
+            case 'L':
+                return intern(labels, aout.labels, value)
+            case 'S':
+                return intern(symbols, aout.symbols, value)
+            case _:
+                return value
+
+    for argument in proc.arguments:
+        intern(temps, aout.temps, argument)
+
+    for tac in proc.tac:
+        if isinstance(tac, str):
+            aout.code.append(Instr(Opcode.LABEL, (operand('L', tac[:-1]),)))
+            continue
+
+        opcode = OPCODE_OF[tac.opcode]
+
+        aout.code.append(Instr(
+            opcode,
+            tuple(operand(k, x) for k, x in zip(SIGNATURES[opcode], tac.arguments)),
+            None if tac.result is None else operand('V', tac.result),
+        ))
+
+    return aout
@@ -0,0 +1,177 @@
+# --------------------------------------------------------------------
+from typing import Optional as Opt
+
+from .bxcfg import CFG, analysis
+
+# ====================================================================
+# Dominators (Cooper, Harvey & Kennedy, "A Simple, Fast Dominance
+# Algorithm") & natural loops
+#
+# Only the nodes reachable from the entry are considered. The results
+# are cached in the CFG (see `dominators` & `loops`), and recomputed
+# after a mutation of its edges. Nothing here is recursive.
+
+class Dominators:
+    def __init__(self, cfg: CFG):
+        self.cfg      = cfg
+        self.rpo      = cfg.rpo()
+        self.order    = { x: i for i, x in enumerate(self.rpo) }   # RPO index
+        self.idom     : dict[str, str]       = {}   # Immediate dominators (init -> init)
+        self.children : dict[str, list[str]] = {}   # Dominator tree (in RPO)
+        self._pre     : dict[str, int]       = {}   # Dominator tree numbering
+        self._post    : dict[str, int]       = {}
+        self._df      : Opt[dict[str, set[str]]] = None
+
+        self._solve()
+        self._tree()
+
+    # ----------------------------------------------------------------
+    def _solve(self):
+        idom, order = self.idom, self.order
+
+        def intersect(a: str, b: str) -> str:
+            while a != b:
+                while order[a] > order[b]:
+                    a = idom[a]
+                while order[b] > order[a]:
+                    b = idom[b]
+            return a
+
+        idom[self.cfg.init] = self.cfg.init
+        changed = True
+
+        while changed:
+            changed = False
+            for name in self.rpo[1:]:
+                new = None
+                for pred in self.cfg[name].preds:
+                    if pred in idom:
+                        new = pred if new is None else intersect(pred, new)
+                if idom.get(name) != new:
+                    idom[name], changed = new, True
+
+    def _tree(self):
+        self.children = { x: [] for x in self.rpo }
+
+        for name in self.rpo[1:]:
+            self.children[self.idom[name]].append(name)
+
+        # Pre/post numbering of the dominator tree (see `dominates`)
+        counter, todo = 0, [(self.cfg.init, False)]
+
+        while todo:
+            name, done = todo.pop()
+            if done:
+                self._post[name] = counter
+            else:
+                self._pre[name] = counter
+                todo.append((name, True))
+                todo.extend((x, False) for x in reversed(self.children[name]))
+            counter += 1
+
+    # ----------------------------------------------------------------
+    def dominates(self, a: str, b: str) -> bool:
+        """Whether `a` dominates `b` (both reachable)"""
+        return self._pre[a] <= self._pre[b] and self._post[b] <= self._post[a]
+
+    def frontiers(self) -> dict[str, set[str]]:
+        """The dominance frontiers of the reachable nodes"""
+
+        if self._df is None:
+            self._df = { x: set() for x in self.rpo }
+
+            for name in self.rpo:
+                preds = [x for x in self.cfg[name].preds if x in self.order]
+
+                # The entry is also entered from outside of the procedure,
+                # and is strictly dominated by no node: it is in the
+                # frontier of all the nodes from its predecessors up to
+                # itself (included)
+                if name == self.cfg.init:
+                    for runner in preds:
+                        while name not in self._df[runner]:
+                            self._df[runner].add(name)
+                            runner = self.idom[runner]
+                    continue
+
+                if len(preds) < 2:
+                    continue
+                for runner in preds:
+                    while runner != self.idom[name]:
+                        self._df[runner].add(name)
+                        runner = self.idom[runner]
+
+        return self._df
+
+    def preorder(self) -> list[str]:
+        """The reachable nodes, in a preorder of the dominator tree"""
+        return sorted(self._pre, key = self._pre.__getitem__)
+
+# --------------------------------------------------------------------
+class Loop:
+    def __init__(self, header: str):
+        self.header   = header
+        self.latches  : list[str]    = []       # Sources of the back edges
+        self.blocks   : set[str]     = set()    # Including the header
+        self.parent   : Opt['Loop']  = None     # Innermost enclosing loop
+        self.children : list['Loop'] = []
+        self.depth    = 1
+
+    def __repr__(self):
+        return f'Loop({self.header}, depth = {self.depth}, blocks = {len(self.blocks)})'
+
+class Loops:
+    def __init__(self, cfg: CFG):
+        self.cfg   = cfg
+        self.loops : list[Loop]     = []    # Outermost first
+        self.of    : dict[str, Loop] = {}   # Block -> innermost loop
+
+        doms  = dominators(cfg)
+        heads = {}
+
+        # Back edges: their targets dominate their sources. The other
+        # retreating edges (irreducible flow) give no natural loop.
+        for name in doms.rpo:
+            for succ in cfg[name].succs:
+                if doms.dominates(succ, name):
+                    if succ not in heads:
+                        heads[succ] = Loop(succ)
+                    heads[succ].latches.append(name)
+
+        for loop in heads.values():
+            loop.blocks.add(loop.header)
+            todo = [x for x in loop.latches if x != loop.header]
+            loop.blocks.update(todo)
+            while todo:
+                for pred in cfg[todo.pop()].preds:
+                    if pred not in loop.blocks and pred in doms.order:
+                        loop.blocks.add(pred)
+                        todo.append(pred)
+
+        # Nesting: the loops are disjoint or nested, and an enclosing
+        # loop is larger than the loops it contains
+        for loop in sorted(heads.values(), key = lambda x: -len(x.blocks)):
+            loop.parent = self.of.get(loop.header)
+            if loop.parent is not None:
+                loop.parent.children.append(loop)
+                loop.depth = loop.parent.depth + 1
+            for name in loop.blocks:
+                self.of[name] = loop
+            self.loops.append(loop)
+
+    def depth(self, name: str) -> int:
+        """The loop depth of block `name` (0 outside of any loop)"""
+        loop = self.of.get(name)
+        return 0 if loop is None else loop.depth
+
+    def back_edges(self) -> list[tuple[str, str]]:
+        return [(x, loop.header) for loop in self.loops for x in loop.latches]
+
+# --------------------------------------------------------------------
+@analysis('dominators')
+def dominators(cfg: CFG) -> Dominators:
+    return cfg.cached('dominators', Dominators)
+
+@analysis('loops')
+def loops(cfg: CFG) -> Loops:
+    return cfg.cached('loops', Loops)
@@ -1,8 +1,10 @@
 # --------------------------------------------------------------------
 import abc
+import bisect
 import contextlib as cl
 import math
 import sys
+import typing as tp
 
 from typing import Optional as Opt
 
@@ -20,13 +22,33 @@ class _ReporterContextManager:
 # --------------------------------------------------------------------
 class Reporter(abc.ABC):
     def __init__(self, source: str):
+        self.text    = source
         self.source  = source.splitlines()
         self.nerrors = 0
+        self._bol    = None
 
-    def __call__(self, message: str, position: Opt[Range] = None):
+    def __call__(self, message: str, position: Opt[Range | Span] = None):
         self.nerrors += 1
+        if isinstance(position, Span):
+            position = self.range_of(position)
         self._report(message, position)
 
+    def range_of(self, span: Span) -> Range:
+        # Start offsets of the lines, computed on first use
+        if self._bol is None:
+            self._bol = [0]
+            while (pos := self.text.find('\n', self._bol[-1])) >= 0:
+                self._bol.append(pos + 1)
+
+        def position(pos: int) -> tuple[int, int]:
+            line = bisect.bisect_right(self._bol, pos)
+            return (line, pos - self._bol[line-1])
+
+        # `Range` ends are the last character (inclusive), plus one column
+        line, column = position(span.end - 1)
+
+        return Range(start = position(span.start), end = (line, column + 1))
+
     @cl.contextmanager
     def checkpoint(self):
         yield _ReporterContextManager(self)
@@ -37,9 +59,15 @@ class Reporter(abc.ABC):
 
 # --------------------------------------------------------------------
 class DefaultReporter(Reporter):
+    # Reports to `stream` if given (e.g. one stream per compilation, for
+    # concurrent compilations), to `sys.stderr` otherwise
+    def __init__(self, source: str, stream: Opt[tp.TextIO] = None):
+        super().__init__(source)
+        self.stream = stream
+
     def _report(self, message: str, position: Opt[Range]):
         def p(*x):
-            print(*x, file = sys.stderr)
+            print(*x, file = self.stream or sys.stderr)
 
         if self.nerrors > 1:
             p()
@@ -69,4 +97,20 @@ class DefaultReporter(Reporter):
                 p(f'| {i+1:0{width}}:', self.source[i])
 
             if c is not None:
-                print(' ' * (c[0]+width+3), '^' * (c[1]-c[0]))
+                print(' ' * (c[0]+width+3), '^' * (c[1]-c[0]), file = self.stream)
+
+# --------------------------------------------------------------------
+class NullReporter(Reporter):
+    # Counts the errors, but does not print them
+    def _report(self, message: str, position: Opt[Range]):
+        pass
+
+# --------------------------------------------------------------------
+class CollectingReporter(Reporter):
+    # Records the diagnostics (in `self.diagnostics`), without printing them
+    def __init__(self, source: str):
+        super().__init__(source)
+        self.diagnostics: list[tuple[str, Opt[Range]]] = []
+
+    def _report(self, message: str, position: Opt[Range]):
+        self.diagnostics.append((message, position))
@@ -1,10 +1,28 @@
 # --------------------------------------------------------------------
 import bisect
+import os
 import ply.lex
 import re
+import sys
 
-from .bxast    import Range
-from .bxerrors import Reporter
+from typing import Iterator, Optional as Opt
+
+from .bxast     import Range
+from .bxcontext import CompilationContext
+from .bxerrors  import Reporter
+
+# ====================================================================
+# Directory where the generated lexer & parser tables are cached
+
+def _tabdir() -> str:
+    if 'BXC_TABDIR' in os.environ:
+        return os.environ['BXC_TABDIR']
+    if os.path.isdir(os.path.dirname(__file__)):
+        return os.path.join(os.path.dirname(__file__), '__pycache__')
+    # Running from a bundle (zipapp): bxlib is not a real directory
+    return os.path.join(os.path.expanduser('~'), '.cache', 'bxc')
+
+TABDIR = _tabdir()
 
 # ====================================================================
 # BX lexer definition
@@ -97,11 +115,22 @@ class Lexer:
     t_ignore = ' \t'            # Ignore all whitespaces
     t_ignore_comment = r'//.*'
 
-    def __init__(self, reporter: Reporter):
-        self.lexer    = ply.lex.lex(module = self)
+    def __init__(self, reporter: Reporter, tabdir: Opt[str] = TABDIR, fast: bool = False):
+        if fast:
+            self.lexer = Scanner(self)
+        else:
+            tabfile = None if tabdir is None else os.path.join(tabdir, 'bxlexer.lextab')
+            self.lexer = ply.lex.lex(module = self, tabfile = tabfile)
+
         self.reporter = reporter
         self.bol      = [0]
 
+    def reset(self, context: CompilationContext):
+        # Binds the lexer to the state of a new compilation
+        self.reporter     = context.reporter
+        self.bol          = context.bol
+        self.lexer.lineno = 1
+
     def column_of_pos(self, pos: int) -> int:
         assert(0 <= pos)
         return pos - self.bol[bisect.bisect_right(self.bol, pos)-1]
@@ -115,6 +144,8 @@ class Lexer:
         r'[a-zA-Z_][a-zA-Z0-9_]*'
         if t.value in self.keywords:
             t.type  = self.keywords[t.value]
+        else:
+            t.value = sys.intern(t.value)
         return t
 
     def t_NUMBER(self, t):
@@ -123,9 +154,100 @@ class Lexer:
         return t
 
     def t_error(self, t):
-        position = Range.of_position(t.lineno, self.column_of_pos(t.lexpos))
+        self.illegal(t.value[0], t.lineno, t.lexpos)
+        t.lexer.skip(1)
+
+    def illegal(self, char: str, lineno: int, lexpos: int):
+        position = Range.of_position(lineno, self.column_of_pos(lexpos))
         self.reporter(
-            f"illegal character: `{t.value[0]}' -- skipping",
+            f"illegal character: `{char}' -- skipping",
             position = position,
         )
-        t.lexer.skip(1)
+
+# ====================================================================
+# Hand-written single-pass scanner
+#
+# Produces the same token stream (types, values, line numbers and
+# positions) as the ply.lex based lexer, but with one compiled regex
+# scanned with `finditer`, and plain tuples instead of `LexToken`s.
+
+Token = tuple[str, str | int, int, int] # (type, value, lineno, lexpos)
+
+class Scanner:
+    # Punctuation, as defined by the `t_XXX` strings of the PLY lexer
+    PUNCTUATION = {
+        re.sub(r'\\(.)', r'\1', getattr(Lexer, f't_{x}')): x
+        for x in Lexer.tokens if isinstance(getattr(Lexer, f't_{x}', None), str)
+    }
+
+    # One match per token: blanks are folded in the token match. Where
+    # two alternatives may match at the same position (NUMBER vs DASH,
+    # COMMENT vs SLASH, `&&` vs `&`, ...), they are tried in the same
+    # order as in the PLY master regex.
+    PATTERN = re.compile(r'[ \t]*(?:%s)' % '|'.join([
+        r'(?P<IDENT>[a-zA-Z_][a-zA-Z0-9_]*)',
+        r'(?P<NUMBER>-?\d+)',
+        r'(?P<COMMENT>//.*)',
+        r'(?P<PUNCT>%s)' % '|'.join(
+            re.escape(x) for x in sorted(PUNCTUATION, key = len, reverse = True)
+        ),
+        r'(?P<NEWLINE>\n+)',
+        r'(?P<ERROR>[^ \t\n])',
+    ]))
+
+    def __init__(self, lexer: Lexer):
+        self.lexer  = lexer
+        self.lineno = 1
+        self.lexpos = 0
+        self.stream = iter(())
+
+    def tokens(self, data: str) -> Iterator[Token]:
+        keywords    = Lexer.keywords
+        intern      = sys.intern
+        punctuation = self.PUNCTUATION
+        bol         = self.lexer.bol
+        lineno      = self.lineno
+
+        for m in self.PATTERN.finditer(data):
+            kind = m.lastgroup
+
+            if kind == 'IDENT':
+                value = intern(m.group(kind))
+                token = (keywords.get(value, 'IDENT'), value, lineno, m.start(kind))
+            elif kind == 'PUNCT':
+                value = m.group(kind)
+                token = (punctuation[value], value, lineno, m.start(kind))
+            elif kind == 'NUMBER':
+                token = ('NUMBER', int(m.group(kind)), lineno, m.start(kind))
+            elif kind == 'NEWLINE':
+                lineno += m.end() - m.start(kind)
+                bol.append(m.end())
+                continue
+            elif kind == 'ERROR':
+                self.lineno = lineno
+                self.lexer.illegal(m.group(kind), lineno, m.start(kind))
+                continue
+            else:
+                continue
+
+            self.lineno = lineno
+            self.lexpos = m.end()
+            yield token
+
+        self.lineno = lineno
+        self.lexpos = len(data) + 1
+
+    # ply.lex.Lexer compatible interface, for ply.yacc
+    def input(self, data: str):
+        self.stream = self.tokens(data)
+        self.lexpos = 0
+
+    def token(self):
+        for type_, value, lineno, lexpos in self.stream:
+            token = ply.lex.LexToken()
+            token.type   = type_
+            token.value  = value
+            token.lineno = lineno
+            token.lexpos = lexpos
+            return token
+        return None
@@ -0,0 +1,169 @@
+# --------------------------------------------------------------------
+import collections
+
+from typing import Iterator
+
+from .bxcfg import CFG, CFGNode, analysis
+from .bxtac import *
+
+# ====================================================================
+# Liveness of the temporaries of a CFG
+#
+# The temporaries are numbered densely, and the sets of temporaries are
+# Python integers (bit `i` <=> temporary `temps[i]`). The temporaries
+# that may be live at the boundaries of the blocks (used in more than
+# one block, or used before being defined in their block) are numbered
+# first: the dataflow equations are only solved for them, and the live
+# sets of the blocks are no wider than their number (MM creates a fresh
+# temporary per sub-expression, that never leaves its block).
+#
+# The instructions of a block are its body, its conditional jumps and
+# its final jump (see `instructions`). Their live sets are not stored:
+# they are recomputed from the live-out set of their block, by a walk
+# over the block (see `backward`).
+
+def _istemp(x) -> bool:
+    return isinstance(x, str) and x.startswith('%')
+
+def instructions(node: CFGNode) -> Iterator[tuple[list[str], Opt[str]]]:
+    """The (uses, definition) of the instructions of `node`, in order"""
+
+    for tac in node.body:
+        uses = [x for x in tac.arguments if isinstance(x, str) and x[0] == '%']
+        yield uses, tac.result if _istemp(tac.result) else None
+
+    for _, (temp, _) in node.cjumps:
+        yield [temp] if _istemp(temp) else [], None
+
+    if node.jump[0] == 'ret':
+        yield [x for x in node.jump[1] if _istemp(x)], None
+    else:
+        yield [], None
+
+def bitset(indices) -> int:
+    aout = 0
+    for i in indices:
+        aout |= 1 << i
+    return aout
+
+# --------------------------------------------------------------------
+class Liveness:
+    def __init__(self, cfg: CFG):
+        self.cfg      = cfg
+        self.temps    : list[str]      = []     # Index -> temporary
+        self.index    : dict[str, int] = {}     # Temporary -> index
+        self.nglobals = 0                       # Temporaries [0, nglobals) may cross blocks
+        self.live_in  : dict[str, int] = {}
+        self.live_out : dict[str, int] = {}
+
+        instrs = { x: list(instructions(node)) for x, node in cfg.cfg.items() }
+
+        self._number(instrs)
+        self._solve(instrs)
+
+    # ----------------------------------------------------------------
+    def _number(self, instrs: dict[str, list]):
+        where    = {}       # Temporary -> block of its first occurrence
+        crossing = {}       # Temporaries that may cross blocks (ordered set)
+
+        for name, instr in instrs.items():
+            defined = set()
+            for uses, temp in instr:
+                for x in uses:
+                    if x not in defined:
+                        crossing[x] = None
+                    if where.setdefault(x, name) != name:
+                        crossing[x] = None
+                if temp is not None:
+                    defined.add(temp)
+                    if where.setdefault(temp, name) != name:
+                        crossing[temp] = None
+
+        self.temps    = [*crossing, *(x for x in where if x not in crossing)]
+        self.index    = { x: i for i, x in enumerate(self.temps) }
+        self.nglobals = len(crossing)
+
+    # ----------------------------------------------------------------
+    def _solve(self, instrs: dict[str, list]):
+        gen, kill = {}, {}
+
+        for name, instr in instrs.items():
+            uses, defs = set(), set()
+            for iuses, temp in instr:
+                uses.update(
+                    i for x in iuses
+                      if (i := self.index[x]) < self.nglobals and i not in defs
+                )
+                if temp is not None and (i := self.index[temp]) < self.nglobals:
+                    defs.add(i)
+            gen[name], kill[name] = bitset(uses), bitset(defs)
+
+        # Backward problem: the blocks are processed in postorder (i.e.
+        # the reverse postorder of the reversed CFG), the unreachable
+        # ones last
+        order = self.cfg.postorder()
+        order = order + [x for x in self.cfg.cfg if x not in set(order)]
+
+        live_in  = self.live_in  = dict.fromkeys(self.cfg.cfg, 0)
+        live_out = self.live_out = dict.fromkeys(self.cfg.cfg, 0)
+
+        todo    = collections.deque(order)
+        pending = set(order)
+
+        while todo:
+            name = todo.popleft(); pending.discard(name)
+            node = self.cfg.cfg[name]
+
+            out = 0
+            for succ in node.targets():
+                out |= live_in[succ]
+
+            live_out[name] = out
+            new = gen[name] | (out & ~kill[name])
+
+            if new != live_in[name]:
+                live_in[name] = new
+                for pred in node.preds:
+                    if pred not in pending:
+                        pending.add(pred)
+                        todo.append(pred)
+
+    # ----------------------------------------------------------------
+    def backward(self, name: str) -> Iterator[tuple[int, int]]:
+        """The (index, live-out set) of the instructions of block `name`,
+        from the last one to the first one"""
+
+        live  = self.live_out[name]
+        instr = list(instructions(self.cfg.cfg[name]))
+
+        for i in range(len(instr)-1, -1, -1):
+            yield i, live
+            uses, temp = instr[i]
+            if temp is not None:
+                live &= ~(1 << self.index[temp])
+            for x in uses:
+                live |= 1 << self.index[x]
+
+    def live_outs(self, name: str) -> list[int]:
+        """The live-out sets of the instructions of block `name`"""
+        return [live for _, live in self.backward(name)][::-1]
+
+    def live_out_at(self, name: str, i: int) -> int:
+        """The live-out set of the `i`-th instruction of block `name`"""
+
+        for j, live in self.backward(name):
+            if i == j:
+                return live
+
+        raise IndexError(i)
+
+    def names(self, temps: int) -> list[str]:
+        """The temporaries of the set `temps`"""
+
+        bits = bin(temps)[:1:-1]
+        return [self.temps[i] for i, x in enumerate(bits) if x == '1']
+
+# --------------------------------------------------------------------
+@analysis('liveness')
+def liveness(cfg: CFG) -> Liveness:
+    return Liveness(cfg)
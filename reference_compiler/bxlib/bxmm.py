@@ -1,24 +1,25 @@
 # --------------------------------------------------------------------
-import contextlib as cl
+import functools as ft
 
 from typing import Optional as Opt
 
-from .bxast   import *
-from .bxscope import Scope
-from .bxtac   import *
+from .bxast     import *
+from .bxcontext import CompilationContext
+from .bxscope   import Scope
+from .bxtac     import *
+from .bxvisitor import Visitor
 
 # ====================================================================
 # Maximal munch
 
-class MM:
-    _counter = -1
-
+class MM(Visitor):
     PRINTS = {
         Type.INT  : 'print_int',
         Type.BOOL : 'print_bool',
     }
 
-    def __init__(self):
+    def __init__(self, context: Opt[CompilationContext] = None):
+        self._context = context if context is not None else CompilationContext()
         self._proc    = None
         self._tac     = []
         self._scope   = Scope()
@@ -27,19 +28,15 @@ class MM:
     tac = property(lambda self: self._tac)
 
     @staticmethod
-    def mm(prgm: Program):
-        mm = MM(); mm.for_program(prgm)
+    def mm(prgm: Program, context: Opt[CompilationContext] = None):
+        mm = MM(context); mm.for_program(prgm)
         return mm._tac
 
-    @classmethod
-    def fresh_temporary(cls):
-        cls._counter += 1
-        return f'%{cls._counter}'
+    def fresh_temporary(self):
+        return self._context.fresh_temporary()
 
-    @classmethod
-    def fresh_label(cls):
-        cls._counter += 1
-        return f'.L{cls._counter}'
+    def fresh_label(self):
+        return self._context.fresh_label()
 
     def push(
             self,
@@ -52,219 +49,322 @@ class MM:
     def push_label(self, label: str):
         self._proc.tac.append(f'{label}:')
 
-    @cl.contextmanager
-    def in_loop(self, labels: tuple[str, str]):
-        self._loops.append(labels)
-        try:
-            yield
-        finally:
-            self._loops.pop()
-
     def for_program(self, prgm: Program):
         for decl in prgm:
-            match decl:
-                case GlobVarDecl(name, init, type_):
-                    assert(isinstance(init, IntExpression))
-                    self._tac.append(TACVar(name.value, init.value))
-                    self._scope.push(name.value, f'@{name.value}')
+            if isinstance(decl, GlobVarDecl):
+                self.for_globvardecl(decl)
 
         for decl in prgm:
-            match decl:
-                case ProcDecl(name, arguments, retty, body):
-                    assert(self._proc is None)
-                    with self._scope.in_subscope():
-                        self._proc = TACProc(
-                            name      = name.value,
-                            arguments = [f'%{x[0].value}' for x in arguments],
-                        )
+            if isinstance(decl, ProcDecl):
+                self.for_procdecl(decl)
+
+    def for_globvardecl(self, decl: GlobVarDecl):
+        assert(isinstance(decl.init, IntExpression))
+        self._tac.append(TACVar(decl.name.value, decl.init.value))
+        self._scope.push(decl.name.value, f'@{decl.name.value}')
+
+    def for_procdecl(self, decl: ProcDecl):
+        # The globals must have been munched beforehand (`for_globvardecl`)
+        name, arguments = decl.name, decl.arguments
 
-                        for argument in arguments:
-                            self._scope.push(argument[0].value, f'%{argument[0].value}')
+        assert(self._proc is None)
+        with self._scope.in_subscope(), self._context.in_procedure(name.value):
+            self._proc = TACProc(
+                name      = name.value,
+                arguments = [f'%{x[0].value}' for x in arguments],
+            )
 
-                        self.for_statement(body)
+            for argument in arguments:
+                self._scope.push(argument[0].value, f'%{argument[0].value}')
 
-                        if name.value == 'main':
-                            self.for_statement(ReturnStatement(IntExpression(0)));
+            self.for_statement(decl.body)
 
-                        self._tac.append(self._proc)
-                        self._proc = None
+            if name.value == 'main':
+                self.for_statement(ReturnStatement(IntExpression(0)));
 
-    def for_block(self, block: Block):
-        with self._scope.in_subscope():
-            for stmt in block:
-                self.for_statement(stmt)
+            self._tac.append(self._proc)
+            self._proc = None
+
+    # ----------------------------------------------------------------
+    # Statements
+    #
+    # Explicit stack of tasks (no recursion, so that deeply nested blocks
+    # are supported): a task is a statement to munch (see the 'stmt'
+    # visitors), or a continuation (e.g. emitting the jump at the end of
+    # a loop body), to call once the statements pushed before it have
+    # been munched.
 
     def for_statement(self, stmt: Statement):
-        match stmt:
-            case VarDeclStatement(name, init):
-                self._scope.push(name.value, self.fresh_temporary())
-                temp = self.for_expression(init)
-                self.push('copy', temp, result = self._scope[name.value])
-
-            case AssignStatement(lhs, rhs):
-                temp = self.for_expression(rhs)
-                self.push('copy', temp, result = self._scope[lhs.value])
-
-            case ExprStatement(expr):
-                self.for_expression(expr)
-
-            case PrintStatement(value):
-                temp = self.for_expression(value)
-                self.push('print', temp)
-
-            case IfStatement(condition, then, else_):
-                tlabel = self.fresh_label()
-                flabel = self.fresh_label()
-                olabel = self.fresh_label()
-
-                self.for_bexpression(condition, tlabel, flabel)
-                self.push_label(tlabel)
-                self.for_statement(then)
-                self.push('jmp', olabel)
-                self.push_label(flabel)
-                if else_ is not None:
-                    self.for_statement(else_)
+        tasks = [stmt]
+
+        while tasks:
+            task = tasks.pop()
+
+            if isinstance(task, Statement):
+                self.dispatch('stmt', task)(self, task, tasks)
+            else:
+                task()
+
+    @Visitor.on('stmt', VarDeclStatement)
+    def for_vardecl_statement(self, stmt, tasks):
+        self._scope.push(stmt.name.value, self.fresh_temporary())
+        temp = self.for_expression(stmt.init)
+        self.push('copy', temp, result = self._scope[stmt.name.value])
+
+    @Visitor.on('stmt', AssignStatement)
+    def for_assign_statement(self, stmt, tasks):
+        temp = self.for_expression(stmt.rhs)
+        self.push('copy', temp, result = self._scope[stmt.lhs.value])
+
+    @Visitor.on('stmt', ExprStatement)
+    def for_expr_statement(self, stmt, tasks):
+        self.for_expression(stmt.expression)
+
+    @Visitor.on('stmt', PrintStatement)
+    def for_print_statement(self, stmt, tasks):
+        temp = self.for_expression(stmt.value)
+        self.push('print', temp)
+
+    @Visitor.on('stmt', IfStatement)
+    def for_if_statement(self, stmt, tasks):
+        # else-if chains are handled iteratively: one task per link of
+        # the chain, that pushes the task of the next one
+        olabels = []
+
+        def link(stmt: Opt[Statement]):
+            if not isinstance(stmt, IfStatement):
+                tasks.append(close)
+                if stmt is not None:
+                    tasks.append(stmt)
+                return
+
+            tlabel = self.fresh_label()
+            flabel = self.fresh_label()
+            olabel = self.fresh_label()
+
+            self.for_bexpression(stmt.condition, tlabel, flabel)
+            self.push_label(tlabel)
+
+            olabels.append(olabel)
+
+            tasks.append(ft.partial(link, stmt.else_))
+            tasks.append(ft.partial(join, olabel, flabel))
+            tasks.append(stmt.then)
+
+        def join(olabel: str, flabel: str):
+            self.push('jmp', olabel)
+            self.push_label(flabel)
+
+        def close():
+            for olabel in reversed(olabels):
                 self.push_label(olabel)
 
-            case WhileStatement(condition, body):
-                clabel = self.fresh_label()
-                blabel = self.fresh_label()
-                olabel = self.fresh_label()
+        link(stmt)
+
+    @Visitor.on('stmt', WhileStatement)
+    def for_while_statement(self, stmt, tasks):
+        clabel = self.fresh_label()
+        blabel = self.fresh_label()
+        olabel = self.fresh_label()
 
-                with self.in_loop((clabel, olabel)):
-                    self.push_label(clabel)
-                    self.for_bexpression(condition, blabel, olabel)
-                    self.push_label(blabel)
-                    self.for_statement(body)
-                    self.push('jmp', clabel)
-                    self.push_label(olabel)
+        def close():
+            self.push('jmp', clabel)
+            self.push_label(olabel)
+            self._loops.pop()
 
-            case ContinueStatement():
-                self.push('jmp', self._loops[-1][0])
+        self._loops.append((clabel, olabel))
+        self.push_label(clabel)
+        self.for_bexpression(stmt.condition, blabel, olabel)
+        self.push_label(blabel)
 
-            case BreakStatement():
-                self.push('jmp', self._loops[-1][1])
+        tasks.append(close)
+        tasks.append(stmt.body)
 
-            case BlockStatement(body):
-                self.for_block(body)
+    @Visitor.on('stmt', ContinueStatement)
+    def for_continue_statement(self, stmt, tasks):
+        self.push('jmp', self._loops[-1][0])
 
-            case ReturnStatement(expr):
-                if expr is None:
-                    self.push('ret')
-                else:
-                    temp = self.for_expression(expr)
-                    self.push('ret', temp)
+    @Visitor.on('stmt', BreakStatement)
+    def for_break_statement(self, stmt, tasks):
+        self.push('jmp', self._loops[-1][1])
 
-            case _:
-                assert(False)
+    @Visitor.on('stmt', BlockStatement)
+    def for_block_statement(self, stmt, tasks):
+        self._scope.open()
+        tasks.append(self._scope.close)
+        tasks.extend(reversed(stmt.body))
+
+    @Visitor.on('stmt', ReturnStatement)
+    def for_return_statement(self, stmt, tasks):
+        if stmt.expr is None:
+            self.push('ret')
+        else:
+            temp = self.for_expression(stmt.expr)
+            self.push('ret', temp)
+
+    # ----------------------------------------------------------------
+    # Maximal munch of (boolean) expressions
+    #
+    # The traversal uses an explicit stack of tasks (no recursion, so
+    # that deeply nested expressions are supported). A task is a tuple
+    # `(method, *arguments)`; the tasks are:
+    #
+    #  - (MM.expr_task , e, force)         : compute `e`, push its temporary on `_values`
+    #  - (MM.bexpr_task, e, tlabel, flabel): jump to `tlabel` if `e` holds, `flabel` otherwise
+    #
+    # and the continuations of the 'expr'/'bexpr' visitors, that are
+    # executed once the sub-expressions have been emitted.
 
     def for_expression(self, expr: Expression, force = False) -> str:
-        target = None
+        self._munch((MM.expr_task, expr, force))
+        return self._values.pop()
+
+    def for_bexpression(self, expr: Expression, tlabel: str, flabel: str):
+        self._munch((MM.bexpr_task, expr, tlabel, flabel))
+
+    def _munch(self, task: tuple):
+        tasks = self._tasks = [task]
+        self._values = []
 
+        while tasks:
+            task = tasks.pop()
+            task[0](self, *task[1:])
+
+    def expr_task(self, expr: Expression, force: bool):
         if not force and expr.type_ == Type.BOOL:
             target = self.fresh_temporary()
             tlabel = self.fresh_label()
             flabel = self.fresh_label()
 
             self.push('const', 0, result = target)
-            self.for_bexpression(expr, tlabel, flabel)
-            self.push_label(tlabel)
-            self.push('const', 1, result = target)
-            self.push_label(flabel)
+            self._tasks.append((MM.boolean_task, target, tlabel, flabel))
+            self._tasks.append((MM.bexpr_task, expr, tlabel, flabel))
 
         else:
-            match expr:
-                case VarExpression(name):
-                    target = self._scope[name.value]
-
-                case IntExpression(value):
-                    target = self.fresh_temporary()
-                    self.push('const', value, result = target)
-
-                case OpAppExpression(operator, arguments):
-                    target    = self.fresh_temporary()
-                    arguments = [self.for_expression(e) for e in arguments]
-                    self.push(OPCODES[operator], *arguments, result = target)
-
-                case CallExpression(proc, arguments):
-                    for i, argument in enumerate(arguments):
-                        temp = self.for_expression(argument)
-                        self.push('param', i+1, temp)
-                    if expr.type_ != Type.VOID:
-                        target = self.fresh_temporary()
-                    self.push('call', proc.value, len(arguments), result = target)
-
-                case PrintExpression(argument):
-                    temp = self.for_expression(argument)
-                    self.push('param', 1, temp)
-                    proc = self.PRINTS[argument.type_]
-                    self.push('call', proc, 1)
-
-                case _:
-                    assert(False)
-
-        return target
-
-    CMP_JMP = {
-        'cmp-equal'                 : 'jz',
-        'cmp-not-equal'             : 'jnz',
-        'cmp-lower-than'            : 'jgt',
-        'cmp-lower-or-equal-than'   : 'jge',
-        'cmp-greater-than'          : 'jlt',
-        'cmp-greater-or-equal-than' : 'jle',
-    }
+            self.dispatch('expr', expr)(self, expr)
 
-    def for_bexpression(self, expr: Expression, tlabel: str, flabel: str):
+    def bexpr_task(self, expr: Expression, tlabel: str, flabel: str):
         assert(expr.type_ == Type.BOOL)
+        self.dispatch('bexpr', expr)(self, expr, tlabel, flabel)
+
+    def boolean_task(self, target: str, tlabel: str, flabel: str):
+        self.push_label(tlabel)
+        self.push('const', 1, result = target)
+        self.push_label(flabel)
+        self._values.append(target)
+
+    # 'expr' visitors
+
+    @Visitor.on('expr', VarExpression)
+    def for_var_expression(self, expr):
+        self._values.append(self._scope[expr.name.value])
+
+    @Visitor.on('expr', IntExpression)
+    def for_int_expression(self, expr):
+        target = self.fresh_temporary()
+        self.push('const', expr.value, result = target)
+        self._values.append(target)
+
+    @Visitor.on('expr', OpAppExpression)
+    def for_opapp_expression(self, expr):
+        target = self.fresh_temporary()
+        self._tasks.append((MM.opapp_task, expr.operator, len(expr.arguments), target))
+        self._tasks.extend((MM.expr_task, e, False) for e in reversed(expr.arguments))
+
+    def opapp_task(self, operator: Operator, arity: int, target: str):
+        arguments = self._values[-arity:]
+        del self._values[-arity:]
+        self.push(OPCODES[operator], *arguments, result = target)
+        self._values.append(target)
+
+    @Visitor.on('expr', CallExpression)
+    def for_call_expression(self, expr):
+        self._tasks.append((MM.call_task, expr))
+        for i in reversed(range(len(expr.arguments))):
+            self._tasks.append((MM.param_task, i+1))
+            self._tasks.append((MM.expr_task, expr.arguments[i], False))
+
+    def param_task(self, i: int):
+        self.push('param', i, self._values.pop())
+
+    def call_task(self, expr: CallExpression):
+        target = None
+        if expr.type_ != Type.VOID:
+            target = self.fresh_temporary()
+        self.push('call', expr.proc.value, len(expr.arguments), result = target)
+        self._values.append(target)
 
-        match expr:
-            case VarExpression(name):
-                temp = self._scope[name.value]
-                self.push('jz', temp, flabel)
-                self.push('jmp', tlabel)
-
-            case BoolExpression(True):
-                self.push('jmp', tlabel)
-
-            case BoolExpression(False):
-                self.push('jmp', flabel)
-
-            case OpAppExpression(
-                    'cmp-equal'                |
-                    'cmp-not-equal'            |
-                    'cmp-lower-than'           |
-                    'cmp-lower-or-equal-than'  |
-                    'cmp-greater-than'         |
-                    'cmp-greater-or-equal-than',
-                    [e1, e2]):
-
-                t1 = self.for_expression(e1)
-                t2 = self.for_expression(e2)
-                t  = self.fresh_temporary()
-                self.push(OPCODES['subtraction'], t2, t1, result = t)
-
-                self.push(self.CMP_JMP[expr.operator], t, tlabel)
-                self.push('jmp', flabel)
-
-            case OpAppExpression('boolean-and', [e1, e2]):
-                olabel = self.fresh_label()
-                self.for_bexpression(e1, olabel, flabel)
-                self.push_label(olabel)
-                self.for_bexpression(e2, tlabel, flabel)
+    @Visitor.on('expr', PrintExpression)
+    def for_print_expression(self, expr):
+        self._tasks.append((MM.print_task, expr.argument))
+        self._tasks.append((MM.expr_task, expr.argument, False))
 
-            case OpAppExpression('boolean-or', [e1, e2]):
-                olabel = self.fresh_label()
-                self.for_bexpression(e1, tlabel, olabel)
-                self.push_label(olabel)
-                self.for_bexpression(e2, tlabel, flabel)
+    def print_task(self, argument: Expression):
+        self.push('param', 1, self._values.pop())
+        self.push('call', self.PRINTS[argument.type_], 1)
+        self._values.append(None)
 
-            case OpAppExpression('boolean-not', [e]):
-                self.for_bexpression(e, flabel, tlabel)
+    # 'bexpr' visitors
 
-            case CallExpression(_):
-                temp = self.for_expression(expr, force = True)
-                self.push('jz', temp, flabel)
-                self.push('jmp', tlabel)
+    CMP_JMP = {
+        Operator.CMP_EQUAL                 : 'jz',
+        Operator.CMP_NOT_EQUAL             : 'jnz',
+        Operator.CMP_LOWER_THAN            : 'jgt',
+        Operator.CMP_LOWER_OR_EQUAL_THAN   : 'jge',
+        Operator.CMP_GREATER_THAN          : 'jlt',
+        Operator.CMP_GREATER_OR_EQUAL_THAN : 'jle',
+    }
 
-            case _:
-                assert(False)
+    @Visitor.on('bexpr', VarExpression)
+    def for_var_bexpression(self, expr, tlabel, flabel):
+        temp = self._scope[expr.name.value]
+        self.push('jz', temp, flabel)
+        self.push('jmp', tlabel)
+
+    @Visitor.on('bexpr', BoolExpression)
+    def for_bool_bexpression(self, expr, tlabel, flabel):
+        self.push('jmp', tlabel if expr.value else flabel)
+
+    @Visitor.on('bexpr', OpAppExpression, *CMP_JMP)
+    def for_cmp_bexpression(self, expr, tlabel, flabel):
+        e1, e2 = expr.arguments
+        self._tasks.append((MM.cmp_task, expr.operator, tlabel, flabel))
+        self._tasks.append((MM.expr_task, e2, False))
+        self._tasks.append((MM.expr_task, e1, False))
+
+    def cmp_task(self, operator: Operator, tlabel: str, flabel: str):
+        t2 = self._values.pop()
+        t1 = self._values.pop()
+        t  = self.fresh_temporary()
+        self.push(OPCODES[Operator.SUBTRACTION], t2, t1, result = t)
+        self.push(self.CMP_JMP[operator], t, tlabel)
+        self.push('jmp', flabel)
+
+    @Visitor.on('bexpr', OpAppExpression, Operator.BOOLEAN_AND)
+    def for_and_bexpression(self, expr, tlabel, flabel):
+        e1, e2 = expr.arguments
+        olabel = self.fresh_label()
+        self._tasks.append((MM.bexpr_task, e2, tlabel, flabel))
+        self._tasks.append((MM.push_label, olabel))
+        self._tasks.append((MM.bexpr_task, e1, olabel, flabel))
+
+    @Visitor.on('bexpr', OpAppExpression, Operator.BOOLEAN_OR)
+    def for_or_bexpression(self, expr, tlabel, flabel):
+        e1, e2 = expr.arguments
+        olabel = self.fresh_label()
+        self._tasks.append((MM.bexpr_task, e2, tlabel, flabel))
+        self._tasks.append((MM.push_label, olabel))
+        self._tasks.append((MM.bexpr_task, e1, tlabel, olabel))
+
+    @Visitor.on('bexpr', OpAppExpression, Operator.BOOLEAN_NOT)
+    def for_not_bexpression(self, expr, tlabel, flabel):
+        self._tasks.append((MM.bexpr_task, expr.arguments[0], flabel, tlabel))
+
+    @Visitor.on('bexpr', CallExpression)
+    def for_call_bexpression(self, expr, tlabel, flabel):
+        self._tasks.append((MM.jz_task, tlabel, flabel))
+        self._tasks.append((MM.expr_task, expr, True))
+
+    def jz_task(self, tlabel: str, flabel: str):
+        self.push('jz', self._values.pop(), flabel)
+        self.push('jmp', tlabel)
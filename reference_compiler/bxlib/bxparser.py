@@ -1,39 +1,43 @@
 # --------------------------------------------------------------------
+import os
 import ply.yacc
 
-from .bxast    import *
-from .bxerrors import Reporter
-from .bxlexer  import Lexer
+from typing import Optional as Opt
+
+from .bxast     import *
+from .bxcontext import CompilationContext
+from .bxerrors  import Reporter
+from .bxlexer   import Lexer, TABDIR
 
 # ====================================================================
 # BX parser definition
 
 class Parser:
     UNIOP = {
-        '-' : 'opposite'        ,
-        '~' : 'bitwise-negation',
-        '!' : 'boolean-not'     ,
+        '-' : Operator.OPPOSITE        ,
+        '~' : Operator.BITWISE_NEGATION,
+        '!' : Operator.BOOLEAN_NOT     ,
     }
 
     BINOP = {
-        '+'  : 'addition'                 ,
-        '-'  : 'subtraction'              ,
-        '*'  : 'multiplication'           ,
-        '/'  : 'division'                 ,
-        '%'  : 'modulus'                  ,
-        '>>' : 'logical-right-shift'      ,
-        '<<' : 'logical-left-shift'       ,
-        '&'  : 'bitwise-and'              ,
-        '|'  : 'bitwise-or'               ,
-        '^'  : 'bitwise-xor'              ,
-        '&&' : 'boolean-and'              ,
-        '||' : 'boolean-or'               ,
-        '==' : 'cmp-equal'                ,
-        '!=' : 'cmp-not-equal'            ,
-        '<'  : 'cmp-lower-than'           ,
-        '<=' : 'cmp-lower-or-equal-than'  ,
-        '>'  : 'cmp-greater-than'         ,
-        '>=' : 'cmp-greater-or-equal-than',
+        '+'  : Operator.ADDITION                 ,
+        '-'  : Operator.SUBTRACTION              ,
+        '*'  : Operator.MULTIPLICATION           ,
+        '/'  : Operator.DIVISION                 ,
+        '%'  : Operator.MODULUS                  ,
+        '>>' : Operator.LOGICAL_RIGHT_SHIFT      ,
+        '<<' : Operator.LOGICAL_LEFT_SHIFT       ,
+        '&'  : Operator.BITWISE_AND              ,
+        '|'  : Operator.BITWISE_OR               ,
+        '^'  : Operator.BITWISE_XOR              ,
+        '&&' : Operator.BOOLEAN_AND              ,
+        '||' : Operator.BOOLEAN_OR               ,
+        '==' : Operator.CMP_EQUAL                ,
+        '!=' : Operator.CMP_NOT_EQUAL            ,
+        '<'  : Operator.CMP_LOWER_THAN           ,
+        '<=' : Operator.CMP_LOWER_OR_EQUAL_THAN  ,
+        '>'  : Operator.CMP_GREATER_THAN         ,
+        '>=' : Operator.CMP_GREATER_OR_EQUAL_THAN,
     }
 
     tokens = Lexer.tokens
@@ -55,23 +59,50 @@ class Parser:
         ('right'   , 'UNEG'                    ),
     )
 
-    def __init__(self, reporter: Reporter):
-        self.lexer    = Lexer(reporter = reporter)
-        self.parser   = ply.yacc.yacc(module = self)
+    def __init__(
+            self,
+            reporter       : Reporter,
+            tabdir         : Opt[str] = TABDIR,
+            fast_lexer     : bool     = False,
+            lazy_positions : bool     = False,
+    ):
+        tabfile = None if tabdir is None else os.path.join(tabdir, 'bxparser.parsetab')
+
+        self.lexer    = Lexer(reporter = reporter, tabdir = tabdir, fast = fast_lexer)
+        self.parser   = ply.yacc.yacc(module = self, tabfile = tabfile)
         self.reporter = reporter
+        self.lazy     = lazy_positions
+        self.tracking = True
+
+    def reset(self, context: CompilationContext):
+        # Binds the parser to a new compilation, for reusing it (and its
+        # tables) on another input. A parser must not be used by two
+        # compilations at the same time.
+        self.reporter = context.reporter
+        self.lexer.reset(context)
+
+    def parse(self, program: str, tracking: bool = True):
+        # With `tracking = False`, the AST nodes have no position
+        self.tracking = tracking
 
-    def parse(self, program: str):
         with self.reporter.checkpoint() as checkpoint:
-            ast = self.parser.parse(
+            ast = self.parser.parseopt(
                 program,
                 lexer    = self.lexer.lexer,
-                tracking = True,
+                tracking = tracking,
             )
 
             return ast if checkpoint else None
 
-    def _position(self, p) -> Range:
+    def _position(self, p) -> Opt[Range | Span]:
+        if not self.tracking:
+            return None
+
         n = len(p) - 1
+
+        if self.lazy:
+            return Span.of_offsets(p.lexpos(1), p.lexspan(n)[1] + 1)
+
         return Range(
             start = (p.linespan(1)[0], self.lexer.column_of_pos(p.lexspan(1)[0])    ),
             end   = (p.linespan(n)[1], self.lexer.column_of_pos(p.lexspan(n)[1]) + 1),
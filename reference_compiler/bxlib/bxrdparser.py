@@ -0,0 +1,487 @@
+# --------------------------------------------------------------------
+from typing import Optional as Opt
+
+from .bxast     import *
+from .bxcontext import CompilationContext
+from .bxerrors  import Reporter
+from .bxlexer   import Lexer, Token
+from .bxparser  import Parser
+
+# ====================================================================
+# Hand-written BX parser: recursive descent for declarations and
+# statements, operator precedence with explicit stacks for expressions
+# (so that deeply nested expressions are supported).
+#
+# It builds the very same ASTs (including the `Range` positions) as the
+# LALR `Parser`, and mimics its error recovery (`stmts : stmts error
+# SEMICOLON`, with PLY's 3-token error-reporting threshold) so that the
+# reported diagnostics are the same.
+
+class _SyntaxError(Exception):
+    pass
+
+class _Abort(Exception):
+    pass
+
+# --------------------------------------------------------------------
+class RDParser:
+    UNIOP = Parser.UNIOP
+    BINOP = Parser.BINOP
+
+    # token -> (level, associativity), for binary operators only
+    BINPREC = {
+        token: (level, assoc)
+        for level, (assoc, *tokens) in enumerate(Parser.precedence, 1)
+        for token in tokens
+        if token not in ('BANG', 'UMINUS', 'UNEG')
+    }
+
+    EXPR_START = frozenset((
+        'IDENT', 'TRUE', 'FALSE', 'NUMBER', 'LPAREN', 'PRINT', 'DASH', 'TILD', 'BANG',
+    ))
+
+    ERROR_COUNT = 3             # As `ply.yacc.error_count`
+
+    EOF: Token = ('$end', None, 0, 0)
+
+    def __init__(self, reporter: Reporter, lazy_positions: bool = False):
+        self.lexer    = Lexer(reporter = reporter, fast = True)
+        self.reporter = reporter
+        self.lazy     = lazy_positions
+        self.tracking = True
+
+    def reset(self, context: CompilationContext):
+        # Binds the parser to a new compilation, for reusing it on
+        # another input
+        self.reporter = context.reporter
+        self.lexer.reset(context)
+
+    def parse(self, program: str, tracking: bool = True):
+        # With `tracking = False`, the AST nodes have no position
+        self.tracking   = tracking
+        self.stream     = self.lexer.lexer.tokens(program)
+        self.errorcount = 0
+        self.last       = None
+
+        with self.reporter.checkpoint() as checkpoint:
+            try:
+                self.tok = next(self.stream, self.EOF)
+                ast = self._program()
+            except _Abort:
+                return None
+            except RecursionError:
+                # Statements & calls are still parsed recursively
+                self.reporter('program too deeply nested', position = self._position(self.tok))
+                return None
+
+            return ast if checkpoint else None
+
+    # ----------------------------------------------------------------
+    # Token stream
+
+    def _shift(self) -> Token:
+        tok, self.last = self.tok, self.tok
+        self.tok = next(self.stream, self.EOF)
+        if self.errorcount:
+            self.errorcount -= 1
+        return tok
+
+    def _expect(self, type_: str) -> Token:
+        if self.tok[0] != type_:
+            self._error()
+        return self._shift()
+
+    def _error(self):
+        tok = self.tok
+
+        if self.errorcount == 0:
+            if tok[0] == '$end':
+                self.reporter('syntax error at end of file')
+            else:
+                self.reporter('syntax error', position = self._position(tok))
+
+        self.errorcount = self.ERROR_COUNT
+
+        if tok[0] == '$end':
+            raise _Abort()
+        raise _SyntaxError()
+
+    def _position(self, tok: Token) -> Opt[Range]:
+        if tok[0] == '$end':
+            return None
+        return Range.of_position(tok[2], self.lexer.column_of_pos(tok[3]))
+
+    def _range(self, start: Token | tuple, end: Token | tuple) -> Opt[Range | Span]:
+        if not self.tracking:
+            return None
+        if self.lazy:
+            return Span.of_offsets(start[-1], end[-1] + 1)
+
+        column = self.lexer.column_of_pos
+        return Range(
+            start = (start[-2], column(start[-1])    ),
+            end   = (end  [-2], column(end  [-1]) + 1),
+        )
+
+    # ----------------------------------------------------------------
+    # Names, types
+
+    def _name(self) -> Name:
+        tok = self._expect('IDENT')
+        return Name(value = tok[1], position = self._range(tok, tok))
+
+    def _type(self) -> Type:
+        match self.tok[0]:
+            case 'BOOL':
+                self._shift(); return Type.BOOL
+            case 'INT':
+                self._shift(); return Type.INT
+        self._error()
+
+    # ----------------------------------------------------------------
+    # Expressions
+    #
+    # The operands are kept together with the first token of their
+    # derivation (that can be a parenthesis that is not part of the
+    # operand node), that starts the position of the enclosing nodes.
+
+    def _primary(self) -> tuple[Expression, Token]:
+        tok = self.tok
+
+        match tok[0]:
+            case 'IDENT':
+                name = self._name()
+                if self.tok[0] == 'LPAREN':
+                    return self._call(name, tok), tok
+                return VarExpression(name = name, position = name.position), tok
+
+            case 'NUMBER':
+                self._shift()
+                return IntExpression(value = tok[1], position = self._range(tok, tok)), tok
+
+            case 'TRUE' | 'FALSE':
+                self._shift()
+                return BoolExpression(
+                    value    = (tok[1] == 'true'),
+                    position = self._range(tok, tok),
+                ), tok
+
+            case 'PRINT':
+                self._shift()
+                self._expect('LPAREN')
+                argument = self._expr()
+                self._expect('RPAREN')
+                return PrintExpression(
+                    argument = argument,
+                    position = self._range(tok, self.last),
+                ), tok
+
+        self._error()
+
+    def _call(self, name: Name, start: Token) -> CallExpression:
+        self._expect('LPAREN')
+
+        arguments = []
+        if self.tok[0] != 'RPAREN':
+            arguments.append(self._expr())
+            while self.tok[0] == 'COMMA':
+                self._shift()
+                arguments.append(self._expr())
+
+        self._expect('RPAREN')
+
+        return CallExpression(
+            proc      = name,
+            arguments = arguments,
+            position  = self._range(start, self.last),
+        )
+
+    def _expr(self, operand: Opt[tuple[Expression, Token]] = None) -> Expression:
+        # Shunting-yard: `operators` holds the pending prefix operators,
+        # open parentheses & binary operators, as (kind, token, level,
+        # associativity). An expression can start with an already parsed
+        # `operand` (see `_stmt`).
+        binprec   = self.BINPREC
+        operands  = [] if operand is None else [operand]
+        operators = []
+        nparens   = 0
+
+        def reduce() -> tuple[int, str]:
+            _, op, level, assoc = operators.pop()
+            rhs, _     = operands.pop()
+            lhs, start = operands.pop()
+            operands.append((OpAppExpression(
+                operator  = self.BINOP[op[1]],
+                arguments = [lhs, rhs],
+                position  = self._range(start, self.last),
+            ), start))
+            return level, assoc
+
+        def parsed(expr: Expression, start: Token):
+            # Unary operators bind tighter than any binary operator
+            while operators and operators[-1][0] == 'prefix':
+                tok = operators.pop()[1]
+                expr, start = OpAppExpression(
+                    operator  = self.UNIOP[tok[1]],
+                    arguments = [expr],
+                    position  = self._range(tok, self.last),
+                ), tok
+            operands.append((expr, start))
+
+        expect = operand is None    # An operand (vs. an operator)?
+
+        while True:
+            if expect:
+                match self.tok[0]:
+                    case 'DASH' | 'TILD' | 'BANG':
+                        operators.append(('prefix', self._shift(), None, None))
+
+                    case 'LPAREN':
+                        operators.append(('paren', self._shift(), None, None))
+                        nparens += 1
+
+                    case _:
+                        parsed(*self._primary())
+                        expect = False
+
+                continue
+
+            # Binary operator, closing parenthesis, or end of expression
+            if (prec := binprec.get(self.tok[0])) is not None:
+                level, _ = prec
+
+                while operators and operators[-1][0] == 'binary' and operators[-1][2] >= level:
+                    if reduce() == (level, 'nonassoc'):
+                        self._error()
+
+                operators.append(('binary', self._shift(), *prec))
+                expect = True
+                continue
+
+            while operators and operators[-1][0] == 'binary':
+                reduce()
+
+            if nparens == 0:
+                return operands.pop()[0]
+
+            self._expect('RPAREN')
+            nparens -= 1
+            parsed(operands.pop()[0], operators.pop()[1])
+
+    # ----------------------------------------------------------------
+    # Statements
+
+    def _block(self) -> BlockStatement:
+        start = self._expect('LBRACE')
+        body  = []
+
+        while self.tok[0] != 'RBRACE':
+            try:
+                body.append(self._stmt())
+
+            except _SyntaxError:
+                # stmts : stmts error SEMICOLON
+                self.errorcount -= 1
+                while self.tok[0] != 'SEMICOLON':
+                    if self.tok[0] == '$end':
+                        raise _Abort()
+                    self.errorcount = self.ERROR_COUNT
+                    self.tok = next(self.stream, self.EOF)
+                self._shift()
+
+        self._shift()
+
+        return BlockStatement(body = body, position = self._range(start, self.last))
+
+    def _stmt(self) -> Statement:
+        tok = self.tok
+
+        match tok[0]:
+            case 'VAR':
+                self._shift()
+                name = self._name()
+                self._expect('EQ')
+                init = self._expr()
+                self._expect('COLON')
+                type_ = self._type()
+                self._expect('SEMICOLON')
+                return VarDeclStatement(
+                    name     = name,
+                    init     = init,
+                    type_    = type_,
+                    position = self._range(tok, self.last),
+                )
+
+            case 'IF':
+                return self._if()
+
+            case 'WHILE':
+                self._shift()
+                self._expect('LPAREN')
+                condition = self._expr()
+                self._expect('RPAREN')
+                body = self._block()
+                return WhileStatement(
+                    condition = condition,
+                    body      = body,
+                    position  = self._range(tok, self.last),
+                )
+
+            case 'BREAK':
+                self._shift()
+                self._expect('SEMICOLON')
+                return BreakStatement(position = self._range(tok, self.last))
+
+            case 'CONTINUE':
+                self._shift()
+                self._expect('SEMICOLON')
+                return ContinueStatement(position = self._range(tok, self.last))
+
+            case 'RETURN':
+                self._shift()
+                expr = None
+                if self.tok[0] != 'SEMICOLON':
+                    expr = self._expr()
+                self._expect('SEMICOLON')
+                return ReturnStatement(expr = expr, position = self._range(tok, self.last))
+
+            case 'LBRACE':
+                return self._block()
+
+            case 'IDENT':
+                name = self._name()
+
+                if self.tok[0] == 'EQ':
+                    self._shift()
+                    rhs = self._expr()
+                    self._expect('SEMICOLON')
+                    return AssignStatement(
+                        lhs      = name,
+                        rhs      = rhs,
+                        position = self._range(tok, self.last),
+                    )
+
+                if self.tok[0] == 'LPAREN':
+                    lhs = self._call(name, tok)
+                else:
+                    lhs = VarExpression(name = name, position = name.position)
+
+                expr = self._expr((lhs, tok))
+
+            case _ if tok[0] in self.EXPR_START:
+                expr = self._expr()
+
+            case _:
+                self._error()
+
+        self._expect('SEMICOLON')
+
+        return ExprStatement(expression = expr, position = self._range(tok, self.last))
+
+    def _if(self) -> IfStatement:
+        # IF ... sblock (ELSE IF ... sblock)* (ELSE sblock)?, iteratively
+        chain = []                  # (first token, condition, then)
+        else_ = None
+        tok   = self._shift()
+
+        while True:
+            self._expect('LPAREN')
+            condition = self._expr()
+            self._expect('RPAREN')
+            chain.append((tok, condition, self._block()))
+
+            if self.tok[0] != 'ELSE':
+                # Empty `stmt_elif`: PLY positions it at the lexer state
+                end = (self.lexer.lexer.lineno, self.lexer.lexer.lexpos)
+                break
+
+            tok = self._shift()
+
+            if self.tok[0] != 'IF':
+                else_ = self._block()
+                end   = self.last
+                break
+
+            self._shift()
+
+        for tok, condition, then in reversed(chain):
+            else_ = IfStatement(
+                condition = condition,
+                then      = then,
+                else_     = else_,
+                position  = self._range(tok, end),
+            )
+
+        return else_
+
+    # ----------------------------------------------------------------
+    # Top-level declarations
+
+    def _procdecl(self) -> ProcDecl:
+        tok = self._shift()
+        name = self._name()
+        self._expect('LPAREN')
+
+        arguments = []
+        if self.tok[0] != 'RPAREN':
+            while True:
+                aname = self._name()
+                self._expect('COLON')
+                arguments.append((aname, self._type()))
+                if self.tok[0] != 'COMMA':
+                    break
+                self._shift()
+
+        self._expect('RPAREN')
+
+        rettype = None
+        if self.tok[0] == 'COLON':
+            self._shift()
+            rettype = self._type()
+
+        body = self._block()
+
+        return ProcDecl(
+            name      = name,
+            arguments = arguments,
+            rettype   = rettype,
+            body      = body,
+            position  = self._range(tok, self.last),
+        )
+
+    def _globvardecl(self) -> GlobVarDecl:
+        tok = self._shift()
+        name = self._name()
+        self._expect('EQ')
+        init = self._expr()
+        self._expect('COLON')
+        type_ = self._type()
+        self._expect('SEMICOLON')
+
+        return GlobVarDecl(
+            name     = name,
+            init     = init,
+            type_    = type_,
+            position = self._range(tok, self.last),
+        )
+
+    def _program(self) -> Program:
+        prgm = []
+
+        while self.tok[0] != '$end':
+            try:
+                match self.tok[0]:
+                    case 'DEF':
+                        prgm.append(self._procdecl())
+                    case 'VAR':
+                        prgm.append(self._globvardecl())
+                    case _:
+                        self._error()
+
+            except _SyntaxError:
+                # No enclosing block: PLY drops the offending token
+                # and restarts from its initial state.
+                prgm = []
+                self.tok = next(self.stream, self.EOF)
+
+        return prgm
@@ -3,32 +3,48 @@ import contextlib as cl
 import typing as tp
 
 # ====================================================================
+# Scopes are implemented as a single dictionary, mapping each name to
+# the stack of its bindings (innermost last), together with an undo
+# log that records, for each opened level, the names bound at that
+# level. All operations are O(1) (`close` is O(1) per binding).
+
 class Scope:
     def __init__(self):
-        self.vars = [dict()]
+        self.bindings: dict[str, list[tuple[int, tp.Any]]] = {}
+        self.undo    : list[list[str]] = [[]]
 
     def open(self):
-        self.vars.append(dict())
+        self.undo.append([])
 
     def close(self):
-        assert(len(self.vars) > 0)
-        self.vars.pop()
+        assert(len(self.undo) > 0)
+        for name in self.undo.pop():
+            stack = self.bindings[name]
+            stack.pop()
+            if not stack:
+                del self.bindings[name]
 
     def push(self, name: str, data: tp.Any):
-        assert(name not in self.vars[-1])
-        self.vars[-1][name] = data
+        assert(not self.islocal(name))
+        self.bindings.setdefault(name, []).append((len(self.undo), data))
+        self.undo[-1].append(name)
 
     def islocal(self, name: str):
-        return name in self.vars[-1]
+        stack = self.bindings.get(name)
+        return stack is not None and stack[-1][0] == len(self.undo)
 
     def __getitem__(self, name: str):
-        for s in self.vars[::-1]:
-            if name in s:
-                return s[name]
-        assert(False)
+        stack = self.bindings.get(name)
+        assert(stack is not None)
+        return stack[-1][1]
 
     def __contains__(self, name: str):
-        return any(name in s for s in self.vars)
+        return name in self.bindings
+
+    def items(self) -> tp.Iterator[tuple[str, tp.Any]]:
+        """The bound names, with their innermost data"""
+        for name, stack in self.bindings.items():
+            yield name, stack[-1][1]
 
     @cl.contextmanager
     def in_subscope(self):
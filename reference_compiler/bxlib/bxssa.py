@@ -0,0 +1,209 @@
+# --------------------------------------------------------------------
+import collections
+
+from .bxcfg        import CFG, CFGNode, uce
+from .bxcontext    import CompilationContext
+from .bxdominators import dominators
+from .bxliveness   import Liveness
+from .bxtac        import *
+
+# ====================================================================
+# Static Single Assignment form of a CFG
+#
+# A phi-function is a `phi` instruction at the start of the body of a
+# block, whose arguments are the pairs (predecessor, value), flattened:
+#
+#   %7 = phi '.L3', '%2', '.L5', '%6'
+#
+# `to_ssa` places the phi-functions at the iterated dominance frontiers
+# of the definitions (pruned with liveness: none for the temporaries
+# that never cross blocks), and renames the temporaries by a walk of the
+# dominator tree: every definition gets a fresh temporary, and a use
+# that is reached by no definition keeps the original name (e.g. the
+# arguments of the procedure).
+#
+# `from_ssa` goes back to plain TAC: the critical edges that lead to a
+# phi-function are split, and the phi-functions are replaced by parallel
+# copies at the end of the predecessors, sequentialized with `copy`.
+
+def _istemp(x) -> bool:
+    return isinstance(x, str) and x.startswith('%')
+
+def phis(node: CFGNode) -> list[TAC]:
+    """The phi-functions of `node`"""
+
+    aout = []
+    for tac in node.body:
+        if tac.opcode != 'phi':
+            break
+        aout.append(tac)
+    return aout
+
+# --------------------------------------------------------------------
+def to_ssa(cfg: CFG, context: CompilationContext) -> CFG:
+    """Puts `cfg` in SSA form (in place)"""
+
+    cfg = uce(cfg)
+
+    # The entry must have no predecessor: its phi-functions would miss
+    # the values on entry
+    if cfg[cfg.init].preds:
+        entry = CFGNode()
+        entry.label = context.fresh_label()
+        entry.jump  = ('jmp', cfg.init)
+        cfg.add(entry)
+        cfg.set_init(entry.label)
+
+    doms     = dominators(cfg)
+    frontier = doms.frontiers()
+    liveness = Liveness(cfg)
+
+    # Placement of the phi-functions: block -> temporary -> phi
+    sites = collections.defaultdict(dict)
+
+    for name, node in cfg.cfg.items():
+        for tac in node.body:
+            if _istemp(tac.result):
+                sites[tac.result][name] = None
+
+    placed = { x: {} for x in cfg.cfg }
+
+    for temp, blocks in sites.items():
+        if (index := liveness.index[temp]) >= liveness.nglobals:
+            continue                    # Never live across blocks
+
+        todo = list(blocks)
+
+        while todo:
+            for name in frontier[todo.pop()]:
+                if temp in placed[name] or not (liveness.live_in[name] >> index) & 1:
+                    continue
+                arguments = [x for pred in cfg[name].preds for x in (pred, temp)]
+                placed[name][temp] = TAC('phi', arguments, temp)
+                todo.append(name)
+
+    # Renaming (dominator tree walk)
+    stacks = collections.defaultdict(list)
+
+    def top(x):
+        return stacks[x][-1] if _istemp(x) and stacks[x] else x
+
+    todo = [(cfg.init, None)]
+
+    while todo:
+        name, pushed = todo.pop()
+
+        if pushed is not None:
+            for temp in pushed:
+                stacks[temp].pop()
+            continue
+
+        node, pushed = cfg[name], []
+
+        def define(temp: str) -> str:
+            stacks[temp].append(context.fresh_temporary())
+            pushed.append(temp)
+            return stacks[temp][-1]
+
+        for temp, phi in placed[name].items():
+            phi.result = define(temp)
+
+        body = list(placed[name].values())
+
+        for tac in node.body:
+            arguments = [top(x) for x in tac.arguments]
+            result    = define(tac.result) if _istemp(tac.result) else tac.result
+            body.append(TAC(tac.opcode, arguments, result))
+
+        node.body = body
+
+        if node.cjumps:
+            cfg.set_cjumps(name, [
+                (cjump, [top(args[0]), *args[1:]]) for cjump, args in node.cjumps
+            ])
+        if node.jump[0] == 'ret':
+            cfg.set_jump(name, ('ret', [top(x) for x in node.jump[1]]))
+
+        for succ in node.succs:
+            for temp, phi in placed[succ].items():
+                for i in range(0, len(phi.arguments), 2):
+                    if phi.arguments[i] == name:
+                        phi.arguments[i+1] = top(temp)
+
+        todo.append((name, pushed))
+        todo.extend((x, None) for x in reversed(doms.children[name]))
+
+    return cfg
+
+# --------------------------------------------------------------------
+def sequentialize(copies: list[tuple[str, str]], context: CompilationContext) -> list[TAC]:
+    """The `copy` instructions of the parallel copies (destination,
+    source), using a fresh temporary to break each cycle"""
+
+    pending = { dst: src for dst, src in copies if dst != src }
+    readers = collections.Counter(pending.values())
+    aout    = []
+
+    while pending:
+        ready = [x for x in pending if readers[x] == 0]
+
+        if not ready:
+            # Only cycles are left: the value of one destination is
+            # saved, and read from there by the copies
+            dst = next(iter(pending))
+            tmp = context.fresh_temporary()
+            aout.append(TAC('copy', [dst], tmp))
+            for x, src in pending.items():
+                if src == dst:
+                    pending[x] = tmp
+            readers[tmp], readers[dst] = readers[dst], 0
+            continue
+
+        for dst in ready:
+            src = pending.pop(dst)
+            readers[src] -= 1
+            aout.append(TAC('copy', [src], dst))
+
+    return aout
+
+# --------------------------------------------------------------------
+def from_ssa(cfg: CFG, context: CompilationContext) -> CFG:
+    """Puts `cfg`, in SSA form, back in plain TAC (in place)"""
+
+    # Critical edges
+    for name in list(cfg.cfg):
+        if not (nphis := phis(cfg[name])):
+            continue
+
+        for pred in list(cfg[name].preds):
+            if len(cfg[pred].succs) <= 1:
+                continue
+
+            split = CFGNode()
+            split.label = context.fresh_label()
+            split.jump  = ('jmp', name)
+            cfg.add(split)
+            cfg.retarget(pred, name, split.label)
+
+            for phi in nphis:
+                phi.arguments = [split.label if x == pred and i % 2 == 0 else x
+                                 for i, x in enumerate(phi.arguments)]
+
+    # Parallel copies
+    for name in list(cfg.cfg):
+        node = cfg[name]
+
+        if not (nphis := phis(node)):
+            continue
+
+        node.body = node.body[len(nphis):]
+        copies    = collections.defaultdict(list)
+
+        for phi in nphis:
+            for i in range(0, len(phi.arguments), 2):
+                copies[phi.arguments[i]].append((phi.result, phi.arguments[i+1]))
+
+        for pred, pcopies in copies.items():
+            cfg[pred].body.extend(sequentialize(pcopies, context))
+
+    return cfg
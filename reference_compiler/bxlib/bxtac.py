@@ -3,22 +3,39 @@ import dataclasses as dc
 
 from typing import Optional as Opt
 
+from .bxast import Operator
+
 # ====================================================================
 # Three-Address Code
 
 OPCODES = {
-    'opposite'            : 'neg',
-    'addition'            : 'add',
-    'subtraction'         : 'sub',
-    'multiplication'      : 'mul',
-    'division'            : 'div',
-    'modulus'             : 'mod',
-    'bitwise-negation'    : 'not',
-    'bitwise-and'         : 'and',
-    'bitwise-or'          :  'or',
-    'bitwise-xor'         : 'xor',
-    'logical-left-shift'  : 'shl',
-    'logical-right-shift' : 'shr',
+    Operator.OPPOSITE            : 'neg',
+    Operator.ADDITION            : 'add',
+    Operator.SUBTRACTION         : 'sub',
+    Operator.MULTIPLICATION      : 'mul',
+    Operator.DIVISION            : 'div',
+    Operator.MODULUS             : 'mod',
+    Operator.BITWISE_NEGATION    : 'not',
+    Operator.BITWISE_AND         : 'and',
+    Operator.BITWISE_OR          :  'or',
+    Operator.BITWISE_XOR         : 'xor',
+    Operator.LOGICAL_LEFT_SHIFT  : 'shl',
+    Operator.LOGICAL_RIGHT_SHIFT : 'shr',
+}
+
+# Opcode -> (numbers of arguments, result: required / forbidden / optional)
+ARITIES = {
+    'const' : ((1,), True ),
+    'copy'  : ((1,), True ),
+    'neg'   : ((1,), True ),
+    'not'   : ((1,), True ),
+    **{ x: ((2,), True) for x in ('add', 'sub', 'mul', 'div', 'mod', 'and', 'or', 'xor', 'shl', 'shr') },
+    'print' : ((1,), False),
+    'jmp'   : ((1,), False),
+    **{ x: ((2,), False) for x in ('jz', 'jnz', 'jlt', 'jle', 'jgt', 'jge') },
+    'param' : ((2,), False),
+    'call'  : ((2,), None ),
+    'ret'   : ((0, 1), False),
 }
 
 # --------------------------------------------------------------------
@@ -35,6 +52,10 @@ class TAC:
             result = self.result   ,
         )
 
+    @staticmethod
+    def of_json(js: dict):
+        return TAC(js['opcode'], list(js['args']), js.get('result'))
+
     def __repr__(self):
         aout = self.opcode
         if self.arguments:
@@ -52,6 +73,29 @@ class TACProc:
         self.arguments = arguments
         self.tac       = []
 
+    def tojson(self):
+        # Labels are `label` pseudo-instructions
+        def tojson(tac: TAC | str):
+            if isinstance(tac, str):
+                return dict(opcode = 'label', args = [tac[:-1]], result = None)
+            return tac.tojson()
+
+        return dict(
+            proc = f'@{self.name}',
+            args = self.arguments,
+            body = [tojson(x) for x in self.tac],
+        )
+
+    @staticmethod
+    def of_json(js: dict):
+        aout = TACProc(js['proc'].removeprefix('@'), list(js.get('args', [])))
+        for tac in js['body']:
+            if tac['opcode'] == 'label':
+                aout.tac.append(f"{tac['args'][0]}:")
+            else:
+                aout.tac.append(TAC.of_json(tac))
+        return aout
+
     def __repr__(self):
         aout = f"proc @{self.name}"
         if self.arguments:
@@ -69,5 +113,12 @@ class TACVar:
         self.name  = name
         self.value = value
 
+    def tojson(self):
+        return dict(var = f'@{self.name}', init = [self.value])
+
+    @staticmethod
+    def of_json(js: dict):
+        return TACVar(js['var'].removeprefix('@'), js['init'][0])
+
     def __repr__(self):
         return f"var @{self.name} = {self.value};"
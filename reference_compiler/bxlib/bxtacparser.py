@@ -0,0 +1,226 @@
+# --------------------------------------------------------------------
+import json
+import re
+
+from typing import Optional as Opt
+
+from .bxast    import Range
+from .bxerrors import Reporter
+from .bxtac    import *
+
+# ====================================================================
+# TAC reader
+#
+# Reads back the TAC of a program, in either of its two forms:
+#
+#  - the JSON form (as in the labs, see the `tojson` methods): a list of
+#    `{"var": "@x", "init": [42]}` and `{"proc": "@f", "args": [...],
+#    "body": [...]}` objects, the labels being `label` instructions;
+#
+#  - the textual form, as printed by the `__repr__` methods:
+#
+#        var @x = 42;
+#        proc @f('%x', '%y'):
+#            %0 = add '%x', '%y';
+#            .Lf.1:;
+#            ret '%0';
+#
+#   (the quotes of the arguments are optional).
+#
+# The declarations are checked, so that the CFG passes & the back-end
+# can be run on the result: no name is declared twice, the opcodes & their
+# arities are known (see `ARITIES`), the operands have the expected kinds
+# (see `OPERANDS`) and the jump targets are labels of the procedure.
+
+# Opcode -> kinds of the operands:
+#   `int` (immediate), `var` (temporary or global), `label`, `proc`
+OPERANDS = {
+    'const' : ('int',),
+    **{ x: ('var',) for x in ('copy', 'neg', 'not', 'print', 'ret') },
+    **{ x: ('var', 'var') for x in ('add', 'sub', 'mul', 'div', 'mod', 'and', 'or', 'xor', 'shl', 'shr') },
+    'jmp'   : ('label',),
+    **{ x: ('var', 'label') for x in ('jz', 'jnz', 'jlt', 'jle', 'jgt', 'jge') },
+    'param' : ('int', 'var'),
+    'call'  : ('proc', 'int'),
+}
+
+def _isvar(x) -> bool:
+    return isinstance(x, str) and x[:1] in ('%', '@')
+
+def _kind(x, kind: str) -> bool:
+    match kind:
+        case 'int':
+            return isinstance(x, int) and not isinstance(x, bool)
+        case 'var':
+            return _isvar(x)
+        case _:
+            return isinstance(x, str) and not _isvar(x)
+
+class TACParser:
+    VAR   = re.compile(r"var\s+@(\w+)\s*=\s*(-?\d+)\s*;")
+    PROC  = re.compile(r"proc\s+@(\w+)\s*(?:\((.*)\))?\s*:")
+    LABEL = re.compile(r"([.\w]+):\s*;")
+    INSTR = re.compile(r"(?:([%@][.\w]+)\s*=\s*)?(\w+)(?:\s+(.*?))?\s*;")
+    ARG   = re.compile(r"\s*(?:(-?\d+)|'([^']*)'|\"([^\"]*)\"|([%@]?[.\w]+))\s*(?:,|$)")
+
+    def __init__(self, reporter: Reporter):
+        self.reporter = reporter
+
+    def parse(self, text: str) -> Opt[list[TACProc | TACVar]]:
+        """The declarations of `text`, `None` on error"""
+
+        with self.reporter.checkpoint() as checkpoint:
+            if text.lstrip().startswith('['):
+                tac = self.parse_json(text)
+            else:
+                tac = self.parse_text(text)
+
+            if tac is not None:
+                names = set()
+                for decl in tac:
+                    if decl.name in names:
+                        self.reporter(f'duplicate declaration: @{decl.name}')
+                    names.add(decl.name)
+                    if isinstance(decl, TACProc):
+                        self.check(decl)
+
+            return tac if checkpoint else None
+
+    # ----------------------------------------------------------------
+    def parse_json(self, text: str) -> Opt[list[TACProc | TACVar]]:
+        try:
+            return [
+                TACVar.of_json(js) if 'var' in js else TACProc.of_json(js)
+                for js in json.loads(text)
+            ]
+
+        except json.JSONDecodeError as e:
+            position = None
+            if e.lineno <= len(self.reporter.source):
+                position = Range.of_position(e.lineno, e.colno - 1)
+            self.reporter(f'invalid JSON TAC: {e.msg}', position = position)
+
+        except (TypeError, KeyError, IndexError, AttributeError) as e:
+            self.reporter(f'invalid JSON TAC: unexpected structure ({e!r})')
+
+        return None
+
+    # ----------------------------------------------------------------
+    def parse_text(self, text: str) -> list[TACProc | TACVar]:
+        aout, proc = [], None
+
+        for lineno, line in enumerate(text.splitlines(), start = 1):
+            if not (line := line.strip()):
+                continue
+
+            def error(message: str):
+                self.reporter(message, position = Range((lineno, 0), (lineno, len(line))))
+
+            if m := self.VAR.fullmatch(line):
+                proc = None
+                aout.append(TACVar(m.group(1), int(m.group(2))))
+
+            elif m := self.PROC.fullmatch(line):
+                if (arguments := self.parse_args(m.group(2) or '')) is None:
+                    error(f'invalid procedure arguments: {m.group(2)}')
+                    arguments = []
+                proc = TACProc(m.group(1), arguments)
+                aout.append(proc)
+
+            elif proc is None:
+                error(f'expecting a procedure or variable declaration: {line}')
+
+            elif m := self.LABEL.fullmatch(line):
+                proc.tac.append(f'{m.group(1)}:')
+
+            elif m := self.INSTR.fullmatch(line):
+                if (arguments := self.parse_args(m.group(3) or '')) is None:
+                    error(f'invalid instruction arguments: {m.group(3)}')
+                    continue
+                proc.tac.append(TAC(m.group(2), arguments, m.group(1)))
+
+            else:
+                error(f'invalid TAC instruction: {line}')
+
+        return aout
+
+    def parse_args(self, text: str) -> Opt[list[str | int]]:
+        aout, position = [], 0
+
+        while position < len(text):
+            if (m := self.ARG.match(text, position)) is None or m.end() == position:
+                return None
+            position = m.end()
+            if m.group(1) is not None:
+                aout.append(int(m.group(1)))
+            else:
+                aout.append(next(x for x in m.groups()[1:] if x is not None))
+
+        return aout
+
+    # ----------------------------------------------------------------
+    def check(self, proc: TACProc):
+        labels = set()
+
+        for argument in proc.arguments:
+            if not (isinstance(argument, str) and argument.startswith('%')):
+                self.reporter(f'in @{proc.name}: invalid argument: {argument!r}')
+
+        for tac in proc.tac:
+            if isinstance(tac, str):
+                if tac[:-1] in labels:
+                    self.reporter(f'in @{proc.name}: duplicate label: {tac[:-1]}')
+                labels.add(tac[:-1])
+
+        for tac in proc.tac:
+            if isinstance(tac, str):
+                continue
+
+            if tac.opcode not in ARITIES:
+                self.reporter(f'in @{proc.name}: unknown opcode: {tac.opcode}')
+                continue
+
+            nargs, result = ARITIES[tac.opcode]
+
+            if len(tac.arguments) not in nargs:
+                self.reporter(f'in @{proc.name}: wrong number of arguments: {tac!r}')
+            elif result is not None and result != (tac.result is not None):
+                self.reporter(
+                    f'in @{proc.name}: {"missing" if result else "unexpected"} result: {tac!r}'
+                )
+            elif tac.result is not None and not _isvar(tac.result):
+                self.reporter(f'in @{proc.name}: invalid result: {tac!r}')
+            else:
+                for argument, kind in zip(tac.arguments, OPERANDS[tac.opcode]):
+                    if not _kind(argument, kind):
+                        self.reporter(f'in @{proc.name}: expecting {kind} operand: {tac!r}')
+                        break
+                    if kind == 'label' and argument not in labels:
+                        self.reporter(f'in @{proc.name}: unknown label {argument}: {tac!r}')
+
+# --------------------------------------------------------------------
+NUMBERED = re.compile(r'(?:%|\.L(?:\w+\.)?)(\d+)')
+
+def counters(tac: list[TACProc | TACVar]) -> dict[str, int]:
+    """The last temporary/label number of each procedure of `tac`"""
+
+    # So that the numbering can be continued (see `CompilationContext`)
+    aout = {}
+
+    for decl in tac:
+        if isinstance(decl, TACProc):
+            names = decl.arguments[:]
+            for itac in decl.tac:
+                if isinstance(itac, str):
+                    names.append(itac[:-1])
+                else:
+                    names.extend(x for x in itac.arguments if isinstance(x, str))
+                    if itac.result is not None:
+                        names.append(itac.result)
+
+            aout[decl.name] = max(
+                (int(m.group(1)) for x in names if (m := NUMBERED.fullmatch(x))),
+                default = -1,
+            )
+
+    return aout
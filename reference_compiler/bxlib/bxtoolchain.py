@@ -0,0 +1,147 @@
+# --------------------------------------------------------------------
+import asyncio
+import concurrent.futures as cf
+import dataclasses as dc
+import hashlib
+import os
+import pkgutil
+import subprocess as sp
+import tempfile
+import threading
+import time
+
+from typing import Optional as Opt
+
+from .bxlexer import TABDIR
+
+# ====================================================================
+# Toolchain (gcc): assembling & linking
+#
+# The runtime (bxruntime.c) is compiled once, into an object that is
+# cached next to the parser tables and named after the hash of its
+# source & flags. The assembly is piped to `gcc -x assembler -`.
+#
+# The jobs are coroutines, run by an event loop of their own (on a
+# background thread, see `Toolchain.submit`), at most `jobs` at a time:
+# the callers can go on with the next inputs while gcc runs.
+
+CFLAGS = ('-g',)
+
+_runtimes: dict[str, str] = {}
+_runtimes_lock = threading.Lock()
+
+def runtime_object(directory: str = TABDIR) -> str:
+    """Path of the compiled runtime (compiled on first use)"""
+
+    with _runtimes_lock:
+        if directory in _runtimes:
+            return _runtimes[directory]
+
+        source = pkgutil.get_data(__package__, 'bxruntime.c')
+        digest = hashlib.sha256('\0'.join(CFLAGS).encode() + b'\0' + source)
+        path   = os.path.join(directory, f'bxruntime-{digest.hexdigest()[:16]}.o')
+
+        if not os.path.isfile(path):
+            os.makedirs(directory, exist_ok = True)
+
+            # Built aside, then renamed (concurrent compilers)
+            fd, tmp = tempfile.mkstemp(dir = directory, prefix = 'tmp-', suffix = '.o')
+            os.close(fd)
+
+            try:
+                sp.run(
+                    ['gcc', *CFLAGS, '-c', '-x', 'c', '-o', tmp, '-'],
+                    input = source, stdout = sp.PIPE, stderr = sp.PIPE, check = True,
+                )
+                os.replace(tmp, path)
+            finally:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+
+        _runtimes[directory] = path
+        return path
+
+# --------------------------------------------------------------------
+@dc.dataclass
+class Job:
+    name       : str                # e.g. `assemble foo.o`
+    returncode : int
+    stdout     : str
+    stderr     : str
+    elapsed    : float              # In seconds
+
+    ok = property(lambda self: self.returncode == 0)
+
+# --------------------------------------------------------------------
+class Toolchain:
+    def __init__(self, jobs: int = 0):
+        self.jobs       = jobs or os.cpu_count() or 1
+        self._semaphore = asyncio.Semaphore(self.jobs)
+        self._loop      = None
+        self._lock      = threading.Lock()
+
+    def submit(self, coroutine) -> cf.Future:
+        """Schedules `coroutine` on the event loop of the toolchain"""
+
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target = self._loop.run_forever,
+                    name   = 'toolchain',
+                    daemon = True,
+                ).start()
+
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    def run(self, coroutine):
+        return self.submit(coroutine).result()
+
+    # ----------------------------------------------------------------
+    async def _run(self, name: str, command: list[str], cwd: str, input: Opt[bytes] = None) -> Job:
+        async with self._semaphore:
+            start = time.perf_counter()
+
+            proc = await asyncio.create_subprocess_exec(
+                *command,
+                cwd    = cwd,
+                stdin  = sp.DEVNULL if input is None else sp.PIPE,
+                stdout = sp.PIPE,
+                stderr = sp.PIPE,
+            )
+
+            stdout, stderr = await proc.communicate(input)
+
+            return Job(
+                name       = name,
+                returncode = proc.returncode,
+                stdout     = stdout.decode(errors = 'replace'),
+                stderr     = stderr.decode(errors = 'replace'),
+                elapsed    = time.perf_counter() - start,
+            )
+
+    async def assemble(self, asm: str, output: str, cwd: str = '.') -> Job:
+        return await self._run(
+            f'assemble {output}',
+            ['gcc', *CFLAGS, '-c', '-x', 'assembler', '-o', output, '-'],
+            cwd, asm.encode(),
+        )
+
+    async def link(self, objects: list[str], output: str, cwd: str = '.') -> Job:
+        runtime = await asyncio.to_thread(runtime_object)
+
+        return await self._run(
+            f'link {output}',
+            ['gcc', *CFLAGS, '-o', output, runtime, *objects],
+            cwd,
+        )
+
+    async def build(self, asm: str, basename: str, cwd: str = '.') -> list[Job]:
+        """Assembles & links `basename`.o & `basename`.exe (in `cwd`)"""
+
+        jobs = [await self.assemble(asm, f'{basename}.o', cwd)]
+
+        if jobs[-1].ok:
+            jobs.append(await self.link([f'{basename}.o'], f'{basename}.exe', cwd))
+
+        return jobs
@@ -1,10 +1,12 @@
 # --------------------------------------------------------------------
 import contextlib as cl
+import functools as ft
 import typing as tp
 
-from .bxerrors import Reporter
-from .bxast    import *
-from .bxscope  import Scope
+from .bxerrors  import Reporter
+from .bxast     import *
+from .bxscope   import Scope
+from .bxvisitor import Visitor
 
 # ====================================================================
 SigType    = tuple[tuple[Type], Opt[Type]]
@@ -57,32 +59,32 @@ class PreTyper:
         return scope, procs
 
 # --------------------------------------------------------------------
-class TypeChecker:
+class TypeChecker(Visitor):
     B : Type = Type.BOOL
     I : Type = Type.INT
 
     SIGS = {
-        'opposite'                 : ([I   ], I),
-        'bitwise-negation'         : ([B   ], B),
-        'boolean-not'              : ([B   ], B),
-        'addition'                 : ([I, I], I),
-        'subtraction'              : ([I, I], I),
-        'multiplication'           : ([I, I], I),
-        'division'                 : ([I, I], I),
-        'modulus'                  : ([I, I], I),
-        'logical-right-shift'      : ([I, I], I),
-        'logical-left-shift'       : ([I, I], I),
-        'bitwise-and'              : ([I, I], I),
-        'bitwise-or'               : ([I, I], I),
-        'bitwise-xor'              : ([I, I], I),
-        'boolean-and'              : ([B, B], B),
-        'boolean-or'               : ([B, B], B),
-        'cmp-equal'                : ([I, I], B),
-        'cmp-not-equal'            : ([I, I], B),
-        'cmp-lower-than'           : ([I, I], B),
-        'cmp-lower-or-equal-than'  : ([I, I], B),
-        'cmp-greater-than'         : ([I, I], B),
-        'cmp-greater-or-equal-than': ([I, I], B),
+        Operator.OPPOSITE                 : ([I   ], I),
+        Operator.BITWISE_NEGATION         : ([B   ], B),
+        Operator.BOOLEAN_NOT              : ([B   ], B),
+        Operator.ADDITION                 : ([I, I], I),
+        Operator.SUBTRACTION              : ([I, I], I),
+        Operator.MULTIPLICATION           : ([I, I], I),
+        Operator.DIVISION                 : ([I, I], I),
+        Operator.MODULUS                  : ([I, I], I),
+        Operator.LOGICAL_RIGHT_SHIFT      : ([I, I], I),
+        Operator.LOGICAL_LEFT_SHIFT       : ([I, I], I),
+        Operator.BITWISE_AND              : ([I, I], I),
+        Operator.BITWISE_OR               : ([I, I], I),
+        Operator.BITWISE_XOR              : ([I, I], I),
+        Operator.BOOLEAN_AND              : ([B, B], B),
+        Operator.BOOLEAN_OR               : ([B, B], B),
+        Operator.CMP_EQUAL                : ([I, I], B),
+        Operator.CMP_NOT_EQUAL            : ([I, I], B),
+        Operator.CMP_LOWER_THAN           : ([I, I], B),
+        Operator.CMP_LOWER_OR_EQUAL_THAN  : ([I, I], B),
+        Operator.CMP_GREATER_THAN         : ([I, I], B),
+        Operator.CMP_GREATER_OR_EQUAL_THAN: ([I, I], B),
     }
 
     def __init__(self, scope : Scope, procs : ProcSigMap, reporter : Reporter):
@@ -95,14 +97,6 @@ class TypeChecker:
     def report(self, msg: str, position: Opt[Range] = None):
         self.reporter(msg, position = position)
 
-    @cl.contextmanager
-    def in_loop(self):
-        self.loops += 1
-        try:
-            yield self
-        finally:
-            self.loops -= 1
-
     @cl.contextmanager
     def in_proc(self, proc: ProcDecl):
         assert(self.proc is None)
@@ -136,65 +130,29 @@ class TypeChecker:
             return False
         return True
 
-    def for_expression(self, expr : Expression, etype : tp.Optional[Type] = None):
-        type_ = None
-
-        match expr:
-            case VarExpression(name):
-                if self.check_local_bound(name):
-                    type_ = self.scope[name.value]
-
-            case BoolExpression(_):
-                type_ = Type.BOOL
-
-            case IntExpression(value):
-                self.check_integer_constant_range(value)
-                type_ = Type.INT
-
-            case OpAppExpression(opname, arguments):
-                opsig = self.SIGS[opname]
-                for atype, argument in zip(opsig[0], arguments):
-                    self.for_expression(argument, etype = atype)
-                type_ = opsig[1]
-
-            case CallExpression(name, arguments):
-                atypes, retty = [], None
+    # ----------------------------------------------------------------
+    # Expressions
+    #
+    # Post-order traversal, with an explicit stack (no recursion, so that
+    # deeply nested expressions are supported). The entries are:
+    #
+    #  - (expression, expected type, None, None) for the expressions to
+    #    visit (see the 'expr' visitors),
+    #  - (expression, expected type, computed type, post) for the ones
+    #    whose sub-expressions have been visited: `post` is then called.
 
-                if name.value not in self.procs:
-                    self.report(
-                        f'unknown procedure: {name.value}',
-                        position = name.position,
-                    )
-                else:
-                    atypes, retty = self.procs[name.value]
-
-                    if len(atypes) != len(arguments):
-                        self.report(
-                            f'invalid number of arguments: expected {len(atypes)}, got {len(arguments)}',
-                            position = expr.position,
-                        )
-
-                for i, a in enumerate(arguments):
-                    self.for_expression(a, atypes[i] if i in range(len(atypes)) else None)
-
-                type_ = retty
-
-            case PrintExpression(e):
-                self.for_expression(e);
-
-                if e.type_ is not None:
-                    if e.type_ not in (Type.INT, Type.BOOL):
-                        self.report(
-                            f'can only print integers and booleans, not {e.type_}',
-                            position = e.position,
-                        )
+    def for_expression(self, expr : Expression, etype : tp.Optional[Type] = None):
+        stack = [(expr, etype, None, None)]
 
-                type_ = Type.VOID
+        while stack:
+            expr, etype, type_, post = stack.pop()
 
-            case _:
-                print(expr)
-                assert(False)
+            if post is None:
+                self.dispatch('expr', expr)(self, expr, etype, stack)
+            else:
+                post(self, expr, etype, type_)
 
+    def typed(self, expr : Expression, etype : tp.Optional[Type], type_ : tp.Optional[Type]):
         if type_ is not None:
             if etype is not None:
                 if type_ != etype:
@@ -205,93 +163,197 @@ class TypeChecker:
 
         expr.type_ = type_
 
+    @Visitor.on('expr', VarExpression)
+    def for_var_expression(self, expr, etype, stack):
+        type_ = None
+        if self.check_local_bound(expr.name):
+            type_ = self.scope[expr.name.value]
+        self.typed(expr, etype, type_)
+
+    @Visitor.on('expr', BoolExpression)
+    def for_bool_expression(self, expr, etype, stack):
+        self.typed(expr, etype, Type.BOOL)
+
+    @Visitor.on('expr', IntExpression)
+    def for_int_expression(self, expr, etype, stack):
+        self.check_integer_constant_range(expr.value)
+        self.typed(expr, etype, Type.INT)
+
+    @Visitor.on('expr', OpAppExpression)
+    def for_opapp_expression(self, expr, etype, stack):
+        opsig = self.SIGS[expr.operator]
+        stack.append((expr, etype, opsig[1], TypeChecker.typed))
+        stack.extend(
+            (argument, atype, None, None)
+            for atype, argument in reversed(list(zip(opsig[0], expr.arguments)))
+        )
+
+    @Visitor.on('expr', CallExpression)
+    def for_call_expression(self, expr, etype, stack):
+        name, arguments = expr.proc, expr.arguments
+        atypes, retty = [], None
+
+        if name.value not in self.procs:
+            self.report(
+                f'unknown procedure: {name.value}',
+                position = name.position,
+            )
+        else:
+            atypes, retty = self.procs[name.value]
+
+            if len(atypes) != len(arguments):
+                self.report(
+                    f'invalid number of arguments: expected {len(atypes)}, got {len(arguments)}',
+                    position = expr.position,
+                )
+
+        stack.append((expr, etype, retty, TypeChecker.typed))
+        stack.extend(
+            (a, atypes[i] if i in range(len(atypes)) else None, None, None)
+            for i, a in reversed(list(enumerate(arguments)))
+        )
+
+    @Visitor.on('expr', PrintExpression)
+    def for_print_expression(self, expr, etype, stack):
+        stack.append((expr, etype, Type.VOID, TypeChecker.for_printed))
+        stack.append((expr.argument, None, None, None))
+
+    def for_printed(self, expr, etype, type_):
+        e = expr.argument
+
+        if e.type_ is not None:
+            if e.type_ not in (Type.INT, Type.BOOL):
+                self.report(
+                    f'can only print integers and booleans, not {e.type_}',
+                    position = e.position,
+                )
+
+        self.typed(expr, etype, type_)
+
+    # ----------------------------------------------------------------
+    # Statements
+    #
+    # Explicit stack of tasks (no recursion, so that deeply nested blocks
+    # are supported): a task is a statement to visit (see the 'stmt'
+    # visitors), or a continuation (e.g. closing a scope), to call once
+    # the statements pushed before it have been visited.
+
     def for_statement(self, stmt : Statement):
-        match stmt:
-            case VarDeclStatement(name, init, type_):
-                if self.check_local_free(name):
-                    self.scope.push(name.value, type_)
-                self.for_expression(init, etype = type_)
-
-            case AssignStatement(lhs, rhs):
-                lhstype = self.check_local_bound(lhs)
-                self.for_expression(rhs, etype = lhstype)
-
-            case ExprStatement(expression):
-                self.for_expression(expression)
-
-            case BlockStatement(block):
-                self.for_block(block)
-
-            case IfStatement(condition, iftrue, iffalse):
-                self.for_expression(condition, etype = Type.BOOL)
-                self.for_statement(iftrue)
-                if iffalse is not None:
-                    self.for_statement(iffalse)
-
-            case WhileStatement(condition, body):
-                self.for_expression(condition, etype = Type.BOOL)
-                with self.in_loop():
-                    self.for_statement(body)
-
-            case BreakStatement() | ContinueStatement():
-                if self.loops == 0:
-                    self.report(
-                        'break/continue statement outside of a loop',
-                        position = stmt.position,
-                    )
+        tasks = [stmt]
 
-            case PrintStatement(init):
-                self.for_expression(init, etype = Type.INT)
+        while tasks:
+            task = tasks.pop()
 
-            case ReturnStatement(e):
-                if e is None:
-                    if self.proc.rettype is not None:
-                        self.report(
-                            'value-less return statement in a function',
-                            position = stmt.position,
-                        )
-                    self.for_expression(e, etype = self.proc.retty)
-                else:
-                    if self.proc.rettype is None:
-                        self.report(
-                            'return statement in a subroutine',
-                            position = stmt.position,
-                        )
+            if isinstance(task, Statement):
+                self.dispatch('stmt', task)(self, task, tasks)
+            else:
+                task()
 
-            case _:
-                print(stmt)
-                assert(False)
+    @Visitor.on('stmt', VarDeclStatement)
+    def for_vardecl_statement(self, stmt, tasks):
+        if self.check_local_free(stmt.name):
+            self.scope.push(stmt.name.value, stmt.type_)
+        self.for_expression(stmt.init, etype = stmt.type_)
+
+    @Visitor.on('stmt', AssignStatement)
+    def for_assign_statement(self, stmt, tasks):
+        lhstype = self.check_local_bound(stmt.lhs)
+        self.for_expression(stmt.rhs, etype = lhstype)
+
+    @Visitor.on('stmt', ExprStatement)
+    def for_expr_statement(self, stmt, tasks):
+        self.for_expression(stmt.expression)
+
+    @Visitor.on('stmt', BlockStatement)
+    def for_block_statement(self, stmt, tasks):
+        self.scope.open()
+        tasks.append(self.scope.close)
+        tasks.extend(reversed(stmt.body))
+
+    @Visitor.on('stmt', IfStatement)
+    def for_if_statement(self, stmt, tasks):
+        # else-if chains are handled iteratively
+        todo = []
+
+        while isinstance(stmt, IfStatement):
+            todo.append(ft.partial(self.for_expression, stmt.condition, etype = Type.BOOL))
+            todo.append(stmt.then)
+            stmt = stmt.else_
+        if stmt is not None:
+            todo.append(stmt)
+
+        tasks.extend(reversed(todo))
+
+    @Visitor.on('stmt', WhileStatement)
+    def for_while_statement(self, stmt, tasks):
+        self.for_expression(stmt.condition, etype = Type.BOOL)
+        self.loops += 1
+        tasks.append(self.leave_loop)
+        tasks.append(stmt.body)
 
-    def for_block(self, block : Block):
-        with self.scope.in_subscope():
-            for stmt in block:
-                self.for_statement(stmt)
+    def leave_loop(self):
+        self.loops -= 1
+
+    @Visitor.on('stmt', BreakStatement)
+    @Visitor.on('stmt', ContinueStatement)
+    def for_jump_statement(self, stmt, tasks):
+        if self.loops == 0:
+            self.report(
+                'break/continue statement outside of a loop',
+                position = stmt.position,
+            )
+
+    @Visitor.on('stmt', PrintStatement)
+    def for_print_statement(self, stmt, tasks):
+        self.for_expression(stmt.value, etype = Type.INT)
+
+    @Visitor.on('stmt', ReturnStatement)
+    def for_return_statement(self, stmt, tasks):
+        if stmt.expr is None:
+            if self.proc.rettype is not None:
+                self.report(
+                    'value-less return statement in a function',
+                    position = stmt.position,
+                )
+            self.for_expression(stmt.expr, etype = self.proc.retty)
+        else:
+            if self.proc.rettype is None:
+                self.report(
+                    'return statement in a subroutine',
+                    position = stmt.position,
+                )
+
+    # ----------------------------------------------------------------
+    # Top-level declarations
 
     def for_topdecl(self, decl : TopDecl):
-        match decl:
-            case ProcDecl(name, arguments, retty, body):
-                with self.in_proc(decl):
-                    for vname, vtype_ in arguments:
-                        if self.check_local_free(vname):
-                            self.scope.push(vname.value, vtype_)
-                    self.for_statement(body)
-
-                    if retty is not None:
-                        if not self.has_return(body):
-                            self.report(
-                                'this function is missing a return statement',
-                                position = decl.position,
-                            )
-
-            case GlobVarDecl(name, init, type_):
-                self.for_expression(init, etype = type_)
-
-                if not self.check_constant(init):
+        self.dispatch('topdecl', decl)(self, decl)
+
+    @Visitor.on('topdecl', ProcDecl)
+    def for_procdecl(self, decl):
+        with self.in_proc(decl):
+            for vname, vtype_ in decl.arguments:
+                if self.check_local_free(vname):
+                    self.scope.push(vname.value, vtype_)
+            self.for_statement(decl.body)
+
+            if decl.rettype is not None:
+                if not self.has_return(decl.body):
                     self.report(
-                        'this expression is not a literal',
-                        position = init.position,
+                        'this function is missing a return statement',
+                        position = decl.position,
                     )
 
+    @Visitor.on('topdecl', GlobVarDecl)
+    def for_globvardecl(self, decl):
+        self.for_expression(decl.init, etype = decl.type_)
+
+        if not self.check_constant(decl.init):
+            self.report(
+                'this expression is not a literal',
+                position = decl.init.position,
+            )
+
     def for_program(self, prgm : Program):
         for decl in prgm:
             self.for_topdecl(decl)
@@ -305,20 +367,39 @@ class TypeChecker:
                 return False
 
     def has_return(self, stmt: Statement):
-        match stmt:
-            case ReturnStatement(_):
-                return True
-
-            case IfStatement(_, iftrue, iffalse):
-                return \
-                    self.has_return(iftrue) and \
-                    self.has_return(iffalse)
+        # Post-order evaluation, with an explicit stack: the entries are
+        # the statements to evaluate, and the (`all` | `any`, count)
+        # combinations of the last `count` values
+        stack, values = [stmt], []
+
+        while stack:
+            match stack.pop():
+                case (combine, count):
+                    value = combine(values[len(values)-count:])
+                    del values[len(values)-count:]
+                    values.append(value)
+
+                case IfStatement() as stmt:
+                    # else-if chains are handled iteratively
+                    branches = []
+                    while isinstance(stmt, IfStatement):
+                        branches.append(stmt.then)
+                        stmt = stmt.else_
+                    branches.append(stmt)
+                    stack.append((all, len(branches)))
+                    stack.extend(branches)
+
+                case BlockStatement(block):
+                    stack.append((any, len(block)))
+                    stack.extend(block)
+
+                case ReturnStatement(_):
+                    values.append(True)
 
-            case BlockStatement(block):
-                return any(self.has_return(b) for b in block)
+                case _:
+                    values.append(False)
 
-            case _:
-                return False
+        return values.pop()
 
     def check(self, prgm : Program):
         self.for_program(prgm)
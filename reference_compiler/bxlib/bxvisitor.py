@@ -0,0 +1,72 @@
+# --------------------------------------------------------------------
+import typing as tp
+
+from .bxast import *
+
+# ====================================================================
+# Visitors with precomputed dispatch tables
+#
+# A visitor method is registered, for a given kind of traversal (e.g.
+# 'expr' or 'stmt'), on a node class -- and optionally on a set of
+# operators, for `OpAppExpression`:
+#
+#     class MyVisitor(Visitor):
+#         @Visitor.on('expr', IntExpression)
+#         def for_int(self, expr): ...
+#
+#         @Visitor.on('expr', OpAppExpression, Operator.BOOLEAN_AND)
+#         def for_and(self, expr): ...
+#
+# The dispatch tables are built once, when the class is created, and
+# `dispatch(kind, node)` is then a dictionary lookup on the node class
+# (plus one on the operator, for the `OpAppExpression` nodes that are
+# dispatched on their operator).
+
+class Visitor:
+    _dispatch: dict[str, dict[type, tp.Callable | dict[Opt[Operator], tp.Callable]]] = {}
+
+    @staticmethod
+    def on(kind: str, klass: type, *operators: Operator):
+        def decorate(method):
+            method.__dict__.setdefault('_visits', []).append((kind, klass, operators))
+            return method
+        return decorate
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        # Inherit the dispatch tables of the parent classes
+        dispatch = {
+            kind: {k: dict(v) if isinstance(v, dict) else v for k, v in table.items()}
+            for kind, table in cls._dispatch.items()
+        }
+
+        for method in vars(cls).values():
+            for kind, klass, operators in getattr(method, '_visits', ()):
+                table = dispatch.setdefault(kind, {})
+
+                if not operators:
+                    if isinstance(table.get(klass), dict):
+                        table[klass][None] = method
+                    else:
+                        table[klass] = method
+                    continue
+
+                if not isinstance(table.get(klass), dict):
+                    table[klass] = { None: table.get(klass) }
+                for operator in operators:
+                    table[klass][operator] = method
+
+        cls._dispatch = dispatch
+
+    def dispatch(self, kind: str, node: AST) -> tp.Callable:
+        """The (unbound) method registered for `node`"""
+
+        method = self._dispatch[kind].get(node.__class__)
+
+        if isinstance(method, dict):
+            method = method.get(node.operator, method[None])
+
+        assert(method is not None)
+
+        return method
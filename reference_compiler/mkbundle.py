@@ -0,0 +1,85 @@
+#! /usr/bin/env python3
+
+# --------------------------------------------------------------------
+# Build a self-contained, precompiled zipapp of the BX compiler:
+#
+#   python3 mkbundle.py -o bxc.pyz
+#   python3 bxc.pyz file.bx
+#
+# The bundle only contains bytecode (no sources), so it is tied to the
+# Python version that built it. Parser tables are cached in $BXC_TABDIR
+# (default: ~/.cache/bxc) as the bundle itself is read-only.
+
+# --------------------------------------------------------------------
+import argparse
+import importlib.util
+import marshal
+import os
+import sys
+import zipfile
+
+# ====================================================================
+ROOT     = os.path.dirname(os.path.abspath(__file__))
+PACKAGES = ('bxlib', 'ply')
+MODULES  = ('bxc',)
+DATA     = (os.path.join('bxlib', 'bxruntime.c'),)
+
+MAIN = """\
+import bxc
+bxc._main()
+"""
+
+# --------------------------------------------------------------------
+def _bytecode(source: bytes, name: str) -> bytes:
+    code = compile(source, name, 'exec', dont_inherit = True)
+
+    # Unchecked hash-based pyc (PEP 552): never validated against a source
+    return b''.join([
+        importlib.util.MAGIC_NUMBER,
+        (0b01).to_bytes(4, 'little'),
+        importlib.util.source_hash(source),
+        marshal.dumps(code),
+    ])
+
+# --------------------------------------------------------------------
+def _sources():
+    for module in MODULES:
+        yield f'{module}.py'
+    for package in PACKAGES:
+        for name in sorted(os.listdir(os.path.join(ROOT, package))):
+            if name.endswith('.py'):
+                yield os.path.join(package, name)
+
+# --------------------------------------------------------------------
+def build(output: str):
+    with open(output, 'wb') as stream:
+        stream.write(b'#! /usr/bin/env python3\n')
+
+        with zipfile.ZipFile(stream, 'w', zipfile.ZIP_STORED) as zf:
+            for source in _sources():
+                with open(os.path.join(ROOT, source), 'rb') as sstream:
+                    code = _bytecode(sstream.read(), source)
+                zf.writestr(os.path.splitext(source)[0] + '.pyc', code)
+
+            for data in DATA:
+                zf.write(os.path.join(ROOT, data), data)
+
+            zf.writestr('__main__.pyc', _bytecode(MAIN.encode(), '__main__.py'))
+
+    os.chmod(output, 0o755)
+
+# ====================================================================
+def _main():
+    parser = argparse.ArgumentParser(prog = os.path.basename(sys.argv[0]))
+
+    parser.add_argument(
+        '-o', '--output', default = 'bxc.pyz',
+        help = 'output bundle (default: bxc.pyz)',
+    )
+
+    args = parser.parse_args()
+    build(args.output)
+
+# --------------------------------------------------------------------
+if __name__ == '__main__':
+    _main()
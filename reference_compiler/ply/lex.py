@@ -39,6 +39,8 @@ import types
 import copy
 import os
 import inspect
+import hashlib
+import pickle
 
 # This tuple contains acceptable string types
 StringTypes = (str, bytes)
@@ -146,6 +148,72 @@ class Lexer:
             c.lexmodule = object
         return c
 
+    # ------------------------------------------------------------
+    # writetab() - Write lexer information to a table file
+    # ------------------------------------------------------------
+    def writetab(self, tabfile, signature):
+        tabre = {}
+        for statename, lre in self.lexstatere.items():
+            titem = []
+            for (pat, func), retext, renames in zip(lre, self.lexstateretext[statename],
+                                                    self.lexstaterenames[statename]):
+                titem.append((retext, _funcs_to_names(func, renames)))
+            tabre[statename] = titem
+
+        table = {
+            'signature'   : signature,
+            'tokens'      : tuple(self.lextokens),
+            'reflags'     : int(self.lexreflags),
+            'literals'    : self.lexliterals,
+            'stateinfo'   : self.lexstateinfo,
+            'statere'     : tabre,
+            'stateignore' : self.lexstateignore,
+            'stateerrorf' : { k: v.__name__ if v else None for k, v in self.lexstateerrorf.items() },
+            'stateeoff'   : { k: v.__name__ if v else None for k, v in self.lexstateeoff.items() },
+        }
+
+        _write_table(tabfile, table)
+
+    # ------------------------------------------------------------
+    # readtab() - Read lexer information from a table file. Returns
+    # False if the table is missing or does not match the signature
+    # ------------------------------------------------------------
+    def readtab(self, tabfile, signature, fdict):
+        table = _read_table(tabfile, signature)
+        if table is None:
+            return False
+
+        self.lextokens      = set(table['tokens'])
+        self.lexreflags     = table['reflags']
+        self.lexliterals    = table['literals']
+        self.lextokens_all  = self.lextokens | set(self.lexliterals)
+        self.lexstateinfo   = table['stateinfo']
+        self.lexstatere     = {}
+        self.lexstateretext = {}
+        self.lexstaterenames = {}
+
+        for statename, lre in table['statere'].items():
+            titem, txtitem, nameitem = [], [], []
+            for pat, func_name in lre:
+                titem.append((re.compile(pat, self.lexreflags), _names_to_funcs(func_name, fdict)))
+                txtitem.append(pat)
+                nameitem.append([n[0] if n else None for n in func_name])
+            self.lexstatere[statename] = titem
+            self.lexstateretext[statename] = txtitem
+            self.lexstaterenames[statename] = nameitem
+
+        self.lexstateignore = table['stateignore']
+        self.lexstateerrorf = { k: fdict[v] if v else None for k, v in table['stateerrorf'].items() }
+        self.lexstateeoff   = { k: fdict[v] if v else None for k, v in table['stateeoff'].items() }
+
+        self.lexre      = self.lexstatere['INITIAL']
+        self.lexretext  = self.lexstateretext['INITIAL']
+        self.lexignore  = self.lexstateignore.get('INITIAL', '')
+        self.lexerrorf  = self.lexstateerrorf.get('INITIAL', None)
+        self.lexeoff    = self.lexstateeoff.get('INITIAL', None)
+
+        return True
+
     # ------------------------------------------------------------
     # input() - Push a new string into the lexer
     # ------------------------------------------------------------
@@ -340,6 +408,66 @@ def get_caller_module_dict(levels):
     f = sys._getframe(levels)
     return { **f.f_globals, **f.f_locals }
 
+# -----------------------------------------------------------------------------
+# _funcs_to_names()
+#
+# Given a list of regular expression functions, this converts it to a list
+# suitable for output to a table file
+# -----------------------------------------------------------------------------
+def _funcs_to_names(funclist, namelist):
+    result = []
+    for f, name in zip(funclist, namelist):
+        if f and f[0]:
+            result.append((name, f[1]))
+        else:
+            result.append(f)
+    return result
+
+# -----------------------------------------------------------------------------
+# _names_to_funcs()
+#
+# Given a list of regular expression function names, this converts it back to
+# functions.
+# -----------------------------------------------------------------------------
+def _names_to_funcs(namelist, fdict):
+    result = []
+    for n in namelist:
+        if n and n[0]:
+            result.append((fdict[n[0]], n[1]))
+        else:
+            result.append(n)
+    return result
+
+# -----------------------------------------------------------------------------
+# _read_table() / _write_table()  (also used by yacc.py)
+#
+# Load and store pickled tables. A table is only returned if its signature
+# matches the given one. Any I/O or unpickling problem is treated as a cache
+# miss: the tables are then simply rebuilt.
+# -----------------------------------------------------------------------------
+def _read_table(tabfile, signature):
+    try:
+        with open(tabfile, 'rb') as stream:
+            table = pickle.load(stream)
+    except Exception:
+        return None
+    if not isinstance(table, dict) or table.get('signature') != signature:
+        return None
+    return table
+
+def _write_table(tabfile, table):
+    tmpfile = f'{tabfile}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(os.path.dirname(tabfile) or '.', exist_ok=True)
+        with open(tmpfile, 'wb') as stream:
+            pickle.dump(table, stream, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmpfile, tabfile)
+    except OSError:
+        try:
+            os.remove(tmpfile)
+        except OSError:
+            pass
+
 # -----------------------------------------------------------------------------
 # _form_master_re()
 #
@@ -434,6 +562,17 @@ class LexerReflect(object):
         self.validate_rules()
         return self.error
 
+    # Compute a signature over the lexer specification
+    def signature(self):
+        parts = [repr(tuple(self.tokens)), repr(self.literals), repr(self.stateinfo), str(int(self.reflags))]
+        for state in self.stateinfo:
+            parts.extend('%s=%s' % (fname, _get_regex(f)) for fname, f in self.funcsym[state])
+            parts.extend('%s=%s' % (name, r) for name, r in self.strsym[state])
+        parts.append(repr(sorted(self.ignore.items())))
+        parts.append(repr(sorted((s, f.__name__) for s, f in self.errorf.items())))
+        parts.append(repr(sorted((s, f.__name__) for s, f in self.eoff.items())))
+        return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
     # Get the tokens map
     def get_tokens(self):
         tokens = self.ldict.get('tokens', None)
@@ -715,7 +854,7 @@ class LexerReflect(object):
 # Build all of the regular expression rules from definitions in the supplied module
 # -----------------------------------------------------------------------------
 def lex(*, module=None, object=None, debug=False, 
-        reflags=int(re.VERBOSE), debuglog=None, errorlog=None):
+        reflags=int(re.VERBOSE), debuglog=None, errorlog=None, tabfile=None):
 
     global lexer
 
@@ -748,6 +887,18 @@ def lex(*, module=None, object=None, debug=False,
     # Collect parser information from the dictionary
     linfo = LexerReflect(ldict, log=errorlog, reflags=reflags)
     linfo.get_all()
+
+    # If a table file is given and matches the specification, reuse the
+    # master regular expressions it holds and skip the validation step
+    signature = None
+    if tabfile and not debug and not linfo.error:
+        signature = linfo.signature()
+        if lexobj.readtab(tabfile, signature, ldict):
+            token = lexobj.token
+            input = lexobj.input
+            lexer = lexobj
+            return lexobj
+
     if linfo.validate_all():
         raise SyntaxError("Can't build lexer")
 
@@ -845,6 +996,10 @@ def lex(*, module=None, object=None, debug=False,
             if s not in linfo.ignore:
                 linfo.ignore[s] = linfo.ignore.get('INITIAL', '')
 
+    # Save the table for the next run
+    if signature is not None:
+        lexobj.writetab(tabfile, signature)
+
     # Create global versions of the token() and input() functions
     token = lexobj.token
     input = lexobj.input
@@ -64,7 +64,12 @@
 import re
 import types
 import sys
+import os
 import inspect
+import hashlib
+
+# The table files of the lexers & parsers are read and written alike
+from .lex import _read_table, _write_table
 
 #-----------------------------------------------------------------------------
 #                     === User configurable parameters ===
@@ -160,6 +165,17 @@ class YaccSymbol:
     def __repr__(self):
         return str(self)
 
+# Same as YaccSymbol, but slot-based. Used by LRParser.parseopt()
+
+class YaccSlotSymbol:
+    __slots__ = ('type', 'value', 'lineno', 'endlineno', 'lexpos', 'endlexpos', 'lexer')
+
+    def __str__(self):
+        return self.type
+
+    def __repr__(self):
+        return str(self)
+
 # This class is a wrapper around the objects actually passed to each
 # grammar rule.   Index lookup and assignment actually assign the
 # .value attribute of the underlying YaccSymbol object.
@@ -580,6 +596,254 @@ class LRParser:
             # If we'r here, something really bad happened
             raise RuntimeError('yacc: internal parser error!!!\n')
 
+    # parseopt().
+    #
+    # Optimized version of parse() for the common case. It behaves like
+    # parse(debug=False), but the debug branches are removed, the tables and
+    # stack methods are hoisted in locals, and the grammar symbols are
+    # slot-based (YaccSlotSymbol). Any change made to parse() must be
+    # reflected here.
+
+    def parseopt(self, input=None, lexer=None, tracking=False):
+        lookahead = None                         # Current lookahead symbol
+        lookaheadstack = []                      # Stack of lookahead symbols
+        actions = self.action                    # Local reference to action table (to avoid lookup on self.)
+        goto    = self.goto                      # Local reference to goto table (to avoid lookup on self.)
+        defaulted_states = self.defaulted_states # Local reference to defaulted states
+        pslice  = YaccProduction(None)           # Production object passed to grammar rules
+        errorcount = 0                           # Used during error recovery
+        Symbol  = YaccSlotSymbol
+
+        # (callable, name, length) of the productions
+        rules = [(p.callable, p.name, p.len) for p in self.productions]
+
+        # If no lexer was given, we will try to use the lex module
+        if not lexer:
+            from . import lex
+            lexer = lex.lexer
+
+        # Set up the lexer and parser objects on pslice
+        pslice.lexer = lexer
+        pslice.parser = self
+
+        # If input was supplied, pass to lexer
+        if input is not None:
+            lexer.input(input)
+
+        # Set the token function
+        get_token = self.token = lexer.token
+
+        # Set up the state and symbol stacks
+        statestack = self.statestack = []   # Stack of parsing states
+        symstack = self.symstack = []       # Stack of grammar symbols
+        pslice.stack = symstack             # Put in the production
+        errtoken   = None                   # Err token
+
+        statepush = statestack.append
+        sympush   = symstack.append
+
+        # The start state is assumed to be (0,$end)
+
+        statepush(0)
+        sym = Symbol()
+        sym.type = '$end'
+        sympush(sym)
+        state = 0
+        while True:
+            if state in defaulted_states:
+                t = defaulted_states[state]
+            else:
+                if not lookahead:
+                    if not lookaheadstack:
+                        lookahead = get_token()     # Get the next token
+                    else:
+                        lookahead = lookaheadstack.pop()
+                    if not lookahead:
+                        lookahead = Symbol()
+                        lookahead.type = '$end'
+
+                # Check the action table
+                t = actions[state].get(lookahead.type)
+
+            if t is not None:
+                if t > 0:
+                    # shift a symbol on the stack
+                    statepush(t)
+                    state = t
+                    sympush(lookahead)
+                    lookahead = None
+
+                    # Decrease error count on successful shift
+                    if errorcount:
+                        errorcount -= 1
+                    continue
+
+                if t < 0:
+                    # reduce a symbol on the stack, emit a production
+                    pcall, pname, plen = rules[-t]
+
+                    sym = Symbol()
+                    sym.type = pname       # Production name
+                    sym.value = None
+
+                    if plen:
+                        targ = symstack[-plen-1:]
+                        targ[0] = sym
+
+                        if tracking:
+                            t1 = targ[1]
+                            sym.lineno = t1.lineno
+                            sym.lexpos = t1.lexpos
+                            t1 = targ[-1]
+                            if t1.__class__ is Symbol:
+                                # Reduced symbols always carry their end position
+                                sym.endlineno = t1.endlineno
+                                sym.endlexpos = t1.endlexpos
+                            else:
+                                sym.endlineno = getattr(t1, 'endlineno', t1.lineno)
+                                sym.endlexpos = getattr(t1, 'endlexpos', t1.lexpos)
+
+                        pslice.slice = targ
+
+                        try:
+                            # Call the grammar rule with our special slice object
+                            del symstack[-plen:]
+                            self.state = state
+                            pcall(pslice)
+                            del statestack[-plen:]
+                            sympush(sym)
+                            state = goto[statestack[-1]][pname]
+                            statepush(state)
+                        except SyntaxError:
+                            # If an error was set. Enter error recovery state
+                            lookaheadstack.append(lookahead)    # Save the current lookahead token
+                            symstack.extend(targ[1:-1])         # Put the production slice back on the stack
+                            statestack.pop()                    # Pop back one state (before the reduce)
+                            state = statestack[-1]
+                            sym.type = 'error'
+                            sym.value = 'error'
+                            lookahead = sym
+                            errorcount = error_count
+                            self.errorok = False
+
+                        continue
+
+                    else:
+                        if tracking:
+                            sym.lineno = sym.endlineno = lexer.lineno
+                            sym.lexpos = sym.endlexpos = lexer.lexpos
+
+                        pslice.slice = [sym]
+
+                        try:
+                            # Call the grammar rule with our special slice object
+                            self.state = state
+                            pcall(pslice)
+                            sympush(sym)
+                            state = goto[statestack[-1]][pname]
+                            statepush(state)
+                        except SyntaxError:
+                            # If an error was set. Enter error recovery state
+                            lookaheadstack.append(lookahead)    # Save the current lookahead token
+                            statestack.pop()                    # Pop back one state (before the reduce)
+                            state = statestack[-1]
+                            sym.type = 'error'
+                            sym.value = 'error'
+                            lookahead = sym
+                            errorcount = error_count
+                            self.errorok = False
+
+                        continue
+
+                if t == 0:
+                    return getattr(symstack[-1], 'value', None)
+
+            if t is None:
+                # Error recovery: see parse()
+                if errorcount == 0 or self.errorok:
+                    errorcount = error_count
+                    self.errorok = False
+                    errtoken = lookahead
+                    if errtoken.type == '$end':
+                        errtoken = None               # End of file!
+                    if self.errorfunc:
+                        if errtoken and not hasattr(errtoken, 'lexer'):
+                            errtoken.lexer = lexer
+                        self.state = state
+                        tok = self.errorfunc(errtoken)
+                        if self.errorok:
+                            # User must have done some kind of panic
+                            # mode recovery on their own.  The
+                            # returned token is the next lookahead
+                            lookahead = tok
+                            errtoken = None
+                            continue
+                    else:
+                        if errtoken:
+                            if hasattr(errtoken, 'lineno'):
+                                lineno = lookahead.lineno
+                            else:
+                                lineno = 0
+                            if lineno:
+                                sys.stderr.write('yacc: Syntax error at line %d, token=%s\n' % (lineno, errtoken.type))
+                            else:
+                                sys.stderr.write('yacc: Syntax error, token=%s' % errtoken.type)
+                        else:
+                            sys.stderr.write('yacc: Parse error in input. EOF\n')
+                            return
+
+                else:
+                    errorcount = error_count
+
+                # case 1: the statestack only has 1 entry on it.
+                if len(statestack) <= 1 and lookahead.type != '$end':
+                    lookahead = None
+                    errtoken = None
+                    state = 0
+                    # Nuke the pushback stack
+                    del lookaheadstack[:]
+                    continue
+
+                # case 2: the statestack has a couple of entries on it, but we're
+                # at the end of the file.
+                if lookahead.type == '$end':
+                    return
+
+                if lookahead.type != 'error':
+                    sym = symstack[-1]
+                    if sym.type == 'error':
+                        # Error is on top of stack, we'll just nuke input
+                        # symbol and continue
+                        if tracking:
+                            sym.endlineno = getattr(lookahead, 'lineno', sym.lineno)
+                            sym.endlexpos = getattr(lookahead, 'lexpos', sym.lexpos)
+                        lookahead = None
+                        continue
+
+                    # Create the error symbol for the first time and make it the new lookahead symbol
+                    t = Symbol()
+                    t.type = 'error'
+
+                    if hasattr(lookahead, 'lineno'):
+                        t.lineno = t.endlineno = lookahead.lineno
+                    if hasattr(lookahead, 'lexpos'):
+                        t.lexpos = t.endlexpos = lookahead.lexpos
+                    t.value = lookahead
+                    lookaheadstack.append(lookahead)
+                    lookahead = t
+                else:
+                    sym = symstack.pop()
+                    if tracking:
+                        lookahead.lineno = sym.lineno
+                        lookahead.lexpos = sym.lexpos
+                    statestack.pop()
+                    state = statestack[-1]
+
+                continue
+
+            # If we'r here, something really bad happened
+            raise RuntimeError('yacc: internal parser error!!!\n')
+
 # -----------------------------------------------------------------------------
 #                          === Grammar Representation ===
 #
@@ -682,6 +946,35 @@ class Production(object):
         if self.func:
             self.callable = pdict[self.func]
 
+# -----------------------------------------------------------------------------
+# class MiniProduction
+#
+# This class is a stripped down version of Production that is used when the
+# parsing tables are read back from a table file. It only holds the
+# information needed by the LR parsing engine.
+# -----------------------------------------------------------------------------
+
+class MiniProduction(object):
+    def __init__(self, str, name, len, func, file, line):
+        self.name     = name
+        self.len      = len
+        self.func     = func
+        self.callable = None
+        self.file     = file
+        self.line     = line
+        self.str      = str
+
+    def __str__(self):
+        return self.str
+
+    def __repr__(self):
+        return 'MiniProduction(%s)' % self.str
+
+    # Bind the production function name to a callable
+    def bind(self, pdict):
+        if self.func:
+            self.callable = pdict[self.func]
+
 # -----------------------------------------------------------------------------
 # class LRItem
 #
@@ -1345,6 +1638,36 @@ class LRTable:
         for p in self.lr_productions:
             p.bind(pdict)
 
+    # Write the parsing tables to a table file
+    def write_table(self, tabfile, signature):
+        table = {
+            'signature'   : signature,
+            'action'      : self.lr_action,
+            'goto'        : self.lr_goto,
+            'productions' : [(p.str, p.name, p.len, p.func, p.file, p.line)
+                             for p in self.lr_productions],
+        }
+
+        _write_table(tabfile, table)
+
+    # Read the parsing tables from a table file. Returns None if the file
+    # is missing, unreadable or was built for a different grammar.
+    @classmethod
+    def read_table(cls, tabfile, signature):
+        table = _read_table(tabfile, signature)
+        if table is None:
+            return None
+
+        lr = cls.__new__(cls)
+        lr.grammar        = None
+        lr.log            = NullLogger()
+        lr.lr_action      = table['action']
+        lr.lr_goto        = table['goto']
+        lr.lr_productions = [MiniProduction(*p) for p in table['productions']]
+        lr.sr_conflicts   = []
+        lr.rr_conflicts   = []
+        return lr
+
     # Compute the LR(0) closure operation on I, where I is a set of LR(0) items.
 
     def lr0_closure(self, I):
@@ -2023,6 +2346,13 @@ class ParserReflect(object):
         self.validate_modules()
         return self.error
 
+    # Compute a hash of the grammar signature, suitable as a table file key.
+    # Rule function names are included as they are bound by name on load.
+    def digest(self):
+        parts = [self.signature()]
+        parts.extend(f[2] for f in self.pfuncs)
+        return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
     # Compute a signature over the grammar
     def signature(self):
         parts = []
@@ -2270,7 +2600,7 @@ class ParserReflect(object):
 
 def yacc(*, debug=yaccdebug, module=None, start=None,
          check_recursion=True, optimize=False, debugfile=debug_file,
-         debuglog=None, errorlog=None):
+         debuglog=None, errorlog=None, tabfile=None):
 
     # Reference to the parsing method of the last built parser
     global parse
@@ -2303,6 +2633,18 @@ def yacc(*, debug=yaccdebug, module=None, start=None,
     if pinfo.error:
         raise YaccError('Unable to build parser')
 
+    # If a table file is given and has been built for this very grammar,
+    # skip the validation and the LALR table construction altogether
+    signature = None
+    if tabfile and not debug:
+        signature = pinfo.digest()
+        lr = LRTable.read_table(tabfile, signature)
+        if lr is not None:
+            lr.bind_callables(pinfo.pdict)
+            parser = LRParser(lr, pinfo.error_func)
+            parse = parser.parse
+            return parser
+
     if debuglog is None:
         if debug:
             try:
@@ -2474,6 +2816,10 @@ def yacc(*, debug=yaccdebug, module=None, start=None,
                 errorlog.warning('Rule (%s) is never reduced', rejected)
                 warned_never.append(rejected)
 
+    # Save the tables for the next run
+    if signature is not None:
+        lr.write_table(tabfile, signature)
+
     # Build the parser
     lr.bind_callables(pinfo.pdict)
     parser = LRParser(lr, pinfo.error_func)